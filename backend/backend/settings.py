@@ -101,6 +101,49 @@ PAYHERE_MERCHANT_SECRET = os.getenv("PAYHERE_MERCHANT_SECRET")
 # Google Cloud Vision API credentials
 GOOGLE_APPLICATION_CREDENTIALS_JSON = os.environ.get("GOOGLE_CREDS_JSON")
 
+# Receipt OCR runs on a background worker pool instead of the request thread
+OCR_WORKER_COUNT = int(os.getenv("OCR_WORKER_COUNT", 2))
+# Persistent OCR result cache keyed by image SHA-256 (re-uploaded receipts skip OCR)
+OCR_CACHE_TTL_DAYS = int(os.getenv("OCR_CACHE_TTL_DAYS", 90))
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", 10000))
+# Rescale/binarise/deskew images in memory before Tesseract
+OCR_TESSERACT_PREPROCESS = os.getenv("OCR_TESSERACT_PREPROCESS", "True") == "True"
+# Tesseract runs in a bounded process pool; extra jobs beyond the queue depth are
+# rejected and fall back to manual verification
+OCR_PROCESS_WORKERS = int(os.getenv("OCR_PROCESS_WORKERS", 2))
+OCR_PROCESS_QUEUE_DEPTH = int(os.getenv("OCR_PROCESS_QUEUE_DEPTH", 8))
+OCR_JOB_TIMEOUT_SECONDS = int(os.getenv("OCR_JOB_TIMEOUT_SECONDS", 30))
+# Receipts whose perceptual image hashes differ by at most this many bits (of 64)
+# are flagged as near-duplicates
+RECEIPT_PHASH_MAX_DISTANCE = int(os.getenv("RECEIPT_PHASH_MAX_DISTANCE", 10))
+# Receipt uploads are streamed through students.ocr.uploads.ReceiptUploadHandler,
+# which rejects them mid-upload once either limit is exceeded
+RECEIPT_UPLOAD_MAX_BYTES = int(os.getenv("RECEIPT_UPLOAD_MAX_BYTES", 10 * 1024 * 1024))
+RECEIPT_UPLOAD_MAX_PIXELS = int(os.getenv("RECEIPT_UPLOAD_MAX_PIXELS", 40_000_000))
+# Where uploads are streamed to before being moved into MEDIA_ROOT; keep it on the
+# same filesystem so the move is a rename (defaults to MEDIA_ROOT/.uploads)
+RECEIPT_UPLOAD_TEMP_DIR = os.getenv("RECEIPT_UPLOAD_TEMP_DIR")
+# Arrears reports are cached for this long, and dropped early when payments,
+# enrollments or class fees change
+ARREARS_CACHE_SECONDS = int(os.getenv("ARREARS_CACHE_SECONDS", 600))
+# Upper bound on how long the public class catalog is cached; edits to classes,
+# schedules or webinars invalidate it immediately
+CATALOG_CACHE_SECONDS = int(os.getenv("CATALOG_CACHE_SECONDS", 3600))
+# Student calendar: the window served when start/end are omitted, the longest
+# window a request may ask for, and the span and cache lifetime of the .ics feed
+CALENDAR_DEFAULT_DAYS = int(os.getenv("CALENDAR_DEFAULT_DAYS", 31))
+CALENDAR_MAX_WINDOW_DAYS = int(os.getenv("CALENDAR_MAX_WINDOW_DAYS", 366))
+CALENDAR_FEED_PAST_DAYS = int(os.getenv("CALENDAR_FEED_PAST_DAYS", 30))
+CALENDAR_FEED_FUTURE_DAYS = int(os.getenv("CALENDAR_FEED_FUTURE_DAYS", 180))
+CALENDAR_FEED_CACHE_SECONDS = int(os.getenv("CALENDAR_FEED_CACHE_SECONDS", 3600))
+# Calendar sync tokens stay valid (and their change log is kept) for this many
+# days; a delta with more changes than the maximum asks the client for a full sync.
+# Tokens only advance past changes older than the lag, which must exceed the
+# longest write transaction
+CALENDAR_SYNC_RETENTION_DAYS = int(os.getenv("CALENDAR_SYNC_RETENTION_DAYS", 30))
+CALENDAR_SYNC_MAX_CHANGES = int(os.getenv("CALENDAR_SYNC_MAX_CHANGES", 1000))
+CALENDAR_SYNC_LAG_SECONDS = int(os.getenv("CALENDAR_SYNC_LAG_SECONDS", 5))
+
 
 # creds_json_str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
 # #  Write JSON string to a temporary file at runtime
@@ -131,6 +174,28 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Shared cache (catalog, arrears reports, calendar feeds, cache versions). Set
+# REDIS_CACHE_URL, e.g. redis://127.0.0.1:6379/1, so every worker process sees
+# the same entries and version bumps. It is required outside DEBUG; in DEBUG
+# each process falls back to its own in-memory cache, and since a bump then
+# only reaches that process, cached entries are kept for a few seconds at most
+REDIS_CACHE_URL = os.getenv("REDIS_CACHE_URL")
+if REDIS_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_CACHE_URL,
+        },
+    }
+elif not DEBUG:
+    from django.core.exceptions import ImproperlyConfigured
+    raise ImproperlyConfigured("REDIS_CACHE_URL must be set when DEBUG is off")
+else:
+    LOCAL_CACHE_MAX_SECONDS = 5
+    ARREARS_CACHE_SECONDS = min(ARREARS_CACHE_SECONDS, LOCAL_CACHE_MAX_SECONDS)
+    CATALOG_CACHE_SECONDS = min(CATALOG_CACHE_SECONDS, LOCAL_CACHE_MAX_SECONDS)
+    CALENDAR_FEED_CACHE_SECONDS = min(CALENDAR_FEED_CACHE_SECONDS, LOCAL_CACHE_MAX_SECONDS)
+
 
 MEDIA_ROOT = BASE_DIR / "media"   #your_project_folder/media/ - #your_project_folder/media/receipts/
 MEDIA_URL = "/media/"     #http://localhost:8000/media/receipts/receipt1.jpg
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AdminConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'edu_admin'
+
+    def ready(self):
+        import edu_admin.signals
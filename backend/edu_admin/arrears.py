@@ -0,0 +1,137 @@
+"""
+Outstanding fees (arrears) per student and month.
+
+For a month, a student owes the fees of every class they are enrolled in
+that runs during the month and pay through successful payments dated in that
+month. Both sides are computed by the database: one grouped query over
+Enrollment x Class sums the fees per student, with the student's paid total
+for the month as a correlated aggregate subquery, and only students whose
+fees exceed their payments are returned.
+
+Results are cached under the ``payments`` cache version, which is bumped
+whenever payments, enrollments or class fees change.
+"""
+import calendar
+import hashlib
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.core.cache import cache
+from django.db.models import Count, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from students.models import Enrollment, Payment
+from students.utils.cache_versions import get_version
+from students.utils.pagination import KeysetPage
+
+CACHE_NAMESPACE = "payments"
+ZERO = Value(Decimal("0.00"), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+
+class ArrearsError(ValueError):
+    pass
+
+
+def parse_month(value):
+    """First day of the month given as YYYY-MM (default: the current month)."""
+    if not value:
+        return date.today().replace(day=1)
+    try:
+        year, month = value.split("-")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        raise ArrearsError("month must be in YYYY-MM format.")
+
+
+def month_end(month_start):
+    return month_start.replace(day=calendar.monthrange(month_start.year, month_start.month)[1])
+
+
+def arrears_queryset(month_start, class_code=None):
+    """
+    One row per student in arrears for the month: student details, enrolled
+    classes, ``due``, ``paid`` and ``outstanding``.
+    """
+    last_day = month_end(month_start)
+    enrollments = Enrollment.objects.filter(
+        classid__start_date__lte=last_day,
+        classid__end_date__gte=month_start,
+        timestamp__date__lte=last_day,
+    )
+    if class_code:
+        enrollments = enrollments.filter(
+            stuid__in=Enrollment.objects.filter(classid__classid=class_code).values("stuid")
+        )
+
+    paid = (
+        Payment.objects.filter(
+            stuid=OuterRef("stuid__user"), status="success", date__gte=month_start, date__lte=last_day,
+        )
+        .values("stuid")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    return (
+        enrollments.values("stuid")
+        .annotate(
+            student_id=F("stuid__stuid"),
+            username=F("stuid__user__username"),
+            first_name=F("stuid__user__first_name"),
+            last_name=F("stuid__user__last_name"),
+            classes=ArrayAgg("classid__title", ordering="classid__title"),
+            class_count=Count("classid"),
+            due=Sum("classid__fee"),
+            paid=Coalesce(Subquery(paid), ZERO),
+        )
+        .annotate(outstanding=F("due") - F("paid"))
+        .filter(outstanding__gt=0)
+    )
+
+
+def arrears_summary(rows):
+    summary = rows.aggregate(
+        students=Count("stuid"),
+        total_due=Coalesce(Sum("due"), ZERO),
+        total_paid=Coalesce(Sum("paid"), ZERO),
+        total_outstanding=Coalesce(Sum("outstanding"), ZERO),
+    )
+    return {key: str(value) if isinstance(value, Decimal) else value for key, value in summary.items()}
+
+
+def _row(values):
+    return {
+        "student": values["stuid"],
+        "student_id": values["student_id"],
+        "name": f"{values['first_name']} {values['last_name']}".strip() or values["username"],
+        "classes": values["classes"],
+        "class_count": values["class_count"],
+        "due": str(values["due"]),
+        "paid": str(values["paid"]),
+        "outstanding": str(values["outstanding"]),
+    }
+
+
+def arrears_report(month_start, class_code=None, cursor=None, page_size=50):
+    """
+    A page of students in arrears (largest outstanding first) with the
+    month's summary. Cached until payments or enrollments change.
+    """
+    params = f"{month_start:%Y-%m}|{class_code or ''}|{cursor or ''}|{page_size}"
+    key = f"arrears:{get_version(CACHE_NAMESPACE)}:{hashlib.sha256(params.encode()).hexdigest()[:32]}"
+    report = cache.get(key)
+    if report is not None:
+        return report
+
+    rows = arrears_queryset(month_start, class_code)
+    page = KeysetPage(rows, ("outstanding", "stuid"), (Decimal, int), cursor=cursor, page_size=page_size)
+    report = {
+        "month": f"{month_start:%Y-%m}",
+        "summary": arrears_summary(rows),
+        "results": [_row(values) for values in page.rows],
+        "next_cursor": page.next_cursor,
+        "has_more": page.has_more,
+    }
+    cache.set(key, report, settings.ARREARS_CACHE_SECONDS)
+    return report
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from edu_admin.models import BankStatementLine
+from edu_admin.reconciliation import DEFAULT_DATE_TOLERANCE_DAYS, StatementError, reconcile_statement
+
+
+class Command(BaseCommand):
+    help = 'Match a bank statement CSV against unverified receipts and verify the confident matches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('statement', type=str, help='Bank statement CSV file')
+        parser.add_argument('--tolerance-days', type=int, default=DEFAULT_DATE_TOLERANCE_DAYS,
+                            help='Days a receipt date may differ from the statement date')
+        parser.add_argument('--dry-run', action='store_true', help='Match and record, but do not verify anything')
+
+    def handle(self, *args, **options):
+        path = Path(options['statement'])
+        if not path.is_file():
+            raise CommandError(f'{path} does not exist')
+        try:
+            statement = reconcile_statement(
+                path.read_bytes(), file_name=path.name, dry_run=options['dry_run'],
+                tolerance=options['tolerance_days'],
+            )
+        except StatementError as e:
+            raise CommandError(str(e))
+
+        for line in statement.lines.exclude(status=BankStatementLine.MATCHED):
+            candidates = ', '.join(line.candidate_receipt_ids) or '-'
+            self.stdout.write(f'  line {line.line_no}: {line.amount} {line.reference or ""} [{line.status}] '
+                              f'{line.reason} (candidates: {candidates})')
+
+        summary = statement.summary
+        verb = 'would be verified' if statement.dry_run else 'verified'
+        self.stdout.write(self.style.SUCCESS(
+            f'Statement #{statement.pk}: {statement.line_count} lines, {summary["matched"]} {verb}, '
+            f'{summary["review"]} to review, {summary["unmatched"]} unmatched'
+        ))
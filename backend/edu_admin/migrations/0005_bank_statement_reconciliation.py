@@ -0,0 +1,48 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:32
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu_admin', '0004_zoomwebinar_registration_url'),
+        ('students', '0041_payment_ledger_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankStatementImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_name', models.CharField(max_length=255)),
+                ('imported_at', models.DateTimeField(auto_now_add=True)),
+                ('dry_run', models.BooleanField(default=False)),
+                ('line_count', models.IntegerField(default=0)),
+                ('summary', models.JSONField(blank=True, default=dict)),
+                ('imported_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='BankStatementLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('line_no', models.IntegerField()),
+                ('posted_at', models.DateTimeField()),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('reference', models.CharField(blank=True, max_length=100)),
+                ('description', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('matched', 'Matched'), ('review', 'Needs review'), ('unmatched', 'Unmatched')], db_index=True, max_length=10)),
+                ('reason', models.CharField(blank=True, max_length=255)),
+                ('candidate_receipt_ids', models.JSONField(blank=True, default=list)),
+                ('receipt', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='statement_lines', to='students.receiptpayment')),
+                ('statement', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='edu_admin.bankstatementimport')),
+            ],
+            options={
+                'ordering': ['statement', 'line_no'],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu_admin', '0005_bank_statement_reconciliation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='zoomoccurrence',
+            index=models.Index(fields=['webinar', 'start_time'], name='occurrence_webinar_start_idx'),
+        ),
+    ]
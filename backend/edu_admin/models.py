@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 # Create your models here.
@@ -24,3 +25,45 @@ class ZoomOccurrence(models.Model):
 
     class Meta:
         unique_together = ('webinar', 'occurrence_id')
+        indexes = [
+            # Calendar windows: a class's sessions in a date range
+            models.Index(fields=['webinar', 'start_time'], name='occurrence_webinar_start_idx'),
+        ]
+
+
+class BankStatementImport(models.Model):
+    """A bank statement CSV reconciled against uploaded receipts."""
+    file_name = models.CharField(max_length=255)
+    imported_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    imported_at = models.DateTimeField(auto_now_add=True)
+    dry_run = models.BooleanField(default=False)
+    line_count = models.IntegerField(default=0)
+    summary = models.JSONField(default=dict, blank=True)
+
+    def __str__(self):
+        return f"{self.file_name} ({self.imported_at:%Y-%m-%d %H:%M})"
+
+
+class BankStatementLine(models.Model):
+    MATCHED = 'matched'
+    REVIEW = 'review'
+    UNMATCHED = 'unmatched'
+    STATUS_CHOICES = [(MATCHED, 'Matched'), (REVIEW, 'Needs review'), (UNMATCHED, 'Unmatched')]
+
+    statement = models.ForeignKey(BankStatementImport, related_name='lines', on_delete=models.CASCADE)
+    line_no = models.IntegerField()
+    posted_at = models.DateTimeField()
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    reference = models.CharField(max_length=100, blank=True)
+    description = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, db_index=True)
+    reason = models.CharField(max_length=255, blank=True)
+    receipt = models.ForeignKey('students.ReceiptPayment', on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='statement_lines')
+    candidate_receipt_ids = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        ordering = ['statement', 'line_no']
+
+    def __str__(self):
+        return f"Line {self.line_no}: {self.amount} ({self.status})"
@@ -0,0 +1,292 @@
+"""
+Bank statement reconciliation for receipt payments.
+
+A statement CSV is matched against every unverified ``ReceiptPayment`` in a
+single pass. The receipts are loaded with one query and put into two hash
+indexes, by normalised record number and by ``(amount, day)`` bucket. Each
+statement line then probes the indexes, so reconciling ``m`` lines against
+``n`` receipts is O(n + m) rather than comparing every pair.
+
+A line is a confident match when its reference, amount and date (within the
+tolerance) identify exactly one receipt and no other line claims that
+receipt. Confident matches are verified in bulk through
+``verify_receipts``, which still applies the duplicate and near-duplicate
+checks. Everything else is stored for review with its candidate receipts.
+"""
+import csv
+import io
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.utils import timezone
+
+from students.models import ReceiptPayment
+from students.ocr.extraction import DATE_VALUE, ISO_DATE_VALUE, parse_date
+from .models import BankStatementImport, BankStatementLine
+from .verification import VERIFIED, verify_receipts
+
+DEFAULT_DATE_TOLERANCE_DAYS = 1
+
+# Canonical column -> accepted (lower-cased) CSV headers
+COLUMN_ALIASES = {
+    "date": ("date", "posting date", "posted", "transaction date", "txn date", "value date", "date time"),
+    "time": ("time", "transaction time"),
+    "amount": ("amount", "credit", "credit amount", "deposit", "deposits", "cr"),
+    "reference": ("reference", "ref", "ref no", "reference no", "record no", "record_no", "transaction id", "trace no"),
+    "description": ("description", "narration", "details", "particulars", "remarks"),
+}
+
+CENTS = Decimal("0.01")
+
+
+class StatementError(ValueError):
+    pass
+
+
+@dataclass
+class StatementLine:
+    line_no: int
+    posted_at: datetime
+    amount: Decimal
+    reference: str = ""
+    description: str = ""
+
+
+@dataclass
+class LineMatch:
+    line: StatementLine
+    status: str
+    reason: str = ""
+    receipt: object = None
+    candidates: list = field(default_factory=list)
+
+
+def normalize_reference(value):
+    """Record numbers compared by their digits, ignoring leading zeros ("004512" == "4512")."""
+    digits = re.sub(r"\D", "", value or "")
+    if digits:
+        return digits.lstrip("0") or "0"
+    return re.sub(r"\W", "", (value or "").upper())
+
+
+def parse_amount(value):
+    try:
+        return Decimal(str(value).replace(",", "").strip()).quantize(CENTS)
+    except (InvalidOperation, ValueError):
+        return None
+
+
+def _parse_datetime(value):
+    value = (value or "").strip()
+    match = ISO_DATE_VALUE.search(value) or DATE_VALUE.search(value)
+    return parse_date(match) if match else None
+
+
+def _column_map(header):
+    lowered = {name.strip().lower(): name for name in header if name}
+    columns = {}
+    for column, aliases in COLUMN_ALIASES.items():
+        for alias in aliases:
+            if alias in lowered:
+                columns[column] = lowered[alias]
+                break
+    missing = {"date", "amount"} - columns.keys()
+    if missing:
+        raise StatementError(f"Statement is missing the {' and '.join(sorted(missing))} column(s).")
+    return columns
+
+
+def _cell(row, columns, column):
+    if column not in columns:
+        return ""
+    return (row.get(columns[column]) or "").strip()
+
+
+def parse_statement(content):
+    """
+    Parse a statement CSV (text or bytes) into credit lines. Bytes are read
+    as UTF-8, or as Windows-1252 as exported by spreadsheet tools. Debits and
+    zero amounts are skipped; unreadable files, dates or amounts raise
+    StatementError.
+    """
+    if isinstance(content, bytes):
+        content = _decode(content)
+    try:
+        return _parse_rows(csv.DictReader(io.StringIO(content)))
+    except csv.Error as e:
+        raise StatementError(f"The statement is not a valid CSV file: {e}")
+
+
+def _decode(content):
+    for encoding in ("utf-8-sig", "cp1252"):
+        try:
+            return content.decode(encoding)
+        except UnicodeDecodeError:
+            pass
+    raise StatementError("The statement must be a UTF-8 or Windows-1252 encoded CSV file.")
+
+
+def _parse_rows(reader):
+    columns = _column_map(reader.fieldnames or [])
+
+    lines, errors = [], []
+    for line_no, row in enumerate(reader, start=2):  # line 1 is the header
+        raw_amount = _cell(row, columns, "amount")
+        if not raw_amount:
+            continue
+        amount = parse_amount(raw_amount)
+        date_text = f"{_cell(row, columns, 'date')} {_cell(row, columns, 'time')}"
+        posted_at = _parse_datetime(date_text)
+        if amount is None or posted_at is None:
+            errors.append(line_no)
+            continue
+        if amount <= 0:
+            continue
+        lines.append(StatementLine(
+            line_no=line_no,
+            posted_at=posted_at,
+            amount=amount,
+            reference=_cell(row, columns, "reference"),
+            description=_cell(row, columns, "description"),
+        ))
+    if errors:
+        shown = ", ".join(map(str, errors[:10])) + (" ..." if len(errors) > 10 else "")
+        raise StatementError(f"Could not read the date or amount on line(s) {shown}.")
+    return lines
+
+
+def _receipt_day(paid_date_time):
+    if paid_date_time is None:
+        return None
+    if timezone.is_aware(paid_date_time):
+        paid_date_time = timezone.localtime(paid_date_time)
+    return paid_date_time.date()
+
+
+class ReceiptIndex:
+    """Hash indexes over the unverified receipts."""
+
+    def __init__(self, receipts):
+        self.by_reference = defaultdict(list)
+        self.by_bucket = defaultdict(list)
+        self.days = {}
+        self.amounts = {}
+        for receipt in receipts:
+            amount = parse_amount(receipt.paid_amount) if receipt.paid_amount else None
+            day = _receipt_day(receipt.paid_date_time)
+            self.amounts[receipt.pk] = amount
+            self.days[receipt.pk] = day
+            if receipt.record_no:
+                self.by_reference[normalize_reference(receipt.record_no)].append(receipt)
+            if amount is not None and day is not None:
+                self.by_bucket[(amount, day)].append(receipt)
+
+    @classmethod
+    def unverified(cls):
+        return cls(
+            ReceiptPayment.objects.filter(verified=False).only(
+                "id", "receiptid", "record_no", "paid_amount", "paid_date_time",
+            )
+        )
+
+    def _day_ok(self, receipt, day, tolerance):
+        receipt_day = self.days[receipt.pk]
+        return receipt_day is None or abs((receipt_day - day).days) <= tolerance
+
+    def reference_candidates(self, line, tolerance):
+        if not line.reference:
+            return []
+        day = line.posted_at.date()
+        return [
+            receipt for receipt in self.by_reference.get(normalize_reference(line.reference), [])
+            if self.amounts[receipt.pk] == line.amount and self._day_ok(receipt, day, tolerance)
+        ]
+
+    def bucket_candidates(self, line, tolerance):
+        day = line.posted_at.date()
+        candidates = []
+        for offset in range(-tolerance, tolerance + 1):
+            candidates.extend(self.by_bucket.get((line.amount, day + timedelta(days=offset)), []))
+        return candidates
+
+
+def match_lines(lines, index, tolerance=DEFAULT_DATE_TOLERANCE_DAYS):
+    """Match statement lines to receipts; returns one LineMatch per line."""
+    matches, claims = [], defaultdict(list)
+    for line in lines:
+        strong = index.reference_candidates(line, tolerance)
+        if len(strong) == 1:
+            match = LineMatch(line, BankStatementLine.MATCHED, receipt=strong[0], candidates=strong)
+            claims[strong[0].pk].append(match)
+        elif strong:
+            match = LineMatch(line, BankStatementLine.REVIEW, "Several receipts share this reference and amount.",
+                              candidates=strong)
+        else:
+            weak = index.bucket_candidates(line, tolerance)
+            if weak:
+                reason = ("Amount and date match one receipt but the reference does not."
+                          if len(weak) == 1 else "Amount and date match several receipts.")
+                match = LineMatch(line, BankStatementLine.REVIEW, reason, candidates=weak)
+            else:
+                match = LineMatch(line, BankStatementLine.UNMATCHED, "No receipt matches this line.")
+        matches.append(match)
+
+    # A receipt claimed by more than one statement line is not a confident match
+    for claimants in claims.values():
+        if len(claimants) > 1:
+            for match in claimants:
+                match.status = BankStatementLine.REVIEW
+                match.reason = "Several statement lines match the same receipt."
+                match.receipt = None
+    return matches
+
+
+def reconcile_statement(content, file_name="statement.csv", user=None, dry_run=False,
+                        tolerance=DEFAULT_DATE_TOLERANCE_DAYS):
+    """
+    Import a statement, match it and (unless ``dry_run``) verify the
+    confident matches. Returns the saved BankStatementImport.
+    """
+    lines = parse_statement(content)
+    matches = match_lines(lines, ReceiptIndex.unverified(), tolerance)
+
+    with transaction.atomic():
+        confident = [match for match in matches if match.status == BankStatementLine.MATCHED]
+        if confident and not dry_run:
+            results = {
+                result["receiptid"]: result
+                for result in verify_receipts([match.receipt.receiptid for match in confident])
+            }
+            for match in confident:
+                result = results[match.receipt.receiptid]
+                if result["status"] != VERIFIED:
+                    # e.g. a duplicate of an already verified slip
+                    match.status = BankStatementLine.REVIEW
+                    match.reason = result["detail"]
+
+        summary = {status: 0 for status, _ in BankStatementLine.STATUS_CHOICES}
+        for match in matches:
+            summary[match.status] += 1
+        statement = BankStatementImport.objects.create(
+            file_name=file_name, imported_by=user, dry_run=dry_run, line_count=len(lines), summary=summary,
+        )
+        BankStatementLine.objects.bulk_create([
+            BankStatementLine(
+                statement=statement,
+                line_no=match.line.line_no,
+                posted_at=timezone.make_aware(match.line.posted_at),
+                amount=match.line.amount,
+                reference=match.line.reference[:100],
+                description=match.line.description[:255],
+                status=match.status,
+                reason=match.reason[:255],
+                receipt=match.receipt if match.status == BankStatementLine.MATCHED else None,
+                candidate_receipt_ids=[receipt.receiptid for receipt in match.candidates],
+            )
+            for match in matches
+        ])
+    return statement
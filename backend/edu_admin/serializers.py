@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import ZoomOccurrence
 from .models import ZoomWebinar
+from .models import BankStatementImport, BankStatementLine
 
 
 class ZoomWebinarSerializer(serializers.Serializer):
@@ -58,3 +59,18 @@ class ZoomWebinarSerilizer(serializers.ModelSerializer):
     #         raise serializers.ValidationError("Account key is required")
     #     return value
     # serializers.py
+
+
+class BankStatementLineSerializer(serializers.ModelSerializer):
+    receiptid = serializers.CharField(source='receipt.receiptid', read_only=True, default=None)
+
+    class Meta:
+        model = BankStatementLine
+        fields = ['id', 'line_no', 'posted_at', 'amount', 'reference', 'description',
+                  'status', 'reason', 'receiptid', 'candidate_receipt_ids']
+
+
+class BankStatementImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BankStatementImport
+        fields = ['id', 'file_name', 'imported_at', 'dry_run', 'line_count', 'summary']
@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from instructor.models import Class, ClassSchedule, Exam
+from students.calendar_sync import record_change
+from students.models import CalendarChange, Enrollment, Payment
+from students.utils.cache_versions import bump_version
+from .models import ZoomOccurrence, ZoomWebinar
+
+
+@receiver([post_save, post_delete], sender=Payment)
+@receiver([post_save, post_delete], sender=Enrollment)
+@receiver([post_save, post_delete], sender=Class)
+def invalidate_payment_reports(sender, **kwargs):
+    """Cached arrears reports depend on payments, enrollments and class fees."""
+    bump_version("payments")
+
+
+@receiver([post_save, post_delete], sender=Class)
+@receiver([post_save, post_delete], sender=ClassSchedule)
+@receiver([post_save, post_delete], sender=ZoomWebinar)
+def invalidate_class_catalog(sender, **kwargs):
+    """The public class catalog lists classes with their schedules and webinars."""
+    bump_version("catalog")
+
+
+@receiver([post_save, post_delete], sender=ZoomOccurrence)
+@receiver([post_save, post_delete], sender=ZoomWebinar)
+@receiver([post_save, post_delete], sender=Exam)
+@receiver([post_save, post_delete], sender=Enrollment)
+@receiver([post_save, post_delete], sender=Class)
+def invalidate_calendar_feeds(sender, **kwargs):
+    """Cached calendar feeds list sessions and exams of enrolled classes (payments are versioned separately)."""
+    bump_version("calendar")
+
+
+@receiver([post_save, post_delete], sender=ZoomOccurrence)
+def track_occurrence_change(sender, instance, signal, **kwargs):
+    record_change(CalendarChange.OCCURRENCE, instance.pk, webinar_id=instance.webinar_id,
+                  deleted=signal is post_delete)
+
+
+@receiver([post_save, post_delete], sender=Exam)
+def track_exam_change(sender, instance, signal, **kwargs):
+    record_change(CalendarChange.EXAM, instance.pk, class_id=instance.classid_id, deleted=signal is post_delete)
+
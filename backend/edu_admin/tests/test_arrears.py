@@ -0,0 +1,92 @@
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from instructor.models import Class
+from students.enrollment import EnrollmentService
+from students.models import Enrollment, Payment, StudentProfile
+
+User = get_user_model()
+
+
+class ArrearsTests(APITestCase):
+    url = "/edu_admin/payments/arrears/"
+    enrolled_at = timezone.make_aware(datetime(2025, 5, 20))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(User.objects.create_user(username="admin1", password="pass1234", role="admin"))
+        instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        june = {"start_date": date(2025, 6, 1), "end_date": date(2025, 6, 30)}
+        self.chemistry = Class.objects.create(title="Chemistry", description="", fee=1500, instructor=instructor, **june)
+        self.physics = Class.objects.create(title="Physics", description="", fee=2000, instructor=instructor, **june)
+        self.ended = Class.objects.create(title="Biology", description="", fee=900, instructor=instructor,
+                                          start_date=date(2025, 1, 1), end_date=date(2025, 5, 31))
+
+        self.students = []
+        for index, classes in enumerate([(self.chemistry, self.physics), (self.chemistry,), (self.physics, self.ended)]):
+            user = User.objects.create_user(username=f"s{index}", password="pass1234", role="student",
+                                            first_name=f"Student{index}")
+            profile = StudentProfile.objects.create(user=user, mobile="077", nic_no=f"2000000000{index}",
+                                                    address="Jaffna", year_of_al="2026", school_name="JHC")
+            for class_obj in classes:
+                Enrollment.objects.create(stuid=profile, classid=class_obj)
+            self.students.append(profile)
+        Enrollment.objects.update(timestamp=self.enrolled_at)
+
+        # s0 paid 1000 of 3500 in June (plus a failed and an out-of-month payment); s1 paid in full
+        self.pay(self.students[0], 1000, date(2025, 6, 5))
+        self.pay(self.students[0], 2500, date(2025, 6, 6), status="fail")
+        self.pay(self.students[0], 2500, date(2025, 7, 1))
+        self.pay(self.students[1], 1500, date(2025, 6, 10))
+
+    def pay(self, profile, amount, paid_on, status="success"):
+        payment = Payment.objects.create(stuid=profile.user, method="online", amount=amount, status=status)
+        Payment.objects.filter(pk=payment.pk).update(date=paid_on)
+
+    def test_students_in_arrears_with_summary(self):
+        response = self.client.get(self.url, {"month": "2025-06"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        rows = [(r["name"], r["due"], r["paid"], r["outstanding"]) for r in response.data["results"]]
+        self.assertEqual(rows, [
+            ("Student0", "3500.00", "1000.00", "2500.00"),
+            ("Student2", "2000.00", "0.00", "2000.00"),
+        ])
+        self.assertEqual(response.data["results"][0]["classes"], ["Chemistry", "Physics"])
+        self.assertEqual(response.data["summary"], {
+            "students": 2, "total_due": "5500.00", "total_paid": "1000.00", "total_outstanding": "4500.00",
+        })
+
+    def test_pagination_and_class_filter(self):
+        first = self.client.get(self.url, {"month": "2025-06", "page_size": 1}).data
+        second = self.client.get(self.url, {"month": "2025-06", "page_size": 1, "cursor": first["next_cursor"]}).data
+        self.assertEqual([r["name"] for r in first["results"] + second["results"]], ["Student0", "Student2"])
+        self.assertFalse(second["has_more"])
+
+        response = self.client.get(self.url, {"month": "2025-06", "class": self.chemistry.classid})
+        self.assertEqual([r["name"] for r in response.data["results"]], ["Student0"])
+
+    def test_report_is_cached_until_payments_or_enrollments_change(self):
+        self.client.get(self.url, {"month": "2025-06"})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {"month": "2025-06"})
+        self.assertEqual(len(queries), 0)
+
+        self.pay(self.students[2], 2000, date(2025, 6, 20))
+        names = [r["name"] for r in self.client.get(self.url, {"month": "2025-06"}).data["results"]]
+        self.assertEqual(names, ["Student0"])
+
+        EnrollmentService.enroll_many(self.students[1], [self.physics.classid])
+        Enrollment.objects.filter(stuid=self.students[1]).update(timestamp=self.enrolled_at)
+        names = [r["name"] for r in self.client.get(self.url, {"month": "2025-06"}).data["results"]]
+        self.assertEqual(names, ["Student0", "Student1"])
+
+    def test_invalid_month(self):
+        self.assertEqual(self.client.get(self.url, {"month": "June"}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,105 @@
+import csv
+import io
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from instructor.models import Class
+from students.models import Enrollment, OnlinePayment, Payment, ReceiptPayment, StudentProfile
+
+User = get_user_model()
+
+
+class PaymentLedgerTests(APITestCase):
+    url = "/edu_admin/payments/ledger/"
+    export_url = "/edu_admin/payments/ledger/export/"
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username="admin1", password="pass1234", role="admin"))
+        instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        self.chemistry = Class.objects.create(title="Chemistry", description="", fee=1500, instructor=instructor)
+        self.physics = Class.objects.create(title="Physics", description="", fee=1500, instructor=instructor)
+
+        self.today = date.today()
+        self.payments = []
+        for index in range(6):
+            user = User.objects.create_user(
+                username=f"s{index}", password="pass1234", role="student", first_name=f"Student{index}", last_name="K",
+            )
+            profile = StudentProfile.objects.create(
+                user=user, mobile="0770000000", nic_no=f"20000000000{index}", address="Jaffna",
+                year_of_al="2026", school_name="JHC",
+            )
+            method = "online" if index % 2 else "receipt"
+            payment = Payment.objects.create(
+                stuid=user, method=method, amount=1500, status="success" if index < 4 else "pending",
+            )
+            Payment.objects.filter(pk=payment.pk).update(date=self.today - timedelta(days=index))
+            if method == "online":
+                OnlinePayment.objects.create(payid=payment, invoice_no=f"INV-{index}", verified=True,
+                                             class_ids=[self.physics.classid])
+            else:
+                ReceiptPayment.objects.create(payid=payment, image_url="receipts/x.jpg", record_no=f"R{index}",
+                                              class_ids=[self.physics.classid] if index == 4 else None)
+            if index < 2:
+                Enrollment.objects.create(stuid=profile, classid=self.chemistry, payid=payment)
+            self.payments.append(payment)
+
+    def test_rows_are_built_in_one_query_and_paginated(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"page_size": 4})
+        self.assertEqual(len(queries), 1)
+        self.assertEqual([r["payid"] for r in response.data["results"]], [p.payid for p in self.payments[:4]])
+
+        first = response.data["results"][0]
+        self.assertEqual(first["studentName"], "Student0 K")
+        self.assertEqual(first["studentId"], StudentProfile.objects.get(user__username="s0").stuid)
+        self.assertEqual(first["classes"], "Chemistry")
+        self.assertEqual(first["record_no"], "R0")
+        self.assertFalse(first["verified"])
+        self.assertEqual(response.data["results"][1]["invoice_no"], "INV-1")
+
+        response = self.client.get(self.url, {"page_size": 4, "cursor": response.data["next_cursor"]})
+        self.assertEqual([r["payid"] for r in response.data["results"]], [p.payid for p in self.payments[4:]])
+        self.assertFalse(response.data["has_more"])
+
+    def test_filters(self):
+        def payids(**params):
+            return [r["payid"] for r in self.client.get(self.url, params).data["results"]]
+
+        self.assertEqual(payids(status="pending"), [p.payid for p in self.payments[4:]])
+        self.assertEqual(payids(method="online", status="success"), [self.payments[1].payid, self.payments[3].payid])
+        self.assertEqual(
+            payids(date_from=(self.today - timedelta(days=3)).isoformat(), date_to=(self.today - timedelta(days=2)).isoformat()),
+            [self.payments[2].payid, self.payments[3].payid],
+        )
+        self.assertEqual(payids(**{"class": self.chemistry.classid}), [self.payments[0].payid, self.payments[1].payid])
+        # Enrolled, paid online for, or uploaded a receipt for Physics
+        self.assertEqual(
+            payids(**{"class": self.physics.classid}),
+            [self.payments[1].payid, self.payments[3].payid, self.payments[4].payid, self.payments[5].payid],
+        )
+
+    def test_invalid_filters_are_rejected(self):
+        self.assertEqual(self.client.get(self.url, {"status": "refunded"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {"date_from": "yesterday"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.export_url, {"method": "cash"}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_csv_export_streams_filtered_rows(self):
+        response = self.client.get(self.export_url, {"status": "success"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual([row["payid"] for row in rows], [p.payid for p in self.payments[:4]])
+        self.assertEqual(rows[0]["studentName"], "Student0 K")
+        self.assertEqual(rows[0]["classes"], "Chemistry")
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(User.objects.get(username="s0"))
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(self.export_url).status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,157 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from instructor.models import Class
+from students.models import Enrollment, Payment, ReceiptPayment, StudentProfile
+
+User = get_user_model()
+
+
+class ReceiptVerifyNearDuplicateTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin1", password="pass1234", role="admin")
+        self.student = User.objects.create_user(username="student1", password="pass1234", role="student")
+        self.client.force_authenticate(self.admin)
+
+    def make_receipt(self, phash, verified=False, record_no="1"):
+        payment = Payment.objects.create(stuid=self.student, method="receipt", amount=100)
+        return ReceiptPayment.objects.create(
+            payid=payment, image_url="receipts/x.jpg", phash=phash, verified=verified,
+            record_no=record_no, paid_amount="100",
+        )
+
+    def verify(self, receipt, **data):
+        return self.client.post(f"/edu_admin/receipt-payments/{receipt.receiptid}/verify/", data, format="json")
+
+    def test_near_duplicate_of_verified_receipt_is_rejected(self):
+        verified = self.make_receipt(0b1011, verified=True, record_no="1")
+        receipt = self.make_receipt(0b0011, record_no="2")
+
+        response = self.verify(receipt)
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["near_duplicates"], [{"receiptid": verified.receiptid, "distance": 1}])
+        receipt.refresh_from_db()
+        self.assertFalse(receipt.verified)
+
+    def test_force_overrides_near_duplicate_check(self):
+        self.make_receipt(0b1011, verified=True, record_no="1")
+        receipt = self.make_receipt(0b0011, record_no="2")
+
+        self.assertEqual(self.verify(receipt, force="false").status_code, status.HTTP_409_CONFLICT)
+        response = self.verify(receipt, force=True)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        receipt.refresh_from_db()
+        self.assertTrue(receipt.verified)
+
+    def test_distinct_image_verifies(self):
+        self.make_receipt(0, verified=True, record_no="1")
+        receipt = self.make_receipt(-1, record_no="2")
+
+        self.assertEqual(self.verify(receipt).status_code, status.HTTP_200_OK)
+
+    def test_near_duplicates_listing(self):
+        first = self.make_receipt(0b1011)
+        receipt = self.make_receipt(0b0011)
+
+        response = self.client.get(f"/edu_admin/receipt-payments/{receipt.receiptid}/near-duplicates/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(r["receiptid"], r["distance"]) for r in response.data], [(first.receiptid, 1)])
+
+
+class ReceiptBulkVerifyTests(APITestCase):
+    url = "/edu_admin/receipt-payments/verify-bulk/"
+
+    def setUp(self):
+        self.admin = User.objects.create_user(username="admin1", password="pass1234", role="admin")
+        self.student = User.objects.create_user(username="student1", password="pass1234", role="student")
+        self.client.force_authenticate(self.admin)
+
+    def make_receipt(self, record_no, phash=None, verified=False, paid_amount="1500.00"):
+        payment = Payment.objects.create(stuid=self.student, method="receipt", amount=0)
+        return ReceiptPayment.objects.create(
+            payid=payment, image_url="receipts/x.jpg", record_no=record_no, location="BOC MANNAR",
+            paid_amount=paid_amount, phash=phash, verified=verified,
+        )
+
+    def verify_bulk(self, receipts, **data):
+        receipt_ids = [r if isinstance(r, str) else r.receiptid for r in receipts]
+        return self.client.post(self.url, {"receipt_ids": receipt_ids, **data}, format="json")
+
+    def test_per_item_results(self):
+        self.make_receipt("100", phash=0b1111, verified=True)
+        ok = self.make_receipt("1", phash=-1)
+        duplicate = self.make_receipt("100", phash=1 << 40)
+        near = self.make_receipt("2", phash=0b0111)
+        same_batch = self.make_receipt("1", phash=1 << 50)
+        done = self.make_receipt("3", verified=True)
+
+        response = self.verify_bulk([ok, duplicate, near, same_batch, done, "RCP-MISSING"])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        statuses = [(r["receiptid"], r["status"]) for r in response.data["results"]]
+        self.assertEqual(statuses, [
+            (ok.receiptid, "verified"),
+            (duplicate.receiptid, "duplicate"),
+            (near.receiptid, "near_duplicate"),
+            (same_batch.receiptid, "duplicate"),
+            (done.receiptid, "already_verified"),
+            ("RCP-MISSING", "not_found"),
+        ])
+        self.assertEqual(response.data["summary"]["duplicate"], 2)
+
+        ok.refresh_from_db()
+        payment = Payment.objects.get(pk=ok.payid_id)
+        self.assertTrue(ok.verified)
+        self.assertEqual(payment.status, "success")
+        self.assertEqual(str(payment.amount), "1500.00")
+        self.assertFalse(ReceiptPayment.objects.get(pk=duplicate.pk).verified)
+
+    def test_force_skips_near_duplicate_check(self):
+        self.make_receipt("100", phash=0b1111, verified=True)
+        near = self.make_receipt("2", phash=0b0111)
+
+        response = self.verify_bulk([near], force="false")
+        self.assertEqual(response.data["results"][0]["status"], "near_duplicate")
+
+        response = self.verify_bulk([near], force=True)
+        self.assertEqual(response.data["results"][0]["status"], "verified")
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        rng = random.Random(3)
+
+        def count_queries(size, offset):
+            receipts = [self.make_receipt(str(offset + i), phash=rng.getrandbits(63)) for i in range(size)]
+            with CaptureQueriesContext(connection) as context:
+                response = self.verify_bulk(receipts)
+            self.assertEqual(response.data["summary"], {"verified": size})
+            return len(context.captured_queries)
+
+        self.assertEqual(count_queries(2, 0), count_queries(8, 100))
+
+    def test_verified_receipts_enroll_the_student(self):
+        profile = StudentProfile.objects.create(
+            user=self.student, mobile="0770000000", nic_no="200000000001", address="Jaffna",
+            year_of_al="2026", school_name="JHC",
+        )
+        instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        chemistry = Class.objects.create(title="Chemistry", description="", fee=1500, instructor=instructor)
+        receipt = self.make_receipt("1")
+        ReceiptPayment.objects.filter(pk=receipt.pk).update(class_ids=[chemistry.classid])
+        rejected = self.make_receipt("1")
+
+        self.verify_bulk([receipt, rejected])
+
+        enrollment = Enrollment.objects.get(stuid=profile)
+        self.assertEqual((enrollment.classid, enrollment.payid_id), (chemistry, receipt.payid_id))
+
+    def test_rejects_invalid_payload(self):
+        self.assertEqual(self.client.post(self.url, {"receipt_ids": "RCP-1"}, format="json").status_code, 400)
+        self.assertEqual(self.client.post(self.url, {}, format="json").status_code, 400)
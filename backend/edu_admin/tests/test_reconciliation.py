@@ -0,0 +1,161 @@
+import shutil
+import tempfile
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from edu_admin.models import BankStatementLine
+from edu_admin.reconciliation import StatementError, normalize_reference, parse_statement, reconcile_statement
+from students.models import Payment, ReceiptPayment
+
+User = get_user_model()
+
+STATEMENT = """Posting Date,Time,Reference,Description,Credit
+25/05/2025,08:47,0008391,CRM DEPOSIT MANNAR,"2,000.00"
+12/06/2025,20:46,830,CDM NIVITHIGALA,40000.00
+14/06/2025,10:00,,CASH DEPOSIT,1500.00
+15/06/2025,11:00,777,TRANSFER,999.00
+16/06/2025,09:00,,SERVICE CHARGE,-25.00
+"""
+
+
+class ReconciliationFixtureMixin:
+    def make_receipt(self, record_no, amount, paid, verified=False):
+        student = User.objects.get_or_create(username="student1", defaults={"role": "student"})[0]
+        payment = Payment.objects.create(stuid=student, method="receipt", amount=0)
+        return ReceiptPayment.objects.create(
+            payid=payment, image_url="receipts/x.jpg", record_no=record_no, paid_amount=amount,
+            paid_date_time=timezone.make_aware(datetime.fromisoformat(paid)), location=f"BR {record_no}",
+            verified=verified,
+        )
+
+
+class StatementParsingTests(TestCase):
+    def test_parses_credits_and_skips_debits(self):
+        lines = parse_statement(STATEMENT.encode())
+        self.assertEqual([line.line_no for line in lines], [2, 3, 4, 5])
+        self.assertEqual(str(lines[0].amount), "2000.00")
+        self.assertEqual(lines[0].posted_at, datetime(2025, 5, 25, 8, 47))
+        self.assertEqual(lines[0].reference, "0008391")
+
+    def test_missing_columns_and_bad_rows_are_reported(self):
+        with self.assertRaisesMessage(StatementError, "amount"):
+            parse_statement("Date,Reference\n2025-06-01,1\n")
+        with self.assertRaisesMessage(StatementError, "line(s) 3"):
+            parse_statement("Date,Amount\n2025-06-01,10\nsoon,20\n")
+
+    def test_encodings_and_malformed_files(self):
+        lines = parse_statement("Date,Amount,Description\n2025-06-01,10,CAFÉ\n".encode("cp1252"))
+        self.assertEqual(lines[0].description, "CAFÉ")
+        with self.assertRaisesMessage(StatementError, "encoded"):
+            parse_statement(b"Date,Amount\n2025-06-01,\x81\x8d\n")
+        with self.assertRaisesMessage(StatementError, "valid CSV"):
+            parse_statement("Date,Amount\n2025-06-01," + "1" * 200_000 + "\n")
+
+    def test_reference_normalisation(self):
+        self.assertEqual(normalize_reference("0008391"), normalize_reference("8391"))
+        self.assertEqual(normalize_reference("Ref# 00-12"), "12")
+
+
+class ReconcileStatementTests(ReconciliationFixtureMixin, TestCase):
+    def setUp(self):
+        self.boc = self.make_receipt("8391", "2000.00", "2025-05-25T08:47:00")
+        self.late = self.make_receipt("830", "40000.00", "2025-06-13T09:00:00")  # posted a day later
+        self.no_ref = self.make_receipt(None, "1500.00", "2025-06-14T09:30:00")
+        self.wrong_amount = self.make_receipt("777", "1000.00", "2025-06-15T11:00:00")
+
+    def test_confident_matches_are_verified_and_the_rest_left_for_review(self):
+        statement = reconcile_statement(STATEMENT)
+
+        self.assertEqual(statement.summary, {"matched": 2, "review": 1, "unmatched": 1})
+        lines = {line.line_no: line for line in statement.lines.all()}
+        self.assertEqual(lines[2].receipt, self.boc)
+        self.assertEqual(lines[3].receipt, self.late)
+        self.assertEqual(lines[4].status, BankStatementLine.REVIEW)
+        self.assertEqual(lines[4].candidate_receipt_ids, [self.no_ref.receiptid])
+        self.assertEqual(lines[5].status, BankStatementLine.UNMATCHED)
+
+        self.assertEqual(
+            set(ReceiptPayment.objects.filter(verified=True).values_list("pk", flat=True)), {self.boc.pk, self.late.pk}
+        )
+        self.assertEqual(Payment.objects.get(pk=self.boc.payid_id).status, "success")
+
+    def test_dry_run_verifies_nothing(self):
+        statement = reconcile_statement(STATEMENT, dry_run=True)
+        self.assertEqual(statement.summary["matched"], 2)
+        self.assertFalse(ReceiptPayment.objects.filter(verified=True).exists())
+
+    def test_receipt_claimed_by_two_lines_needs_review(self):
+        statement = reconcile_statement(STATEMENT + "25/05/2025,09:00,8391,CRM DEPOSIT,2000.00\n")
+        lines = statement.lines.filter(reference__endswith="8391")
+        self.assertEqual(set(lines.values_list("status", flat=True)), {BankStatementLine.REVIEW})
+        self.assertFalse(ReceiptPayment.objects.get(pk=self.boc.pk).verified)
+
+    def test_duplicate_of_verified_receipt_goes_to_review(self):
+        original = self.make_receipt("8391", "2000.00", "2025-05-25T08:47:00", verified=True)
+        ReceiptPayment.objects.filter(pk=self.boc.pk).update(location=original.location)
+
+        statement = reconcile_statement(STATEMENT)
+
+        line = statement.lines.get(line_no=2)
+        self.assertEqual(line.status, BankStatementLine.REVIEW)
+        self.assertIn("Duplicate", line.reason)
+
+    def test_query_count_does_not_grow_with_statement_size(self):
+        def count(extra_lines):
+            rows = "".join(f"01/01/2024,10:00,{9000 + i},X,{100 + i}.00\n" for i in range(extra_lines))
+            with CaptureQueriesContext(connection) as context:
+                reconcile_statement(STATEMENT + rows, dry_run=True)
+            return len(context.captured_queries)
+
+        self.assertEqual(count(1), count(50))
+
+
+class ReconciliationApiTests(ReconciliationFixtureMixin, APITestCase):
+    url = "/edu_admin/payments/reconciliation/"
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username="admin1", password="pass1234", role="admin"))
+        self.receipt = self.make_receipt("8391", "2000.00", "2025-05-25T08:47:00")
+
+    def upload(self, content, **data):
+        statement = SimpleUploadedFile("statement.csv", content.encode(), content_type="text/csv")
+        return self.client.post(self.url, {"file": statement, **data}, format="multipart")
+
+    def test_upload_returns_summary_and_review_list(self):
+        response = self.upload(STATEMENT)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["summary"]["matched"], 1)
+        self.assertEqual(len(response.data["review"]), 3)
+        self.assertTrue(ReceiptPayment.objects.get(pk=self.receipt.pk).verified)
+
+        lines = self.client.get(f"{self.url}{response.data['id']}/", {"status": "matched"}).data["lines"]
+        self.assertEqual([line["receiptid"] for line in lines], [self.receipt.receiptid])
+
+    def test_invalid_statement(self):
+        self.assertEqual(self.upload("Date,Reference\n").status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.post(self.url, {}, format="multipart").status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ReconcileCommandTests(ReconciliationFixtureMixin, TestCase):
+    def test_command_reports_summary(self):
+        self.make_receipt("8391", "2000.00", "2025-05-25T08:47:00")
+        directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, directory)
+        path = directory / "statement.csv"
+        path.write_text(STATEMENT)
+
+        out = StringIO()
+        call_command("reconcile_bank_statement", str(path), "--dry-run", stdout=out)
+        self.assertIn("1 would be verified, 0 to review, 3 unmatched", out.getvalue())
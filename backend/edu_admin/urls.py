@@ -3,10 +3,13 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     CreateZoomWebinarView, ListZoomWebinarsView, SyncZoomWebinarsView, WebinarListAPIView, ZoomAccountsListView,
     CreateClassWithWebinarView, ClassListView, StudentListView, PaymentListView,
+    PaymentLedgerView, PaymentLedgerExportView, BankStatementReconciliationView, BankStatementLinesView,
+    ArrearsView,
     ReceiptPaymentAdminViewSet, admin_get_chat_with_student, admin_list_students_with_chats, admin_send_message_to_student, mark_messages_read,
     ComprehensiveWebinarSyncView, WebinarSyncStatusView, CreateClassFromWebinarView,
     UpdateClassView, DashboardStatsView, ComprehensiveReportsView, admin_test,
-    admin_get_notifications, admin_create_notification, admin_delete_notification
+    admin_get_notifications, admin_create_notification, admin_delete_notification,
+    ocr_cache_stats, ocr_backend_metrics
 )
 
 
@@ -27,6 +30,11 @@ urlpatterns = [
     path("classes/<int:class_id>/update/", UpdateClassView.as_view(), name="update_class"),
     path('students/', StudentListView.as_view(), name='student-list'),
     path("payments/", PaymentListView.as_view(), name="payment-list"),
+    path("payments/ledger/", PaymentLedgerView.as_view(), name="payment-ledger"),
+    path("payments/ledger/export/", PaymentLedgerExportView.as_view(), name="payment-ledger-export"),
+    path("payments/arrears/", ArrearsView.as_view(), name="payment-arrears"),
+    path("payments/reconciliation/", BankStatementReconciliationView.as_view(), name="bank-reconciliation"),
+    path("payments/reconciliation/<int:statement_id>/", BankStatementLinesView.as_view(), name="bank-reconciliation-lines"),
     path('chat/admin/students/', admin_list_students_with_chats, name='admin-list-students-with-chats'),
     path('chat/admin/<int:student_id>/', admin_get_chat_with_student, name='admin-get-chat-with-student'),
     path('chat/admin/<int:student_id>/send/', admin_send_message_to_student, name='admin-send-message-to-student'),
@@ -40,5 +48,9 @@ urlpatterns = [
     path('notifications/create/', admin_create_notification, name='admin-create-notification'),
     path('notifications/<int:notification_id>/delete/', admin_delete_notification, name='admin-delete-notification'),
 
+    # Receipt OCR
+    path('ocr/cache-stats/', ocr_cache_stats, name='ocr-cache-stats'),
+    path('ocr/backend-metrics/', ocr_backend_metrics, name='ocr-backend-metrics'),
+
     path("", include(router.urls)),  # <-- include router URLs here
 ]
\ No newline at end of file
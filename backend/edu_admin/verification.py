@@ -0,0 +1,176 @@
+"""
+Bulk receipt verification for the admin review queue.
+
+``verify_receipts`` applies the same rules as
+``ReceiptPaymentAdminViewSet.verify`` to a whole batch with a fixed number of
+queries: one locked fetch of the receipts and their payments, one grouped
+query for exact duplicates (same record number, date and location), one for
+perceptual near-duplicates, one ``bulk_update`` each for receipts and
+payments and a batched enrollment of the uploaders in the classes they paid
+for, all in a single transaction.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from students.calendar_store import refresh_payments
+from students.enrollment import EnrollmentService
+from students.models import Payment, ReceiptPayment
+from students.ocr.duplicates import find_near_duplicates_many
+from students.ocr.phash import hamming
+from students.utils.cache_versions import bump_version
+
+MAX_BULK_VERIFY = 500
+
+VERIFIED = "verified"
+ALREADY_VERIFIED = "already_verified"
+DUPLICATE = "duplicate"
+NEAR_DUPLICATE = "near_duplicate"
+NOT_FOUND = "not_found"
+INVALID_AMOUNT = "invalid_amount"
+
+
+def _duplicate_key(receipt):
+    return (receipt.record_no, receipt.paid_date_time, receipt.location)
+
+
+def _key_filter(keys):
+    # Same semantics as the single verify filter (None matches NULL)
+    condition = Q()
+    for record_no, paid_date_time, location in keys:
+        condition |= Q(record_no=record_no, paid_date_time=paid_date_time, location=location)
+    return condition
+
+
+def enroll_receipt_students(receipts):
+    """Enroll the uploader of each verified receipt in the classes they paid for."""
+    requests = []
+    for receipt in receipts:
+        student = getattr(receipt.payid.stuid, "student_profile", None)
+        if receipt.class_ids and student is not None:
+            requests.append((student, receipt.class_ids, receipt.payid))
+    return EnrollmentService.enroll_batch(requests)
+
+
+def verify_receipts(receipt_ids, force=False):
+    """
+    Verify the given receipts and mark their payments as successful.
+
+    Returns one result dict per requested id, in request order, with a
+    ``status`` of verified, already_verified, duplicate, near_duplicate,
+    invalid_amount or not_found. ``force`` skips the near-duplicate check.
+    """
+    receipt_ids = list(dict.fromkeys(receipt_ids))  # de-duplicate, keep order
+    results = {}
+
+    with transaction.atomic():
+        receipts = {
+            receipt.receiptid: receipt
+            for receipt in ReceiptPayment.objects.select_related("payid__stuid__student_profile")
+            .select_for_update(of=("self", "payid"))
+            .filter(receiptid__in=receipt_ids)
+        }
+        pending = []
+        for receiptid in receipt_ids:
+            receipt = receipts.get(receiptid)
+            if receipt is None:
+                results[receiptid] = {"status": NOT_FOUND, "detail": "Receipt not found."}
+            elif receipt.verified:
+                results[receiptid] = {"status": ALREADY_VERIFIED, "detail": "Receipt is already verified."}
+            else:
+                pending.append(receipt)
+
+        # Exact duplicates among already verified receipts, in one query
+        verified_keys = {}
+        if pending:
+            keys = {_duplicate_key(receipt) for receipt in pending}
+            matches = (
+                ReceiptPayment.objects.filter(verified=True)
+                .filter(_key_filter(keys))
+                .exclude(pk__in=[receipt.pk for receipt in pending])
+                .values_list("record_no", "paid_date_time", "location", "receiptid")
+            )
+            for record_no, paid_date_time, location, receiptid in matches:
+                verified_keys.setdefault((record_no, paid_date_time, location), receiptid)
+
+        near_duplicates = {}
+        if pending and not force:
+            near_duplicates = find_near_duplicates_many(
+                [receipt.phash for receipt in pending],
+                ReceiptPayment.objects.filter(verified=True).exclude(pk__in=[receipt.pk for receipt in pending]),
+            )
+
+        to_verify, payments = [], []
+        verified_hashes = []
+        for receipt in pending:
+            key = _duplicate_key(receipt)
+            if key in verified_keys:
+                results[receipt.receiptid] = {
+                    "status": DUPLICATE,
+                    "detail": "Duplicate receipt found with same record number, date, and location.",
+                    "duplicate_of": verified_keys[key],
+                }
+                continue
+
+            near = near_duplicates.get(receipt.phash)
+            if near:
+                results[receipt.receiptid] = {
+                    "status": NEAR_DUPLICATE,
+                    "detail": "Receipt image closely matches an already verified receipt.",
+                    "near_duplicates": [
+                        {"receiptid": match.receiptid, "distance": distance} for match, distance in near
+                    ],
+                }
+                continue
+
+            if not force and receipt.phash is not None:
+                # Near-duplicates of receipts verified earlier in this batch
+                batch_match = next(
+                    (other for other, phash in verified_hashes
+                     if hamming(phash, receipt.phash) <= settings.RECEIPT_PHASH_MAX_DISTANCE),
+                    None,
+                )
+                if batch_match:
+                    results[receipt.receiptid] = {
+                        "status": NEAR_DUPLICATE,
+                        "detail": "Receipt image closely matches another receipt in this batch.",
+                        "near_duplicates": [{"receiptid": batch_match}],
+                    }
+                    continue
+
+            try:
+                amount = Decimal(str(receipt.paid_amount or "0"))
+            except InvalidOperation:
+                results[receipt.receiptid] = {
+                    "status": INVALID_AMOUNT,
+                    "detail": f"Could not parse paid amount {receipt.paid_amount!r}.",
+                }
+                continue
+
+            # Later receipts in the same batch with this key are duplicates
+            verified_keys[key] = receipt.receiptid
+            if receipt.phash is not None:
+                verified_hashes.append((receipt.receiptid, receipt.phash))
+
+            receipt.verified = True
+            to_verify.append(receipt)
+            payment = receipt.payid
+            payment.amount = amount
+            if payment.status not in ["success", "completed"]:
+                payment.status = "success"
+            payments.append(payment)
+            results[receipt.receiptid] = {
+                "status": VERIFIED,
+                "detail": "Receipt verified, amount synced, and payment marked as completed.",
+            }
+
+        ReceiptPayment.objects.bulk_update(to_verify, ["verified"])
+        Payment.objects.bulk_update(payments, ["amount", "status"])
+        if payments:
+            bump_version("payments")  # bulk_update sends no post_save
+            refresh_payments([payment.pk for payment in payments])
+        enroll_receipt_students(to_verify)
+
+    return [{"receiptid": receiptid, **results[receiptid]} for receiptid in receipt_ids]
@@ -8,7 +8,7 @@ from .zoom_api import ZoomAPIClient
 import traceback
 from .services import ZoomWebinarService
 from students.models import ChatRoom, Message
-from students.serializers import MessageSerializer
+from students.serializers import MessageRows, MessageSerializer
 from students.models import Notification
 from students.serializers import NotificationSerializer
 from accounts.models import User
@@ -18,7 +18,7 @@ from rest_framework.decorators import api_view, action
 from django.shortcuts import get_object_or_404, render
 from decimal import Decimal
 from instructor.models import Class, ClassSchedule
-from instructor.serializers import ClassSerializer
+from instructor.serializers import ClassRows, ClassSerializer
 from .serializers import ZoomWebinarSerializer, ZoomWebinarListSerializer, ZoomOccurrenceSerializer, ZoomWebinarSerilizer
 from django.contrib.auth import get_user_model
 from accounts.serializers import UserSerializer
@@ -45,6 +45,18 @@ def admin_test(request):
     }, status=status.HTTP_200_OK)
 from students.models import Payment, ReceiptPayment
 from students.serializers import PaymentSerializer, ReceiptPaymentSerializer
+from students.ocr.duplicates import find_near_duplicates
+from .verification import MAX_BULK_VERIFY, enroll_receipt_students, verify_receipts
+from .models import BankStatementImport, BankStatementLine
+from .reconciliation import DEFAULT_DATE_TOLERANCE_DAYS, StatementError, reconcile_statement
+from .serializers import BankStatementImportSerializer, BankStatementLineSerializer
+from rest_framework.parsers import FormParser, MultiPartParser
+from .arrears import ArrearsError, arrears_report, parse_month
+from .ledger import LEDGER_COLUMNS, LedgerFilterError, ledger_queryset, ledger_row
+from students.utils.pagination import InvalidCursor, KeysetPage, parse_page_size
+import csv
+from datetime import date
+from django.http import StreamingHttpResponse
 from django.conf import settings
 from datetime import datetime, timedelta
 import pytz
@@ -236,7 +248,7 @@ class CreateClassWithWebinarView(APIView):
                     )
 
             # ✅ Serialize and respond - refetch with relations
-            created_class = Class.objects.select_related('instructor').prefetch_related('schedules').get(id=new_class.id)
+            created_class = Class.objects.select_related('instructor').get(id=new_class.id)
             serializer = ClassSerializer(created_class)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -248,9 +260,8 @@ class ClassListView(APIView):
     permission_classes = [IsAuthenticated]  # or IsAdminUser if needed
 
     def get(self, request):
-        classes = Class.objects.select_related('instructor').prefetch_related('schedules').all().order_by('-start_date')
-        serializer = ClassSerializer(classes, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        classes = Class.objects.all().order_by('-start_date')
+        return Response(ClassRows().serialize(classes), status=status.HTTP_200_OK)
 
 class StudentListView(APIView):
     permission_classes = [IsAuthenticated]
@@ -268,6 +279,137 @@ class PaymentListView(APIView):
         serializer = PaymentSerializer(payments, many=True)
         return Response(serializer.data)
         
+class PaymentLedgerView(APIView):
+    """
+    Filterable payment ledger, newest first. Query params: date_from, date_to,
+    status, method, class (see edu_admin.ledger), page_size and cursor.
+    """
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    PAGE_SIZE = 100
+    MAX_PAGE_SIZE = 500
+
+    def get(self, request):
+        try:
+            page = KeysetPage(
+                ledger_queryset(request.query_params), ("date", "id"), (date.fromisoformat, int),
+                cursor=request.query_params.get("cursor"),
+                page_size=parse_page_size(request.query_params.get("page_size"), self.PAGE_SIZE, self.MAX_PAGE_SIZE),
+            )
+        except (LedgerFilterError, InvalidCursor) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            "results": [ledger_row(row) for row in page.rows],
+            "next_cursor": page.next_cursor,
+            "has_more": page.has_more,
+        })
+
+
+class ArrearsView(APIView):
+    """
+    Students whose class fees for a month exceed their successful payments.
+    Query params: month (YYYY-MM, default current), class, page_size, cursor.
+    """
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    def get(self, request):
+        params = request.query_params
+        try:
+            report = arrears_report(
+                parse_month(params.get("month")),
+                class_code=params.get("class"),
+                cursor=params.get("cursor"),
+                page_size=parse_page_size(params.get("page_size"), self.PAGE_SIZE, self.MAX_PAGE_SIZE),
+            )
+        except (ArrearsError, InvalidCursor) as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(report)
+
+
+class _Echo:
+    """File-like object whose write() hands the CSV line back to the generator."""
+
+    def write(self, value):
+        return value
+
+
+class PaymentLedgerExportView(APIView):
+    """
+    The filtered ledger as a streamed CSV. Rows are read with a server-side
+    cursor in chunks, so memory use does not grow with the export size.
+    """
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    CHUNK_SIZE = 2000
+
+    def get(self, request):
+        try:
+            payments = ledger_queryset(request.query_params).order_by("-date", "-id")
+        except LedgerFilterError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        def rows():
+            writer = csv.writer(_Echo())
+            yield writer.writerow(LEDGER_COLUMNS.keys())
+            for values in payments.iterator(chunk_size=self.CHUNK_SIZE):
+                yield writer.writerow(ledger_row(values).values())
+
+        response = StreamingHttpResponse(rows(), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="payments-{date.today().isoformat()}.csv"'
+        return response
+
+
+class BankStatementReconciliationView(APIView):
+    """
+    POST a bank statement CSV (multipart "file", optional "dry_run" and
+    "tolerance_days") to match it against unverified receipts. Confident
+    matches are verified; the response lists the lines left for review.
+    """
+    permission_classes = [IsAuthenticated, IsAdminRole]
+    parser_classes = [MultiPartParser, FormParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if not upload:
+            return Response({"error": "No statement file provided"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            tolerance = int(request.data.get("tolerance_days", DEFAULT_DATE_TOLERANCE_DAYS))
+        except (TypeError, ValueError):
+            return Response({"error": "tolerance_days must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+        dry_run = str(request.data.get("dry_run", "")).lower() in ("1", "true", "yes")
+
+        try:
+            statement = reconcile_statement(
+                upload.read(), file_name=upload.name, user=request.user, dry_run=dry_run, tolerance=max(0, tolerance),
+            )
+        except StatementError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        review = statement.lines.exclude(status=BankStatementLine.MATCHED).select_related("receipt")
+        return Response({
+            **BankStatementImportSerializer(statement).data,
+            "review": BankStatementLineSerializer(review, many=True).data,
+        }, status=status.HTTP_201_CREATED)
+
+
+class BankStatementLinesView(APIView):
+    """Lines of an imported statement, optionally filtered by ?status=matched|review|unmatched."""
+    permission_classes = [IsAuthenticated, IsAdminRole]
+
+    def get(self, request, statement_id):
+        statement = get_object_or_404(BankStatementImport, pk=statement_id)
+        lines = statement.lines.select_related("receipt")
+        if request.query_params.get("status"):
+            lines = lines.filter(status=request.query_params["status"])
+        return Response({
+            **BankStatementImportSerializer(statement).data,
+            "lines": BankStatementLineSerializer(lines, many=True).data,
+        })
+
+
 class ReceiptPaymentAdminViewSet(viewsets.ModelViewSet):
     queryset = ReceiptPayment.objects.select_related("payid", "payid__stuid")
     serializer_class = ReceiptPaymentSerializer
@@ -307,6 +449,24 @@ class ReceiptPaymentAdminViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_409_CONFLICT
             )
 
+        # 🔍 Near-duplicate image check (re-cropped / re-compressed copies of a verified slip)
+        if str(request.data.get("force", "")).lower() not in ("1", "true", "yes"):
+            near_duplicates = find_near_duplicates(
+                receipt.phash, ReceiptPayment.objects.filter(verified=True).exclude(pk=receipt.pk)
+            )
+            if near_duplicates:
+                return Response(
+                    {
+                        "detail": "Receipt image closely matches an already verified receipt "
+                                  f"({near_duplicates[0][0].receiptid}). Verify again with force=true to override.",
+                        "near_duplicates": [
+                            {"receiptid": match.receiptid, "distance": distance}
+                            for match, distance in near_duplicates
+                        ],
+                    },
+                    status=status.HTTP_409_CONFLICT
+                )
+
         # ✅ Mark as verified
         receipt.verified = True
         receipt.save(update_fields=["verified"])
@@ -328,10 +488,46 @@ class ReceiptPaymentAdminViewSet(viewsets.ModelViewSet):
         if updated_fields:
             payment.save(update_fields=updated_fields)
 
+        enroll_receipt_students([receipt])
+
         return Response({
             "detail": "Receipt verified, amount synced, and payment marked as completed."
         })
 
+    @action(detail=False, methods=["post"], url_path="verify-bulk")
+    def verify_bulk(self, request):
+        """
+        Verify many receipts in one transaction. Body: {"receipt_ids": [...],
+        "force": false}. Returns a result per receipt id.
+        """
+        receipt_ids = request.data.get("receipt_ids")
+        if not isinstance(receipt_ids, list) or not receipt_ids:
+            return Response({"detail": "receipt_ids must be a non-empty list."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(receipt_ids) > MAX_BULK_VERIFY:
+            return Response(
+                {"detail": f"At most {MAX_BULK_VERIFY} receipts can be verified per request."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        force = str(request.data.get("force", "")).lower() in ("1", "true", "yes")
+        results = verify_receipts([str(receipt_id) for receipt_id in receipt_ids], force=force)
+        summary = {}
+        for result in results:
+            summary[result["status"]] = summary.get(result["status"], 0) + 1
+        return Response({"summary": summary, "results": results})
+
+    @action(detail=True, methods=["get"], url_path="near-duplicates")
+    def near_duplicates(self, request, receiptid=None):
+        """Receipts whose images are perceptually close to this one."""
+        receipt = self.get_object()
+        matches = find_near_duplicates(
+            receipt.phash, self.get_queryset().exclude(pk=receipt.pk)
+        )
+        return Response([
+            {**ReceiptPaymentSerializer(match).data, "distance": distance}
+            for match, distance in matches
+        ])
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def admin_list_students_with_chats(request):
@@ -393,8 +589,7 @@ def admin_get_chat_with_student(request, student_id):
     
     # Get actual messages from the chat room
     messages = Message.objects.filter(chat_room=chat_room).order_by('created_at')
-    serializer = MessageSerializer(messages, many=True)
-    return Response(serializer.data)
+    return Response(MessageRows().serialize(messages))
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -564,7 +759,6 @@ class CreateClassFromWebinarView(APIView):
             new_class = service._create_class_from_webinar(webinar)
             
             if new_class:
-                from instructor.serializers import ClassSerializer
                 serializer = ClassSerializer(new_class)
                 return Response({
                     'message': 'Class created successfully',
@@ -975,3 +1169,25 @@ def admin_delete_notification(request, notification_id):
             {"error": f"Failed to delete notification: {str(e)}"}, 
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
+
+
+from students.ocr.cache import cache_stats
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminRole])
+def ocr_cache_stats(request):
+    """
+    Hit/miss counters for the receipt OCR result cache
+    """
+    return Response(cache_stats(), status=status.HTTP_200_OK)
+
+
+from students.ocr.backends import backend_metrics
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsAdminRole])
+def ocr_backend_metrics(request):
+    """
+    Per-backend OCR latency metrics for this process
+    """
+    return Response(backend_metrics(), status=status.HTTP_200_OK)
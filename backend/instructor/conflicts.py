@@ -0,0 +1,185 @@
+"""
+Schedule conflict detection for enrollments and exams.
+
+Every commitment is reduced to a ``Slot``: a span of minutes in the week
+(Monday 00:00 is minute 0) plus the dates it applies between. A weekly
+``ClassSchedule`` row covers its class's ``start_date``..``end_date``; an
+exam covers its own date. A slot running past Sunday midnight is split.
+
+Conflicts are found at class level, not per student: the slots of every
+class the affected students attend are loaded once (n slots, however many
+students share them), and a sorted sweep reports each overlapping pair of
+proposed and existing slots in O((n + k) log n) for k overlaps. Only the
+overlapping pairs are then mapped back to the students holding both.
+"""
+import heapq
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+
+from students.models import Enrollment
+from .models import ClassSchedule, Exam
+from .schedules import DAYS_ORDER
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+@dataclass(frozen=True)
+class Slot:
+    kind: str  # 'class_session' or 'exam'
+    object_id: int
+    class_id: int
+    class_title: str
+    title: str
+    begin: int
+    end: int
+    first: date
+    last: date
+    start_time: str
+    end_time: str
+
+    @property
+    def weekday(self):
+        return self.begin // MINUTES_PER_DAY
+
+    def as_dict(self):
+        data = {
+            'type': self.kind,
+            'id': self.object_id,
+            'class_id': self.class_id,
+            'class_title': self.class_title,
+            'title': self.title,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+        }
+        if self.kind == 'exam':
+            data['date'] = self.first.isoformat()
+        else:
+            data['day_of_week'] = DAYS_ORDER[self.weekday]
+            data['start_date'], data['end_date'] = self.first.isoformat(), self.last.isoformat()
+        return data
+
+
+def _slots(kind, object_id, class_id, class_title, title, weekday, start_time, minutes, first, last):
+    begin = weekday * MINUTES_PER_DAY + start_time.hour * 60 + start_time.minute
+    end = begin + (minutes or 0)
+    ends_at = (datetime.combine(first, start_time) + timedelta(minutes=minutes or 0)).strftime('%H:%M')
+    label = dict(kind=kind, object_id=object_id, class_id=class_id, class_title=class_title, title=title,
+                 start_time=start_time.strftime('%H:%M'), end_time=ends_at)
+    if end <= MINUTES_PER_WEEK:
+        return [Slot(begin=begin, end=end, first=first, last=last, **label)]
+    # Sunday night into Monday: the tail falls on the following dates
+    return [
+        Slot(begin=begin, end=MINUTES_PER_WEEK, first=first, last=last, **label),
+        Slot(begin=0, end=end - MINUTES_PER_WEEK, first=first + timedelta(days=1), last=last + timedelta(days=1),
+             **label),
+    ]
+
+
+def schedule_slots(schedules):
+    """Slots of ClassSchedule rows (with ``class_obj`` loaded)."""
+    slots = []
+    for schedule in schedules:
+        if schedule.day_of_week not in DAYS_ORDER:
+            continue
+        class_obj = schedule.class_obj
+        slots += _slots('class_session', schedule.pk, class_obj.pk, class_obj.title, class_obj.title,
+                        DAYS_ORDER.index(schedule.day_of_week), schedule.start_time, schedule.duration_minutes,
+                        class_obj.start_date, class_obj.end_date)
+    return slots
+
+
+def exam_slots(exams):
+    """Slots of Exam rows (with ``classid`` loaded)."""
+    slots = []
+    for exam in exams:
+        slots += _slots('exam', exam.pk, exam.classid_id, exam.classid.title, exam.examname, exam.date.weekday(),
+                        exam.start_time, exam.duration_minutes, exam.date, exam.date)
+    return slots
+
+
+def overlapping_pairs(proposed, existing):
+    """
+    Every ``(p, e)`` with ``p`` from ``proposed`` and ``e`` from ``existing``
+    whose minute spans overlap. One sorted sweep keeping each side's open
+    slots in a heap by end: O((n + m) log(n + m) + k).
+    """
+    items = sorted([(slot.begin, 0, index, slot) for index, slot in enumerate(proposed)]
+                   + [(slot.begin, 1, index, slot) for index, slot in enumerate(existing)],
+                   key=lambda item: item[:3])
+    open_slots = ([], [])
+    for begin, side, index, slot in items:
+        for heap in open_slots:
+            while heap and heap[0][0] <= begin:
+                heapq.heappop(heap)
+        for _, _, other in open_slots[1 - side]:
+            yield (slot, other) if side == 0 else (other, slot)
+        heapq.heappush(open_slots[side], (slot.end, index, slot))
+
+
+def _share_a_date(a, b):
+    """Whether both slots fall on a common date (the same weekday within both date ranges)."""
+    first, last = max(a.first, b.first), min(a.last, b.last)
+    if first > last:
+        return False
+    return (a.weekday - first.weekday()) % 7 <= (last - first).days
+
+
+def find_conflicts(proposed, students, first, last, exclude_classes=(), exclude_exams=()):
+    """
+    Conflicts between ``proposed`` slots and the schedules and published exams
+    of every class the ``students`` (a StudentProfile queryset or id list)
+    attend between ``first`` and ``last``. One dict per clashing pair, with
+    the ids of the students holding both.
+    """
+    classes = Enrollment.objects.filter(stuid__in=students).exclude(classid__in=exclude_classes).values('classid')
+    schedules = ClassSchedule.objects.filter(
+        class_obj__in=classes, class_obj__start_date__lte=last, class_obj__end_date__gte=first,
+    ).select_related('class_obj')
+    exams = (Exam.objects.filter(classid__in=classes, is_published=True, date__gte=first, date__lte=last)
+             .exclude(pk__in=exclude_exams).select_related('classid'))
+    existing = schedule_slots(schedules) + exam_slots(exams)
+
+    pairs = {}
+    for slot, other in overlapping_pairs(proposed, existing):
+        if _share_a_date(slot, other):
+            pairs.setdefault((slot.kind, slot.object_id, other.kind, other.object_id), (slot, other))
+    if not pairs:
+        return []
+
+    holders = defaultdict(list)
+    for student_id, class_id in (
+        Enrollment.objects.filter(stuid__in=students, classid__in={other.class_id for _, other in pairs.values()})
+        .order_by('stuid_id').values_list('stuid_id', 'classid_id')
+    ):
+        holders[class_id].append(student_id)
+    return [
+        {'proposed': slot.as_dict(), 'existing': other.as_dict(), 'student_ids': holders[other.class_id]}
+        for slot, other in sorted(pairs.values(), key=lambda pair: (pair[0].begin, pair[1].begin))
+    ]
+
+
+def enrollment_conflicts(student, classes):
+    """Clashes between ``classes`` (a Class queryset) and what ``student`` already attends."""
+    classes = list(classes)
+    if not classes:
+        return []
+    proposed = (schedule_slots(ClassSchedule.objects.filter(class_obj__in=classes).select_related('class_obj'))
+                + exam_slots(Exam.objects.filter(classid__in=classes, is_published=True).select_related('classid')))
+    return find_conflicts(
+        proposed, [student.pk], min(c.start_date for c in classes), max(c.end_date for c in classes),
+        exclude_classes=[c.pk for c in classes],
+    )
+
+
+def exam_conflicts(class_obj, exam_date, start_time, duration_minutes, examname='', exclude_exam=None):
+    """
+    Clashes between a proposed exam of ``class_obj`` and the class sessions
+    and exams of every student in the class, including the class's own sessions.
+    """
+    proposed = _slots('exam', exclude_exam, class_obj.pk, class_obj.title, examname, exam_date.weekday(),
+                      start_time, duration_minutes, exam_date, exam_date)
+    students = Enrollment.objects.filter(classid=class_obj).values('stuid')
+    return find_conflicts(proposed, students, exam_date, exam_date,
+                          exclude_exams=[exclude_exam] if exclude_exam else ())
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:38
+
+from django.db import migrations, models
+
+from instructor.schedules import summarize_schedules
+
+
+def fill_schedule_summaries(apps, schema_editor):
+    Class = apps.get_model('instructor', 'Class')
+    ClassSchedule = apps.get_model('instructor', 'ClassSchedule')
+    by_class = {}
+    for schedule in ClassSchedule.objects.order_by('id'):
+        by_class.setdefault(schedule.class_obj_id, []).append(schedule)
+    classes = list(Class.objects.filter(pk__in=by_class))
+    for class_obj in classes:
+        class_obj.schedule_summary, class_obj.schedule_groups = summarize_schedules(by_class[class_obj.pk])
+    Class.objects.bulk_update(classes, ['schedule_summary', 'schedule_groups'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0014_instructornotification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='class',
+            name='schedule_groups',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='class',
+            name='schedule_summary',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.RunPython(fill_schedule_summaries, migrations.RunPython.noop),
+    ]
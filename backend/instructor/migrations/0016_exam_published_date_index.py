@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0015_class_schedule_summary'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='exam',
+            index=models.Index(condition=models.Q(('is_published', True)), fields=['classid', 'date'], name='exam_published_date_idx'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0016_exam_published_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassSessionOverride',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('original_start', models.DateTimeField()),
+                ('cancelled', models.BooleanField(default=False)),
+                ('start', models.DateTimeField(blank=True, null=True)),
+                ('duration_minutes', models.PositiveIntegerField(blank=True, null=True)),
+                ('note', models.CharField(blank=True, default='', max_length=255)),
+                ('class_obj', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='session_overrides', to='instructor.class')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['class_obj', 'start'], name='session_override_start_idx')],
+                'constraints': [models.UniqueConstraint(fields=('class_obj', 'original_start'), name='unique_session_override')],
+            },
+        ),
+    ]
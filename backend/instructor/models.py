@@ -46,6 +46,9 @@ class Class(models.Model):
         limit_choices_to={'role': 'instructor'}
     )
     webinar = models.ForeignKey(ZoomWebinar, on_delete=models.SET_NULL, null=True, blank=True)
+    # Maintained from ClassSchedule by instructor.schedules.refresh_schedule_summary
+    schedule_summary = models.TextField(blank=True, default='')
+    schedule_groups = models.JSONField(blank=True, default=list)
 
     def save(self, *args, **kwargs):
         if not self.classid:
@@ -65,6 +68,34 @@ class ClassSchedule(models.Model):
     def __str__(self):
         return f"{self.class_obj.classid} - {self.day_of_week} {self.start_time}"
 
+
+class ClassSessionOverride(models.Model):
+    """
+    An exception to a class's weekly schedule. The session the schedule
+    places at ``original_start`` is cancelled, or moved to ``start`` and/or
+    given another duration. An override whose ``original_start`` matches no
+    scheduled session adds a one-off session.
+    """
+    class_obj = models.ForeignKey(Class, related_name='session_overrides', on_delete=models.CASCADE)
+    original_start = models.DateTimeField()
+    cancelled = models.BooleanField(default=False)
+    start = models.DateTimeField(null=True, blank=True)
+    duration_minutes = models.PositiveIntegerField(null=True, blank=True)
+    note = models.CharField(max_length=255, blank=True, default='')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['class_obj', 'original_start'], name='unique_session_override'),
+        ]
+        indexes = [
+            # Sessions moved into a window from outside it
+            models.Index(fields=['class_obj', 'start'], name='session_override_start_idx'),
+        ]
+
+    def __str__(self):
+        change = 'cancelled' if self.cancelled else f'moved to {self.start}'
+        return f"{self.class_obj.classid} - {self.original_start} {change}"
+
 # Enhanced Exams Model with Google Forms-style functionality
 class Exam(models.Model):
     QUESTION_TYPES = (
@@ -127,6 +158,13 @@ class Exam(models.Model):
         default="Thank you for submitting your exam. Your responses have been recorded.",
         blank=True
     )
+
+    class Meta:
+        indexes = [
+            # Calendar windows: a class's published exams in a date range
+            models.Index(fields=['classid', 'date'], name='exam_published_date_idx',
+                         condition=models.Q(is_published=True)),
+        ]
     
     def save(self, *args, **kwargs):
         # Generate examid if it's None, empty string, or whitespace
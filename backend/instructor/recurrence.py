@@ -0,0 +1,147 @@
+"""
+Class sessions expanded on demand from weekly schedules.
+
+A class meets on the weekdays and times of its ``ClassSchedule`` rows,
+between ``Class.start_date`` and ``Class.end_date``. Rather than storing a
+row per session, sessions are generated lazily for the requested window:
+each schedule rule jumps straight to its first date in the window and steps
+a week at a time, and the rules of a class (and the classes of a query) are
+merged in start order with ``heapq.merge``. Producing ``k`` sessions costs
+O(k log r) for ``r`` rules, independent of how far the schedule runs.
+
+``ClassSessionOverride`` rows are the exceptions: a generated session with
+an override is replaced by it, so it is dropped (cancelled), moved, or
+re-timed; an override matching no generated session adds a one-off
+session. Only overrides touching the window are loaded.
+"""
+import heapq
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from itertools import groupby
+from operator import attrgetter
+
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import ClassSchedule, ClassSessionOverride
+from .schedules import DAYS_ORDER
+
+_by_start = attrgetter('start')
+
+
+@dataclass(frozen=True)
+class Session:
+    class_id: int
+    start: datetime
+    duration_minutes: int
+    original_start: datetime
+    schedule_id: int = None
+    override_id: int = None
+    cancelled: bool = False
+    note: str = ''
+
+    @property
+    def end(self):
+        return self.start + timedelta(minutes=self.duration_minutes)
+
+
+def _local(day, at):
+    return timezone.make_aware(datetime.combine(day, at))
+
+
+def weekly_dates(weekday, first, last):
+    """Dates falling on ``weekday`` (Monday is 0) from ``first`` to ``last`` inclusive."""
+    day = first + timedelta(days=(weekday - first.weekday()) % 7)
+    while day <= last:
+        yield day
+        day += timedelta(days=7)
+
+
+def _rule_sessions(class_id, schedule, first, last, window_start, window_end):
+    weekday = DAYS_ORDER.index(schedule.day_of_week)
+    for day in weekly_dates(weekday, first, last):
+        start = _local(day, schedule.start_time)
+        # The window is in local time; only the boundary days can fall outside it
+        if window_start <= start < window_end:
+            yield Session(class_id, start, schedule.duration_minutes, start, schedule_id=schedule.pk)
+
+
+def _rule_key(moment):
+    local = timezone.localtime(moment)
+    return DAYS_ORDER[local.weekday()], local.time()
+
+
+def expand_class(class_obj, schedules, overrides, start, end, include_cancelled=False):
+    """
+    Sessions of one class starting between ``start`` and ``end`` (dates, both
+    inclusive) in start order. ``overrides`` must hold every override of the
+    class whose original or new start is in the window (see ``window_overrides``).
+    Cancelled sessions are skipped unless ``include_cancelled``, in which case
+    they are yielded at their original time with ``cancelled`` set.
+    """
+    window_start = _local(start, time.min)
+    window_end = _local(end + timedelta(days=1), time.min)
+    first, last = max(start, class_obj.start_date), min(end, class_obj.end_date)
+    schedules = [schedule for schedule in schedules if schedule.day_of_week in DAYS_ORDER]
+    overridden = {override.original_start: override for override in overrides}
+
+    generated = heapq.merge(
+        *(_rule_sessions(class_obj.pk, schedule, first, last, window_start, window_end) for schedule in schedules),
+        key=_by_start,
+    )
+    kept = (session for session in generated if session.original_start not in overridden)
+
+    # An override without its own duration keeps the one of the session it replaces
+    durations = {(schedule.day_of_week, schedule.start_time): schedule.duration_minutes for schedule in schedules}
+    default_duration = schedules[0].duration_minutes if schedules else 0
+    exceptions = []
+    for override in overridden.values():
+        duration = override.duration_minutes or durations.get(_rule_key(override.original_start), default_duration)
+        session = Session(class_obj.pk, override.start or override.original_start, duration,
+                          override.original_start, override_id=override.pk, cancelled=override.cancelled,
+                          note=override.note)
+        if session.cancelled:
+            if include_cancelled and window_start <= session.original_start < window_end:
+                exceptions.append(session)
+        elif window_start <= session.start < window_end:
+            exceptions.append(session)
+    exceptions.sort(key=_by_start)
+    return heapq.merge(kept, exceptions, key=_by_start)
+
+
+def window_overrides(class_ids, start, end):
+    """Overrides of these classes whose original or new start is in the window."""
+    window_start = _local(start, time.min)
+    window_end = _local(end + timedelta(days=1), time.min)
+    return ClassSessionOverride.objects.filter(
+        Q(original_start__gte=window_start, original_start__lt=window_end)
+        | Q(start__gte=window_start, start__lt=window_end),
+        class_obj__in=class_ids,
+    ).order_by('class_obj_id')
+
+
+def class_sessions(classes, start, end, include_cancelled=False):
+    """
+    Sessions of ``classes`` (Class instances or a queryset; only ``id``,
+    ``start_date`` and ``end_date`` are read) between ``start`` and ``end``
+    (dates, both inclusive), merged in start order. Two queries besides the
+    classes, whatever the window: their schedules and the overrides in it.
+    """
+    classes = list(classes)
+    class_ids = [class_obj.pk for class_obj in classes]
+    schedules = {
+        class_id: list(rows) for class_id, rows in groupby(
+            ClassSchedule.objects.filter(class_obj__in=class_ids).order_by('class_obj_id', 'id'),
+            key=attrgetter('class_obj_id'),
+        )
+    }
+    overrides = {
+        class_id: list(rows) for class_id, rows in groupby(
+            window_overrides(class_ids, start, end), key=attrgetter('class_obj_id'),
+        )
+    }
+    return heapq.merge(
+        *(expand_class(class_obj, schedules.get(class_obj.pk, []), overrides.get(class_obj.pk, []), start, end,
+                       include_cancelled) for class_obj in classes),
+        key=_by_start,
+    )
@@ -0,0 +1,60 @@
+"""
+Precomputed schedule summaries for classes.
+
+Listing classes used to read every class's ``ClassSchedule`` rows to build
+the display string (``student_classess``) and the grouped form
+(``ClassSerializer``). Both are now stored on ``Class`` as
+``schedule_summary`` and ``schedule_groups`` and recomputed from the
+schedules table whenever one of the class's schedules is saved or deleted,
+so list endpoints read them straight off the class row.
+"""
+from datetime import datetime, timedelta
+
+DAYS_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+
+def _day_index(day):
+    return DAYS_ORDER.index(day) if day in DAYS_ORDER else len(DAYS_ORDER)
+
+
+def summarize_schedules(schedules):
+    """
+    ``(summary, groups)`` for an iterable of ClassSchedule rows.
+
+    ``groups`` holds one ``{start_time, duration_minutes, days_of_week}`` dict
+    per time slot, days in week order. ``summary`` is one line per slot, e.g.
+    "Mon, Wed - 03:30 PM–05:00 PM", or "" without schedules.
+    """
+    slots = {}
+    for schedule in schedules:
+        key = (schedule.start_time, schedule.duration_minutes)
+        slots.setdefault(key, []).append(schedule.day_of_week)
+
+    groups, lines = [], []
+    for (start_time, duration), days in slots.items():
+        days.sort(key=_day_index)
+        groups.append({
+            'start_time': start_time.strftime('%H:%M'),
+            'duration_minutes': duration,
+            'days_of_week': days,
+        })
+        end_time = (datetime.combine(datetime.today(), start_time) + timedelta(minutes=duration)).time()
+        short_days = ", ".join(day[:3] for day in days)
+        lines.append(f"{short_days} - {start_time.strftime('%I:%M %p')}–{end_time.strftime('%I:%M %p')}")
+    return "\n".join(lines), groups
+
+
+def refresh_schedule_summary(class_obj):
+    """
+    Recompute and store ``class_obj``'s summary. ``class_obj`` (a Class, or
+    its pk) is updated in place, so callers holding it see the new values.
+    """
+    from .models import Class, ClassSchedule
+
+    class_id = getattr(class_obj, 'pk', class_obj)
+    schedules = ClassSchedule.objects.filter(class_obj_id=class_id).order_by('id')
+    summary, groups = summarize_schedules(schedules)
+    Class.objects.filter(pk=class_id).update(schedule_summary=summary, schedule_groups=groups)
+    if isinstance(class_obj, Class):
+        class_obj.schedule_summary, class_obj.schedule_groups = summary, groups
+    return summary, groups
@@ -3,6 +3,11 @@ from rest_framework import serializers
 from .models import Class, ClassSchedule, InstructorProfile, StudyNote, InstructorNotification, Exam, ExamQuestion, QuestionOption, ExamSubmission, ExamAnswer, Exams
 from django.contrib.auth.models import User
 from edu_admin.models import ZoomWebinar
+from .schedules import refresh_schedule_summary
+from datetime import date
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from students.utils.row_serializers import RowSerializer
 
 # This ClassSerializer is replaced by the more complete one below
 
@@ -77,7 +82,7 @@ class ClassScheduleSerializer(serializers.ModelSerializer):
 
 class ClassSerializer(serializers.ModelSerializer):
     instructor_name = serializers.SerializerMethodField()
-    schedules = serializers.JSONField(required=False)
+    schedules = serializers.JSONField(required=False, write_only=True)
     status = serializers.SerializerMethodField()
     webinar_info = serializers.SerializerMethodField()
 
@@ -120,19 +125,8 @@ class ClassSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Override to provide proper schedules representation for reading"""
         data = super().to_representation(instance)
-        # Group schedules by start_time and duration_minutes for reading
-        schedules_dict = {}
-        for schedule in instance.schedules.all():
-            key = f"{schedule.start_time}_{schedule.duration_minutes}"
-            if key not in schedules_dict:
-                schedules_dict[key] = {
-                    'start_time': schedule.start_time.strftime('%H:%M'),
-                    'duration_minutes': schedule.duration_minutes,
-                    'days_of_week': []
-                }
-            schedules_dict[key]['days_of_week'].append(schedule.day_of_week)
-        
-        data['schedules'] = list(schedules_dict.values())
+        # Schedules grouped by start_time and duration_minutes, precomputed on the class
+        data['schedules'] = instance.schedule_groups
         return data
 
     def update(self, instance, validated_data):
@@ -163,10 +157,62 @@ class ClassSerializer(serializers.ModelSerializer):
                         start_time=start_time,
                         duration_minutes=duration_minutes
                     )
+            # The signals refresh the summary as rows change; make sure the
+            # instance about to be rendered has the final one
+            refresh_schedule_summary(instance)
         
         return instance
 
 
+
+def _class_status(row, context):
+    if row['end_date'] < context['today']:
+        return "completed"
+    elif row['start_date'] > context['today']:
+        return "pending"
+    return "active"
+
+
+def _webinar_info(row, context):
+    if row['webinar_id'] is None:
+        return None
+    return {
+        'webinar_id': row['webinar__webinar_id'],
+        'topic': row['webinar__topic'],
+        'registration_url': row['webinar__registration_url'],
+        'start_time': row['webinar__start_time'],
+        'duration': row['webinar__duration'],
+        'agenda': row['webinar__agenda'],
+    }
+
+
+class ClassRows(RowSerializer):
+    """ClassSerializer output for list GETs, from values() rows"""
+    model = Class
+    fields = {
+        'id': 'id', 'classid': 'classid', 'title': 'title', 'description': 'description', 'fee': 'fee',
+        'start_date': 'start_date', 'end_date': 'end_date', 'schedules': 'schedule_groups',
+    }
+    computed = {
+        'instructor_name': lambda row, context: (
+            f"{row['instructor__first_name']} {row['instructor__last_name']}".strip()
+        ),
+        'status': _class_status,
+        'webinar_info': _webinar_info,
+    }
+    order = ClassSerializer.Meta.fields
+
+    @classmethod
+    def extra_lookups(cls):
+        return (
+            'instructor__first_name', 'instructor__last_name', 'webinar_id', 'webinar__webinar_id',
+            'webinar__topic', 'webinar__registration_url', 'webinar__start_time', 'webinar__duration',
+            'webinar__agenda',
+        )
+
+    def get_context(self):
+        return {'today': date.today()}
+
 # Enhanced Exam Serializers for Google Forms-style functionality
 class QuestionOptionSerializer(serializers.ModelSerializer):
     class Meta:
@@ -247,6 +293,16 @@ class ExamSerializer(serializers.ModelSerializer):
             return f"{hours}h {minutes}m" if minutes > 0 else f"{hours}h"
         return f"{minutes}m"
 
+class ExamConflictCheckSerializer(serializers.Serializer):
+    """A proposed exam slot to check against the class's students' timetables."""
+    classid = serializers.PrimaryKeyRelatedField(queryset=Class.objects.all())
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    duration_minutes = serializers.IntegerField(min_value=1, default=60)
+    examname = serializers.CharField(required=False, allow_blank=True, default='')
+    exam_id = serializers.IntegerField(required=False, allow_null=True, default=None)
+
+
 class ExamListSerializer(serializers.ModelSerializer):
     """Simplified serializer for exam list view"""
     class_name = serializers.CharField(source='classid.title', read_only=True)
@@ -277,6 +333,50 @@ class ExamListSerializer(serializers.ModelSerializer):
             return f"{hours}h {minutes}m" if minutes > 0 else f"{hours}h"
         return f"{minutes}m"
 
+
+def _related_count(queryset, field='pk'):
+    counts = queryset.order_by().values('exam').annotate(n=Count(field, distinct=True)).values('n')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def _duration_display(row, context):
+    hours, minutes = divmod(row['duration_minutes'], 60)
+    if hours > 0:
+        return f"{hours}h {minutes}m" if minutes > 0 else f"{hours}h"
+    return f"{minutes}m"
+
+
+EXAM_STATUS_LABELS = dict(Exam.EXAM_STATUS_CHOICES)
+
+
+class ExamListRows(RowSerializer):
+    """ExamListSerializer output for list GETs, from values() rows"""
+    model = Exam
+    annotations = {
+        'questions_count': _related_count(ExamQuestion.objects.filter(exam=OuterRef('pk'))),
+        'total_students_attempted': _related_count(
+            ExamSubmission.objects.filter(exam=OuterRef('pk')), 'student'
+        ),
+    }
+    fields = {
+        'id': 'id', 'examid': 'examid', 'examname': 'examname', 'class_name': 'classid__title',
+        'date': 'date', 'start_time': 'start_time', 'total_marks': 'total_marks', 'status': 'status',
+        'is_published': 'is_published', 'questions_count': 'questions_count',
+        'total_students_attempted': 'total_students_attempted', 'created_at': 'created_at',
+    }
+    computed = {
+        'instructor_name': lambda row, context: (
+            f"{row['instructor__first_name']} {row['instructor__last_name']}".strip()
+        ),
+        'duration_display': _duration_display,
+        'status_display': lambda row, context: EXAM_STATUS_LABELS.get(row['status'], row['status']),
+    }
+    order = ExamListSerializer.Meta.fields
+
+    @classmethod
+    def extra_lookups(cls):
+        return ('instructor__first_name', 'instructor__last_name', 'duration_minutes')
+
 class ExamSubmissionSerializer(serializers.ModelSerializer):
     student_name = serializers.SerializerMethodField()
     exam_name = serializers.CharField(source='exam.examname', read_only=True)
@@ -1,7 +1,8 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from .models import InstructorNotification, Class, Exam
+from .models import InstructorNotification, Class, ClassSchedule, Exam
+from .schedules import refresh_schedule_summary
 from students.models import Enrollment, Message
 from edu_admin.models import ZoomWebinar, ZoomOccurrence
 from students.models import Notification as StudentNotification
@@ -215,3 +216,13 @@ def custom_exam_save(self, *args, **kwargs):
 # Monkey patch the save method
 Exam.__init__ = custom_exam_init
 Exam.save = custom_exam_save
+
+
+@receiver([post_save, post_delete], sender=ClassSchedule)
+def update_schedule_summary(sender, instance, **kwargs):
+    """Keep Class.schedule_summary / schedule_groups in step with its schedules"""
+    if ClassSchedule.class_obj.is_cached(instance):
+        # Update the caller's Class object too, e.g. a serializer about to render it
+        refresh_schedule_summary(instance.class_obj)
+    else:
+        refresh_schedule_summary(instance.class_obj_id)
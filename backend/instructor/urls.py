@@ -4,7 +4,7 @@ from .views import get_all_students, instructor_profile, study_notes, study_note
 from .views import (exam_list_create, exam_detail, exam_questions, question_detail, 
                    duplicate_exam, publish_exam, exam_submissions, exam_analytics, exam_results,
                    exam_details_with_students, download_exam_results_csv, download_all_exam_results_csv,
-                   download_exam_results_pdf, download_all_exam_results_pdf)
+                   download_exam_results_pdf, download_all_exam_results_pdf, exam_conflict_check)
 
 urlpatterns = [
     path('students/', get_all_students, name='get_all_students'),
@@ -25,6 +25,7 @@ urlpatterns = [
     
     # Enhanced Exam API URLs
     path('exams/', exam_list_create, name='exam-list-create'),
+    path('exams/conflicts/', exam_conflict_check, name='exam-conflict-check'),
     path('exams/<int:exam_id>/', exam_detail, name='exam-detail'),
     path('exams/<int:exam_id>/questions/', exam_questions, name='exam-questions'),
     path('exams/<int:exam_id>/questions/<int:question_id>/', question_detail, name='question-detail'),
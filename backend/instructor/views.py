@@ -10,14 +10,16 @@ from .models import InstructorProfile, StudyNote, Class, Exam, ExamQuestion, Que
 from students.models import StudentProfile
 from .serializers import (InstructorProfileSerializer, StudyNoteSerializer, ZoomWebinarSerializer, 
                          ClassSerializer, ExamSerializer, ExamListSerializer, ExamQuestionSerializer, 
-                         ExamSubmissionSerializer, ExamAnswerSerializer)
+                         ExamSubmissionSerializer, ExamAnswerSerializer, ClassRows, ExamListRows,
+                         ExamConflictCheckSerializer)
 from accounts.serializers import UserSerializer
 from rest_framework.parsers import MultiPartParser, FormParser
 from edu_admin.models import ZoomWebinar
 from django.db.models import Q, Avg, Max, Min
 from students.models import ChatRoom, Message, Notification
-from students.serializers import MessageSerializer
+from students.serializers import MessageRows, MessageSerializer
 from .models import InstructorNotification
+from .conflicts import exam_conflicts
 from .serializers import InstructorNotificationSerializer
 
 # Create your views here.
@@ -152,8 +154,7 @@ def webinar_classes(request):
 @permission_classes([IsAuthenticated])
 def instructor_classes(request):
     classes = Class.objects.filter(instructor=request.user)
-    serializer = ClassSerializer(classes, many=True)
-    return Response({"classes": serializer.data})
+    return Response({"classes": ClassRows().serialize(classes)})
 
 @api_view(["GET"])
 @authentication_classes([JWTAuthentication])
@@ -353,8 +354,7 @@ def instructor_get_chat_with_student(request, student_id):
     if not chat_room:
         return Response({'messages': []})
     messages = Message.objects.filter(chat_room=chat_room).order_by('created_at')
-    serializer = MessageSerializer(messages, many=True)
-    return Response(serializer.data)
+    return Response(MessageRows().serialize(messages))
 
 
 @api_view(['POST'])
@@ -438,8 +438,7 @@ def exam_list_create(request):
     
     if request.method == 'GET':
         exams = Exam.objects.filter(instructor=request.user).order_by('-created_at')
-        serializer = ExamListSerializer(exams, many=True)
-        return Response({"exams": serializer.data})
+        return Response({"exams": ExamListRows().serialize(exams)})
     
     elif request.method == 'POST':
         data = request.data.copy()
@@ -608,8 +607,31 @@ def publish_exam(request, exam_id):
     exam.is_published = True
     exam.status = 'published'
     exam.save()
-    
-    return Response({'message': 'Exam published successfully'})
+
+    # Published anyway; clashes are reported so the instructor can reschedule
+    conflicts = exam_conflicts(exam.classid, exam.date, exam.start_time, exam.duration_minutes, exam.examname,
+                               exclude_exam=exam.pk)
+    return Response({'message': 'Exam published successfully', 'conflicts': conflicts})
+
+
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([IsAuthenticated])
+def exam_conflict_check(request):
+    """
+    Check a proposed exam slot against the class sessions and exams of every
+    student in the class, before creating or rescheduling the exam
+    """
+    serializer = ExamConflictCheckSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = serializer.validated_data
+    if data['classid'].instructor_id != request.user.id:
+        return Response({'error': 'Class not found'}, status=404)
+
+    conflicts = exam_conflicts(data['classid'], data['date'], data['start_time'], data['duration_minutes'],
+                               data['examname'], exclude_exam=data['exam_id'])
+    return Response({'conflicts': conflicts})
 
 @api_view(['GET'])
 @authentication_classes([JWTAuthentication])
@@ -0,0 +1,239 @@
+"""
+Student calendar: webinar sessions and published exams of enrolled classes.
+
+Events are read for a date window from the materialized per-student table
+``StudentCalendarEvent`` (kept current by ``students.signals``), a single
+range scan on its ``(student, starts_at)`` index.
+
+The same events are published as a per-student iCalendar feed that phone
+calendar apps subscribe to. Those apps cannot send a JWT, so the feed URL
+carries a signed token. The rendered feed is cached under the ``calendar``
+and ``payments`` cache versions with a strong ETag, so a poll with a current
+``If-None-Match`` is answered from the cache without touching the database.
+"""
+import hashlib
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+
+from instructor.models import Class
+from instructor.recurrence import class_sessions
+from .models import Enrollment, StudentCalendarEvent
+from .utils.cache_versions import get_version
+
+CACHE_NAMESPACE = "calendar"
+FEED_SALT = "students.calendar-feed"
+UID_DOMAIN = "calendar.students"
+
+
+class CalendarError(ValueError):
+    pass
+
+
+def _parse_day(params, name):
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value[:10])
+    except ValueError:
+        raise CalendarError(f"{name} must be a date (YYYY-MM-DD).")
+
+
+def parse_window(params, today=None):
+    """
+    ``(start, end)`` dates, both inclusive, from the ``start``/``end`` query
+    params. Defaults to the next CALENDAR_DEFAULT_DAYS days from today.
+    """
+    start = _parse_day(params, "start") or today or timezone.localdate()
+    end = _parse_day(params, "end") or start + timedelta(days=settings.CALENDAR_DEFAULT_DAYS - 1)
+    if end < start:
+        raise CalendarError("end must not be before start.")
+    if (end - start).days >= settings.CALENDAR_MAX_WINDOW_DAYS:
+        raise CalendarError(f"The window can span at most {settings.CALENDAR_MAX_WINDOW_DAYS} days.")
+    return start, end
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def paid_class_ids(student):
+    """Subquery of the classes the student holds a paid enrollment in."""
+    return Enrollment.objects.filter(stuid=student, payid__status="success").values("classid")
+
+
+def event_rows(student, start, end, only=Q()):
+    """The student's materialized events in the window: one range scan on (student, starts_at)."""
+    return (
+        StudentCalendarEvent.objects.filter(
+            only, student=student, starts_at__gte=day_start(start), starts_at__lt=day_start(end + timedelta(days=1)),
+        )
+        .order_by("starts_at", "id")
+        .values("event_type", "title", "starts_at", "duration", "webinarid", "class_title", "class_obj_id",
+                "occurrence_id", "exam_id")
+    )
+
+
+def _event(row):
+    starts_at = timezone.localtime(row["starts_at"])
+    if row["event_type"] == StudentCalendarEvent.EXAM:
+        return {
+            "id": f"exam_{row['exam_id']}",
+            "title": f"📝 {row['title']}",
+            "type": "exam",
+            "date": starts_at.date().isoformat(),
+            "start_time": starts_at.strftime("%H:%M"),
+            "color": "red",
+            "duration": row["duration"],
+            "class_title": row["class_title"],
+        }
+    return {
+        "id": f"zoom_{row['occurrence_id']}",
+        "title": f"🎥 {row['title']}",
+        "webinarid": row["webinarid"],
+        "type": "zoom_meeting",
+        "date": starts_at.isoformat(),
+        "color": "blue",
+        "duration": row["duration"],
+        "class_title": row["class_title"],
+    }
+
+
+def calendar_events(student, start, end, only=Q()):
+    """
+    Calendar event dicts for the window in start order, optionally narrowed
+    by an ``only`` filter on StudentCalendarEvent.
+    """
+    events, seen = [], set()
+    for row in event_rows(student, start, end, only):
+        event = _event(row)
+        # A webinar shared by two of the student's classes is listed once
+        if event["id"] not in seen:
+            seen.add(event["id"])
+            events.append(event)
+    return events
+
+
+def timetable(student, start, end):
+    """
+    Scheduled sessions of the student's paid classes in the window, expanded
+    from the class schedules and their overrides rather than stored rows.
+    """
+    classes = {
+        class_obj.pk: class_obj
+        for class_obj in Class.objects.filter(pk__in=paid_class_ids(student)).only("id", "title", "start_date",
+                                                                                  "end_date")
+    }
+    return [
+        {
+            "class_id": session.class_id,
+            "class_title": classes[session.class_id].title,
+            "start": timezone.localtime(session.start).isoformat(),
+            "end": timezone.localtime(session.end).isoformat(),
+            "duration": session.duration_minutes,
+            "rescheduled": session.start != session.original_start,
+            "note": session.note,
+        }
+        for session in class_sessions(classes.values(), start, end)
+    ]
+
+
+# iCalendar (RFC 5545)
+
+def _ics_text(value):
+    return (str(value or "").replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _ics_time(value):
+    return value.astimezone(dt_timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _fold(line):
+    """Split a content line into 75-octet chunks joined by CRLF + space."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line
+    parts, current = [], b""
+    for char in line:
+        piece = char.encode()
+        if len(current) + len(piece) > (75 if not parts else 74):
+            parts.append(current.decode())
+            current = b""
+        current += piece
+    parts.append(current.decode())
+    return "\r\n ".join(parts)
+
+
+def _vevent(uid, starts_at, minutes, summary, description, stamp):
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_ics_time(starts_at)}",
+        f"DTEND:{_ics_time(starts_at + timedelta(minutes=minutes or 0))}",
+        f"SUMMARY:{_ics_text(summary)}",
+        f"DESCRIPTION:{_ics_text(description)}",
+        "END:VEVENT",
+    ]
+
+
+def render_ics(student, start, end):
+    """The student's events in the window as an iCalendar document."""
+    # A fixed DTSTAMP keeps the document, and so its ETag, stable between polls
+    stamp = _ics_time(day_start(start))
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//LMS//Student calendar//EN",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_ics_text(f'{student.user.get_full_name() or student.user.username} - classes')}",
+    ]
+    for row in event_rows(student, start, end):
+        if row["event_type"] == StudentCalendarEvent.EXAM:
+            uid, summary = f"exam-{row['exam_id']}", f"Exam: {row['title']}"
+        else:
+            uid, summary = f"zoom-{row['occurrence_id']}-{row['class_obj_id']}", row["title"]
+        lines += _vevent(f"{uid}@{UID_DOMAIN}", row["starts_at"], row["duration"], summary, row["class_title"],
+                         stamp)
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+def feed_token(student):
+    return signing.Signer(salt=FEED_SALT).sign(str(student.pk))
+
+
+def student_id_from_token(token):
+    """The StudentProfile pk a feed token was issued for, or None if it is invalid."""
+    try:
+        return int(signing.Signer(salt=FEED_SALT).unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def get_feed(student_id, load_student, today=None):
+    """
+    ``(ics, etag)`` for the student's feed window around today. The database
+    is only read (through ``load_student``) when the cached feed is stale.
+    """
+    today = today or timezone.localdate()
+    key = (f"calendar-ics:{get_version(CACHE_NAMESPACE)}:{get_version('payments')}:"
+           f"{student_id}:{today.isoformat()}")
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    student = load_student(student_id)
+    start = today - timedelta(days=settings.CALENDAR_FEED_PAST_DAYS)
+    end = today + timedelta(days=settings.CALENDAR_FEED_FUTURE_DAYS)
+    body = render_ics(student, start, end)
+    cached = (body, f'"{hashlib.sha256(body.encode()).hexdigest()}"')
+    cache.set(key, cached, settings.CALENDAR_FEED_CACHE_SECONDS)
+    return cached
@@ -0,0 +1,151 @@
+"""
+Writes for the materialized per-student calendar (``StudentCalendarEvent``).
+
+Every student paid into a class gets a row per webinar session and
+published exam of that class. The receivers in ``students.signals`` keep the
+rows current with set-based writes: each change deletes the affected rows
+with one query and re-inserts them with ``bulk_create`` from two queries
+(the paid enrollments in scope, and the events of their classes), so
+publishing an exam to a class of thousands costs the same handful of
+queries as publishing it to one student. Rows of deleted occurrences, exams,
+classes and students go with them through ``on_delete=CASCADE``.
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from edu_admin.models import ZoomOccurrence
+from instructor.models import Exam
+from .calendar_sync import record_change, record_enrollments
+from .models import CalendarChange, Enrollment, StudentCalendarEvent
+
+BATCH_SIZE = 1000
+
+
+def _occurrence_fields(occurrences, class_ids):
+    rows = ZoomOccurrence.objects.filter(occurrences, webinar__class__in=class_ids).values(
+        "id", "start_time", "duration", "webinar__topic", "webinar__webinar_id",
+        "webinar__class__id", "webinar__class__title",
+    )
+    for row in rows:
+        yield row["webinar__class__id"], {
+            "occurrence_id": row["id"],
+            "event_type": StudentCalendarEvent.ZOOM_MEETING,
+            "title": row["webinar__topic"],
+            "starts_at": row["start_time"],
+            "duration": row["duration"],
+            "webinarid": row["webinar__webinar_id"],
+            "class_title": row["webinar__class__title"],
+        }
+
+
+def _exam_fields(exams, class_ids):
+    rows = Exam.objects.filter(exams, classid__in=class_ids, is_published=True).values(
+        "id", "examname", "date", "start_time", "duration_minutes", "classid_id", "classid__title",
+    )
+    for row in rows:
+        yield row["classid_id"], {
+            "exam_id": row["id"],
+            "event_type": StudentCalendarEvent.EXAM,
+            "title": row["examname"],
+            "starts_at": timezone.make_aware(datetime.combine(row["date"], row["start_time"])),
+            "duration": row["duration_minutes"],
+            "class_title": row["classid__title"],
+        }
+
+
+def _insert(enrollments, occurrences=None, exams=None):
+    """
+    Insert rows for the paid ``enrollments`` and the events of their classes
+    matching the ``occurrences`` / ``exams`` filters (None skips that kind).
+    """
+    pairs = list(enrollments.filter(payid__status="success").values_list("stuid_id", "classid_id").distinct())
+    if not pairs:
+        return 0
+    class_ids = {class_id for _, class_id in pairs}
+    events = defaultdict(list)
+    if occurrences is not None:
+        for class_id, fields in _occurrence_fields(occurrences, class_ids):
+            events[class_id].append(fields)
+    if exams is not None:
+        for class_id, fields in _exam_fields(exams, class_ids):
+            events[class_id].append(fields)
+
+    rows = [
+        StudentCalendarEvent(student_id=student_id, class_obj_id=class_id, **fields)
+        for student_id, class_id in pairs
+        for fields in events.get(class_id, ())
+    ]
+    StudentCalendarEvent.objects.bulk_create(rows, batch_size=BATCH_SIZE, ignore_conflicts=True)
+    return len(rows)
+
+
+def _pairs_q(pairs, student="student", class_obj="class_obj"):
+    """OR of one ``class AND student IN (...)`` term per class in ``pairs``."""
+    students = defaultdict(set)
+    for student_id, class_id in pairs:
+        students[class_id].add(student_id)
+    condition = Q(pk__in=[])
+    for class_id, student_ids in students.items():
+        condition |= Q(**{class_obj: class_id, f"{student}__in": student_ids})
+    return condition
+
+
+def _rebuild(pairs):
+    StudentCalendarEvent.objects.filter(_pairs_q(pairs)).delete()
+    return _insert(Enrollment.objects.filter(_pairs_q(pairs, "stuid", "classid")), Q(), Q())
+
+
+@transaction.atomic
+def refresh_enrollments(pairs):
+    """
+    Rebuild the rows of these ``(student_id, class_id)`` pairs, e.g. after
+    (un)enrolling or paying, and log the change for those students' calendar sync.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return 0
+    record_enrollments(pairs)
+    return _rebuild(pairs)
+
+
+def refresh_payments(payment_ids):
+    """Rebuild the rows of enrollments paid by these payments after their status changed."""
+    return refresh_enrollments(Enrollment.objects.filter(payid__in=payment_ids).values_list("stuid_id", "classid_id"))
+
+
+@transaction.atomic
+def refresh_class(class_id):
+    """Rebuild a class's rows, e.g. after its title or webinar changed, logging one change for the class."""
+    # The webinar the rows were built from, so calendar sync can report its sessions as removed
+    previous_webinar = (StudentCalendarEvent.objects.filter(class_obj=class_id, occurrence__isnull=False)
+                        .values_list("occurrence__webinar_id", flat=True).first())
+    record_change(CalendarChange.CLASS, class_id, class_id=class_id, webinar_id=previous_webinar)
+    pairs = set(Enrollment.objects.filter(classid=class_id).values_list("stuid_id", "classid_id"))
+    return _rebuild(pairs) if pairs else 0
+
+
+@transaction.atomic
+def refresh_exam(exam):
+    """Replace an exam's rows: one per paid student of its class while published, none otherwise."""
+    StudentCalendarEvent.objects.filter(exam=exam.pk).delete()
+    if not exam.is_published:
+        return 0
+    return _insert(Enrollment.objects.filter(classid=exam.classid_id), exams=Q(pk=exam.pk))
+
+
+@transaction.atomic
+def refresh_occurrence(occurrence):
+    """Replace an occurrence's rows: one per paid student of each class on its webinar."""
+    StudentCalendarEvent.objects.filter(occurrence=occurrence.pk).delete()
+    return _insert(Enrollment.objects.filter(classid__webinar=occurrence.webinar_id), occurrences=Q(pk=occurrence.pk))
+
+
+def rename_webinar(webinar):
+    """Copy a webinar's topic and id onto its sessions' rows."""
+    return StudentCalendarEvent.objects.filter(occurrence__webinar=webinar).update(
+        title=webinar.topic, webinarid=webinar.webinar_id,
+    )
@@ -0,0 +1,160 @@
+"""
+Incremental (delta) sync for the student calendar.
+
+Every change to a calendar source (a webinar occurrence, an exam, a class,
+or a student's enrollment or its payment) appends a ``CalendarChange`` row.
+A full sync returns the window's events and an opaque sync token holding the
+id of the newest change already reflected; passing the token back returns
+only the events created, changed or removed since, and a new token.
+
+A refresh with nothing new costs one query: a range scan on the change log's
+primary key past the token position, restricted to the student's classes,
+webinars and own enrollments.
+
+Change ids are allocated at insert but become visible at commit, so a
+slow transaction can commit a lower id after a higher one was served. The
+token therefore only advances past changes older than CALENDAR_SYNC_LAG_SECONDS;
+newer ones are sent again on the next sync, which is harmless since clients
+apply upserts and deletions idempotently.
+"""
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from edu_admin.models import ZoomOccurrence
+from instructor.models import Class, Exam
+from .calendar import CalendarError, calendar_events, day_start, paid_class_ids, parse_window
+from .models import CalendarChange
+from .utils.pagination import InvalidCursor, decode_cursor, encode_cursor
+
+
+class SyncTokenExpired(CalendarError):
+    """The token is too old (or its changes too many); the client must do a full sync."""
+
+
+def record_change(kind, object_id, class_id=None, webinar_id=None, student_id=None, deleted=False):
+    CalendarChange.objects.create(kind=kind, object_id=object_id, class_id=class_id, webinar_id=webinar_id,
+                                  student_id=student_id, deleted=deleted)
+
+
+def record_enrollments(pairs):
+    """
+    Log that the ``(student_id, class_id)`` enrollments changed: created,
+    removed, or their payment status moved (which is what makes a class's
+    events visible).
+    """
+    CalendarChange.objects.bulk_create([
+        CalendarChange(kind=CalendarChange.ENROLLMENT, object_id=class_id, class_id=class_id, student_id=student_id)
+        for student_id, class_id in pairs
+    ])
+
+
+def current_position():
+    return CalendarChange.objects.aggregate(position=Max("id"))["position"] or 0
+
+
+def encode_sync_token(position, start, end, issued=None):
+    return encode_cursor([position, start, end, issued or timezone.localdate()])
+
+
+def decode_sync_token(token):
+    try:
+        position, start, end, issued = decode_cursor(
+            token, (int, date.fromisoformat, date.fromisoformat, date.fromisoformat),
+        )
+    except InvalidCursor:
+        raise CalendarError("Invalid sync token.")
+    if issued < timezone.localdate() - timedelta(days=settings.CALENDAR_SYNC_RETENTION_DAYS):
+        raise SyncTokenExpired("Sync token has expired; do a full sync.")
+    return position, start, end
+
+
+def full_sync(student, params):
+    """All events of the requested window and a token for later deltas."""
+    start, end = parse_window(params)
+    # Read the position first: changes racing with the read are sent again next time
+    position = current_position()
+    return {
+        "events": calendar_events(student, start, end),
+        "deleted": [],
+        "sync_token": encode_sync_token(position, start, end),
+    }
+
+
+def relevant_changes(student, position):
+    """
+    Changes past ``position`` to the student's own enrollments, or to the
+    classes, exams and webinar sessions of their paid classes.
+    """
+    classes = paid_class_ids(student)
+    own = Q(kind=CalendarChange.ENROLLMENT, student_id=student.pk)
+    shared = ~Q(kind=CalendarChange.ENROLLMENT) & (
+        Q(class_id__in=classes) | Q(webinar_id__in=Class.objects.filter(pk__in=classes).values("webinar"))
+    )
+    return CalendarChange.objects.filter(own | shared, id__gt=position).order_by("id")
+
+
+def _event_ids(occurrence_ids=(), exam_ids=()):
+    return {f"zoom_{pk}" for pk in occurrence_ids} | {f"exam_{pk}" for pk in exam_ids}
+
+
+def _class_event_ids(class_ids, webinar_ids, start, end):
+    """Ids of every event in the window of these classes, enrolled or not, and of these webinars."""
+    occurrences = ZoomOccurrence.objects.filter(
+        Q(webinar__class__in=class_ids) | Q(webinar__in=webinar_ids),
+        start_time__gte=day_start(start), start_time__lt=day_start(end + timedelta(days=1)),
+    ).values_list("id", flat=True)
+    exams = Exam.objects.filter(classid__in=class_ids, date__gte=start, date__lte=end).values_list("id", flat=True)
+    return _event_ids(occurrences, exams)
+
+
+def delta_sync(student, token):
+    """
+    Events created or changed, and ids of events removed, since ``token``.
+    Raises SyncTokenExpired when the client has to start over.
+    """
+    position, start, end = decode_sync_token(token)
+    limit = settings.CALENDAR_SYNC_MAX_CHANGES
+    changes = list(relevant_changes(student, position).values("id", "kind", "object_id", "class_id", "webinar_id",
+                                                               "changed_at")[:limit + 1])
+    if not changes:
+        return {"events": [], "deleted": [], "sync_token": token}
+    if len(changes) > limit:
+        raise SyncTokenExpired("Too many changes since this sync token; do a full sync.")
+
+    occurrence_ids, exam_ids, class_ids, webinar_ids = set(), set(), set(), set()
+    for change in changes:
+        if change["kind"] == CalendarChange.OCCURRENCE:
+            occurrence_ids.add(change["object_id"])
+        elif change["kind"] == CalendarChange.EXAM:
+            exam_ids.add(change["object_id"])
+        else:
+            class_ids.add(change["class_id"])
+            # A class change carries the webinar it had, whose sessions may be gone
+            if change["kind"] == CalendarChange.CLASS and change["webinar_id"]:
+                webinar_ids.add(change["webinar_id"])
+
+    events = calendar_events(
+        student, start, end,
+        Q(occurrence__in=occurrence_ids) | Q(exam__in=exam_ids) | Q(class_obj__in=class_ids),
+    )
+    # Anything that changed but is no longer visible (deleted, unpublished,
+    # moved out of the window, enrollment removed) is reported as deleted
+    candidates = _event_ids(occurrence_ids, exam_ids)
+    if class_ids:
+        candidates |= _class_event_ids(class_ids, webinar_ids, start, end)
+    deleted = sorted(candidates - {event["id"] for event in events})
+
+    settled = timezone.now() - timedelta(seconds=settings.CALENDAR_SYNC_LAG_SECONDS)
+    settled_ids = [change["id"] for change in changes if change["changed_at"] <= settled]
+    position = max(settled_ids, default=position)
+    return {"events": events, "deleted": deleted, "sync_token": encode_sync_token(position, start, end)}
+
+
+def prune_changes(now=None):
+    """Delete changes older than any token still accepted; returns the number removed."""
+    cutoff = (now or timezone.now()) - timedelta(days=settings.CALENDAR_SYNC_RETENTION_DAYS + 1)
+    deleted, _ = CalendarChange.objects.filter(changed_at__lt=cutoff).delete()
+    return deleted
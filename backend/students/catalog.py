@@ -0,0 +1,123 @@
+"""
+Public class catalog (the classes listed on the home page).
+
+Building the catalog runs the Class query and ``ClassSerializer`` over every
+current class. The serialized list is cached together with a strong ETag
+under the ``catalog`` cache version, which is bumped whenever a class, one of
+its schedules or a webinar changes, so every request between two edits is a
+single cache read. Clients that send the ETag back in ``If-None-Match`` get a
+304 without a body.
+
+``student_catalog`` builds a student's view of the catalog (their classes
+and the other current classes) in a fixed number of queries: the enrolled
+flag is an ``EXISTS`` annotation and "others" is its ``NOT EXISTS``
+anti-join, read as ``values()`` rows with the precomputed schedule summary.
+"""
+import hashlib
+import json
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Exists, OuterRef, Q
+
+from instructor.models import Class
+from instructor.serializers import ClassRows
+from .models import Enrollment
+from .utils.cache_versions import get_version
+from .utils.pagination import KeysetPage
+
+CACHE_NAMESPACE = "catalog"
+
+
+def build_catalog(today):
+    """Active and pending classes (end_date >= today), by start date."""
+    return ClassRows().serialize(Class.objects.filter(end_date__gte=today).order_by("start_date"))
+
+
+def catalog_etag(data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder, sort_keys=True, separators=(",", ":"))
+    return f'"{hashlib.sha256(payload.encode()).hexdigest()}"'
+
+
+def get_catalog():
+    """
+    ``(data, etag)`` for today's catalog. The key includes the date because
+    which classes are listed, and their status, change at midnight.
+    """
+    today = date.today()
+    key = f"catalog:{get_version(CACHE_NAMESPACE)}:{today.isoformat()}"
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+
+    data = json.loads(json.dumps(build_catalog(today), cls=DjangoJSONEncoder))
+    cached = (data, catalog_etag(data))
+    cache.set(key, cached, settings.CATALOG_CACHE_SECONDS)
+    return cached
+
+
+def etag_matches(if_none_match, etag):
+    """If-None-Match check (weak comparison, as RFC 9110 requires for it)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+CLASS_ROW_FIELDS = (
+    "id", "classid", "title", "description", "fee", "start_date", "end_date",
+    "webinar__webinar_id", "schedule_summary", "enrolled",
+)
+
+
+def class_row(values):
+    """Response dict for one ``CLASS_ROW_FIELDS`` row."""
+    return {
+        "classid": values["classid"],
+        "title": values["title"],
+        "description": values["description"],
+        "fee": float(values["fee"]),
+        "start_date": values["start_date"].isoformat(),
+        "end_date": values["end_date"].isoformat() if values["end_date"] else None,
+        "webinar_id": values["webinar__webinar_id"],
+        "schedule": values["schedule_summary"] or None,
+        "enrolled": values["enrolled"],
+    }
+
+
+def student_catalog(student, today=None, cursor=None, page_size=None):
+    """
+    ``{"enrolled": [...], "others": [...]}`` for ``student``: every class
+    they are enrolled in, and the active or pending classes they are not.
+
+    Without ``page_size`` both lists come from one query. With it, "others"
+    is a keyset page by start date (``cursor`` continues it) and the result
+    also has ``next_cursor`` and ``has_more``; that is two queries.
+    """
+    today = today or date.today()
+    classes = Class.objects.annotate(
+        enrolled=Exists(Enrollment.objects.filter(stuid=student, classid=OuterRef("pk")))
+    )
+    current = Q(enrolled=False, end_date__gte=today)
+
+    if not page_size:
+        rows = classes.filter(Q(enrolled=True) | current).order_by("start_date", "id").values(*CLASS_ROW_FIELDS)
+        catalog = {"enrolled": [], "others": []}
+        for values in rows:
+            catalog["enrolled" if values["enrolled"] else "others"].append(class_row(values))
+        return catalog
+
+    enrolled = classes.filter(enrolled=True).order_by("start_date", "id").values(*CLASS_ROW_FIELDS)
+    others = KeysetPage(
+        classes.filter(current).values(*CLASS_ROW_FIELDS), ("start_date", "id"), (date.fromisoformat, int),
+        cursor=cursor, page_size=page_size, descending=False,
+    )
+    return {
+        "enrolled": [class_row(values) for values in enrolled],
+        "others": [class_row(values) for values in others.rows],
+        "next_cursor": others.next_cursor,
+        "has_more": others.has_more,
+    }
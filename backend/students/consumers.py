@@ -81,6 +81,51 @@ class AdminChatConsumer(AsyncWebsocketConsumer):
             content=message
         )
 
+class OCRJobConsumer(AsyncWebsocketConsumer):
+    """Pushes receipt OCR job status updates to the uploading client."""
+
+    async def connect(self):
+        from .ocr.jobs import job_group_name
+
+        self.job_id = self.scope['url_route']['kwargs']['job_id']
+        self.room_group_name = job_group_name(self.job_id)
+
+        # Only the student who uploaded the receipt may follow its job
+        job = await self.get_job_status()
+        if job is None:
+            await self.close()
+            return
+
+        await self.channel_layer.group_add(
+            self.room_group_name,
+            self.channel_name
+        )
+        await self.accept()
+
+        # Send the current state so clients that connect late don't miss completion
+        await self.send(text_data=json.dumps({'type': 'ocr_job', **job}))
+
+    async def disconnect(self, close_code):
+        await self.channel_layer.group_discard(
+            self.room_group_name,
+            self.channel_name
+        )
+
+    async def ocr_job_update(self, event):
+        await self.send(text_data=json.dumps({'type': 'ocr_job', **event['job']}))
+
+    @database_sync_to_async
+    def get_job_status(self):
+        from .models import OCRJob
+        from .serializers import OCRJobSerializer
+
+        user = self.scope.get('user')
+        if user is None or not user.is_authenticated:
+            return None
+        job = (OCRJob.objects.select_related('receipt', 'receipt__payid')
+               .filter(job_id=self.job_id, receipt__payid__stuid=user).first())
+        return dict(OCRJobSerializer(job).data) if job else None
+
 class ChatConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.sender_id = self.scope['url_route']['kwargs']['sender_id']
@@ -145,13 +190,6 @@ class ChatConsumer(AsyncWebsocketConsumer):
         # Save message
         return Message.objects.create(chat_room=chat_room, sender=sender, content=message)
 
-
-
-
-        # Auto-mark messages as delivered when receiver connects
-        receiver = self.scope['user']
-        await self.mark_messages_delivered(receiver)
-
     async def mark_messages_delivered(self, receiver):
         unread = await database_sync_to_async(
             lambda: Message.objects.filter(receiver=receiver, is_delivered=False)
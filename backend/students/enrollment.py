@@ -0,0 +1,125 @@
+"""
+Enrollment creation shared by every payment path (PayHere checkout and
+webhook, single and bulk receipt verification).
+
+Classes are resolved with one ``IN`` query, already enrolled (student, class)
+pairs are skipped and the rest are bulk inserted with ``ignore_conflicts``
+against the unique constraint on Enrollment. A concurrent request can still
+insert a pair between the check and the insert, so the pairs are read back
+and only rows this call wrote are notified and returned. ``bulk_create``
+does not send ``post_save``, so instead of one instructor notification per
+row each class gets a single notification covering all of its new students.
+"""
+import logging
+from collections import defaultdict
+
+from instructor.models import Class, InstructorNotification
+from .calendar_store import refresh_enrollments
+from .models import Enrollment
+from .utils.cache_versions import bump_version
+
+logger = logging.getLogger(__name__)
+
+
+def _student_name(student):
+    return f"{student.user.first_name} {student.user.last_name}".strip() or student.user.username
+
+
+class EnrollmentService:
+    @classmethod
+    def enroll_many(cls, student, class_ids, payment=None):
+        """
+        Enroll ``student`` (a StudentProfile) in the classes with the given
+        ``Class.classid`` codes. Returns the newly created enrollments.
+        """
+        return cls.enroll_batch([(student, class_ids, payment)])
+
+    @classmethod
+    def enroll_batch(cls, requests):
+        """
+        Enroll several students at once from ``(student, class_ids, payment)``
+        tuples, with a constant number of queries for the whole batch.
+        """
+        requests = [(student, list(class_ids or []), payment) for student, class_ids, payment in requests]
+        codes = {code for _, class_ids, _ in requests for code in class_ids}
+        if not codes:
+            return []
+
+        classes = {
+            class_obj.classid: class_obj
+            for class_obj in Class.objects.filter(classid__in=codes).select_related("instructor")
+        }
+        unknown = codes - classes.keys()
+        if unknown:
+            logger.warning(f"Skipping enrollment in unknown classes: {', '.join(sorted(map(str, unknown)))}")
+
+        students = {student.pk: student for student, _, _ in requests}
+        enrolled = set(
+            Enrollment.objects.filter(stuid__in=list(students), classid__in=classes.values())
+            .values_list("stuid_id", "classid_id")
+        )
+
+        enrollments = []
+        for student, class_ids, payment in requests:
+            for code in class_ids:
+                class_obj = classes.get(code)
+                if class_obj is None or (student.pk, class_obj.pk) in enrolled:
+                    continue
+                enrolled.add((student.pk, class_obj.pk))
+                enrollments.append(Enrollment(stuid=student, classid=class_obj, payid=payment))
+
+        Enrollment.objects.bulk_create(enrollments, ignore_conflicts=True)
+        enrollments = cls.inserted(enrollments)
+        if enrollments:
+            bump_version("payments")  # bulk_create sends no post_save
+            refresh_enrollments((enrollment.stuid_id, enrollment.classid_id) for enrollment in enrollments)
+        cls.notify_instructors(enrollments)
+        return enrollments
+
+    @staticmethod
+    def inserted(enrollments):
+        """
+        The ``enrollments`` that ``bulk_create(ignore_conflicts=True)`` actually
+        wrote, with their primary keys set. A pair's stored row is ours if it
+        has our payment and our timestamp; otherwise another request won the race.
+        """
+        if not enrollments:
+            return []
+        stored = {
+            (student_id, class_id): (enrollid, payment_id, timestamp)
+            for enrollid, student_id, class_id, payment_id, timestamp in Enrollment.objects.filter(
+                stuid__in={enrollment.stuid_id for enrollment in enrollments},
+                classid__in={enrollment.classid_id for enrollment in enrollments},
+            ).values_list("enrollid", "stuid_id", "classid_id", "payid_id", "timestamp")
+        }
+        inserted = []
+        for enrollment in enrollments:
+            enrollid, payment_id, timestamp = stored.get((enrollment.stuid_id, enrollment.classid_id), (None,) * 3)
+            if enrollid is not None and (payment_id, timestamp) == (enrollment.payid_id, enrollment.timestamp):
+                enrollment.pk = enrollid
+                enrollment._state.adding = False
+                inserted.append(enrollment)
+        return inserted
+
+    @staticmethod
+    def notify_instructors(enrollments):
+        """One "New Student Enrollment" notification per class."""
+        by_class = defaultdict(list)
+        for enrollment in enrollments:
+            by_class[enrollment.classid].append(enrollment.stuid)
+
+        notifications = []
+        for class_obj, students in by_class.items():
+            if len(students) == 1:
+                message = f"Student {_student_name(students[0])} has enrolled in your class '{class_obj.title}'."
+            else:
+                names = ", ".join(_student_name(student) for student in students)
+                message = f"{len(students)} new students have enrolled in your class '{class_obj.title}': {names}."
+            notifications.append(InstructorNotification(
+                instructor=class_obj.instructor,
+                title="New Student Enrollment",
+                message=message,
+                type="enrollment",
+                color="green",
+            ))
+        InstructorNotification.objects.bulk_create(notifications)
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from students.models import ReceiptPayment
+from students.ocr.duplicates import flag_near_duplicate
+from students.ocr.phash import receipt_phash
+
+
+class Command(BaseCommand):
+    help = 'Compute perceptual hashes for receipts uploaded before hashing existed and flag near-duplicates'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=200, help='Receipts fetched per query')
+        parser.add_argument('--no-flag', action='store_true', help='Only store hashes, skip near-duplicate flagging')
+
+    def handle(self, *args, **options):
+        hashed = failed = 0
+        receipts = ReceiptPayment.objects.filter(phash__isnull=True).order_by('pk')
+        for receipt in receipts.iterator(chunk_size=options['chunk_size']):
+            try:
+                with receipt.image_url.open('rb') as image_file:
+                    receipt.phash = receipt_phash(image_file.read())
+            except (FileNotFoundError, ValueError) as e:
+                self.stderr.write(f'{receipt.receiptid}: {e}')
+                failed += 1
+                continue
+            if receipt.phash is None:
+                failed += 1
+                continue
+            receipt.save(update_fields=['phash'])
+            hashed += 1
+
+        flagged = 0
+        if not options['no_flag']:
+            unflagged = ReceiptPayment.objects.filter(phash__isnull=False, near_duplicate_of__isnull=True).order_by('pk')
+            for receipt in unflagged.iterator(chunk_size=options['chunk_size']):
+                if flag_near_duplicate(receipt):
+                    flagged += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Hashed {hashed} receipts ({failed} failed), flagged {flagged} near-duplicates.'
+        ))
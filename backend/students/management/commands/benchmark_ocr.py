@@ -0,0 +1,183 @@
+import hashlib
+import json
+import os
+import platform
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from students.ocr.backends import BACKEND_ORDER, available_backends, percentile
+from students.ocr.buffers import ImageBuffer
+from students.ocr.extraction import CORPUS_PATH, FIELD_NAMES, extract, field_mismatches, load_corpus
+from .benchmark_tesseract import IMAGE_EXTENSIONS
+
+
+def load_ground_truth(path):
+    """
+    Expected fields keyed by image SHA-256 (and by file name as a fallback),
+    from a corpus file in the students/ocr/corpus/receipts.json format.
+    """
+    truth = {}
+    for receipt in load_corpus(path):
+        if receipt.get('sha256'):
+            truth.setdefault(receipt['sha256'], receipt['expected'])
+        if receipt.get('image'):
+            truth.setdefault(Path(receipt['image']).name, receipt['expected'])
+    return truth
+
+
+class Command(BaseCommand):
+    help = ('Replay receipt images through each OCR backend and the field extractor; report latency, '
+            'throughput and field accuracy and write a JSON report')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', type=str, default=str(Path(settings.MEDIA_ROOT) / 'receipts'),
+                            help='Directory of receipt images')
+        parser.add_argument('--ground-truth', type=str, default=str(CORPUS_PATH),
+                            help='Corpus JSON with expected fields per image')
+        parser.add_argument('--backends', type=str, default='',
+                            help=f'Comma-separated backends to run (default: all available of {", ".join(BACKEND_ORDER)})')
+        parser.add_argument('--concurrency', type=int, default=1, help='Images OCR\'d in parallel')
+        parser.add_argument('--unique', action='store_true', help='Skip byte-identical copies of an image')
+        parser.add_argument('--output', type=str, default='',
+                            help='Report path (default: benchmark_reports/ocr-<timestamp>.json)')
+
+    def handle(self, *args, **options):
+        images = self.collect_images(Path(options['dir']), options['unique'])
+        truth = load_ground_truth(options['ground_truth'])
+
+        selected = {name.strip() for name in options['backends'].split(',') if name.strip()}
+        unknown = selected - set(BACKEND_ORDER)
+        if unknown:
+            raise CommandError(f'Unknown backends: {", ".join(sorted(unknown))}')
+        backends = [backend for backend in available_backends() if not selected or backend.name in selected]
+        skipped = [name for name in BACKEND_ORDER
+                   if (not selected or name in selected) and name not in {b.name for b in backends}]
+        for name in skipped:
+            self.stderr.write(f'Skipping {name}: backend is not available')
+
+        concurrency = max(1, options['concurrency'])
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': {
+                'python': platform.python_version(),
+                'cpu_count': os.cpu_count(),
+                'concurrency': concurrency,
+                'tesseract_preprocess': settings.OCR_TESSERACT_PREPROCESS,
+                'process_workers': settings.OCR_PROCESS_WORKERS,
+            },
+            'images': len(images),
+            'images_with_ground_truth': sum(1 for image in images if self.expected_for(image, truth)),
+            'skipped_backends': skipped,
+            'backends': {},
+        }
+
+        self.stdout.write(f'{len(images)} images, {report["images_with_ground_truth"]} with ground truth')
+        for backend in backends:
+            result = self.run_backend(backend, images, truth, concurrency)
+            report['backends'][backend.name] = result
+            accuracy = result['field_accuracy']
+            self.stdout.write(
+                f'{backend.name:>14}: p50 {result["latency_ms"]["p50"]} ms  p95 {result["latency_ms"]["p95"]} ms  '
+                f'{result["throughput_per_sec"]:.2f} img/s ({result["throughput_per_core"]:.2f}/core)  '
+                f'errors {result["errors"]}  '
+                f'accuracy {f"{accuracy:.1f}%" if accuracy is not None else "n/a"}'
+            )
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmark_reports' /
+                      f'ocr-{datetime.now():%Y%m%d-%H%M%S}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'Report written to {output}'))
+
+    def collect_images(self, directory, unique):
+        if not directory.is_dir():
+            raise CommandError(f'{directory} is not a directory')
+        images, seen = [], set()
+        for path in sorted(p for p in directory.iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS):
+            with ImageBuffer(path) as buffer:
+                digest = hashlib.sha256(buffer.view).hexdigest()
+            if unique and digest in seen:
+                continue
+            seen.add(digest)
+            images.append({'path': path, 'sha256': digest})
+        if not images:
+            raise CommandError(f'No images found in {directory}')
+        return images
+
+    @staticmethod
+    def expected_for(image, truth):
+        return truth.get(image['sha256']) or truth.get(image['path'].name)
+
+    def run_backend(self, backend, images, truth, concurrency):
+        def ocr(image):
+            start = time.perf_counter()
+            try:
+                with ImageBuffer(image['path']) as buffer:
+                    text = backend.extract_text(buffer)
+                error = None
+            except Exception as e:
+                text, error = None, str(e)
+            return image, text, error, (time.perf_counter() - start) * 1000
+
+        wall_start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            outcomes = list(pool.map(ocr, images))
+        wall_seconds = time.perf_counter() - wall_start
+
+        latencies, extract_latencies = [], []
+        field_totals = {name: 0 for name in FIELD_NAMES}
+        field_correct = {name: 0 for name in FIELD_NAMES}
+        per_image, errors = [], 0
+        for image, text, error, elapsed_ms in outcomes:
+            latencies.append(elapsed_ms)
+            entry = {'file': image['path'].name, 'latency_ms': round(elapsed_ms, 2), 'error': error}
+            if error:
+                errors += 1
+            expected = self.expected_for(image, truth)
+            if text is not None:
+                start = time.perf_counter()
+                extraction = extract(text)
+                extract_latencies.append((time.perf_counter() - start) * 1000)
+                entry['template'] = extraction.template
+                if expected:
+                    mismatches = field_mismatches(extraction.fields, expected)
+                    entry['mismatched_fields'] = mismatches
+            elif expected:
+                mismatches = list(FIELD_NAMES)
+                entry['mismatched_fields'] = mismatches
+            if expected:
+                for name in FIELD_NAMES:
+                    field_totals[name] += 1
+                    field_correct[name] += name not in mismatches
+            per_image.append(entry)
+
+        scored = sum(field_totals.values())
+        throughput = len(images) / wall_seconds if wall_seconds else 0.0
+        return {
+            'latency_ms': {
+                'mean': round(statistics.mean(latencies), 2),
+                'p50': percentile(latencies, 0.50),
+                'p95': percentile(latencies, 0.95),
+                'max': round(max(latencies), 2),
+            },
+            'extraction_latency_ms': {
+                'p50': percentile(extract_latencies, 0.50),
+                'p95': percentile(extract_latencies, 0.95),
+            },
+            'wall_seconds': round(wall_seconds, 3),
+            'throughput_per_sec': round(throughput, 3),
+            'throughput_per_core': round(throughput / min(concurrency, os.cpu_count() or 1), 3),
+            'errors': errors,
+            'field_accuracy': round(100 * sum(field_correct.values()) / scored, 2) if scored else None,
+            'field_accuracy_by_field': {
+                name: round(100 * field_correct[name] / field_totals[name], 2) if field_totals[name] else None
+                for name in FIELD_NAMES
+            },
+            'per_image': per_image,
+        }
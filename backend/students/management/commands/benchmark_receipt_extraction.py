@@ -0,0 +1,115 @@
+import re
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from students.ocr.extraction import CORPUS_PATH, FIELD_NAMES, extract_receipt_fields, field_mismatches, load_corpus
+
+
+def legacy_extract_receipt_fields(full_text):
+    """The original cascade of uncompiled searches and strptime attempts."""
+    record_no_match = re.search(r'(?:Record No|Receipt No|Transaction ID|Ref No)[:\s]*(\d+)', full_text, re.IGNORECASE)
+    location_match = re.search(r'(?:Location|Branch)[:\s]*(.+?)(?:\n|$)', full_text, re.IGNORECASE)
+
+    paid_amount_match = re.search(r'(?:RS\.?|LKR\.?|Amount)[:\s]*([\d,]+\.?\d*)', full_text, re.IGNORECASE)
+    if not paid_amount_match:
+        paid_amount_match = re.search(r'([\d,]+\.?\d*)\s*(?:RS|LKR)', full_text, re.IGNORECASE)
+    if not paid_amount_match:
+        paid_amount_match = re.search(r'Total[:\s]*([\d,]+\.?\d*)', full_text, re.IGNORECASE)
+
+    account_no_match = re.search(r'(?:TO|Account)[:\s]*(\d+)', full_text, re.IGNORECASE)
+    account_name_match = re.search(r'(?:TO|Account)\s*\d+[:\s]*(.+?)(?:\n|$)', full_text, re.IGNORECASE)
+
+    date_match = re.search(r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})\s*(\d{1,2}:\d{2})', full_text)
+    if not date_match:
+        date_match = re.search(r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})', full_text)
+
+    paid_date_time = None
+    if date_match:
+        date_str = date_match.group(1)
+        time_str = date_match.group(2) if date_match.lastindex >= 2 else "00:00"
+        for date_format in ['%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y', '%Y/%m/%d', '%Y-%m-%d']:
+            try:
+                paid_date_time = datetime.strptime(f"{date_str} {time_str}", f"{date_format} %H:%M")
+                break
+            except ValueError:
+                continue
+
+    return {
+        "record_no": record_no_match.group(1) if record_no_match else None,
+        "location": location_match.group(1).strip() if location_match else None,
+        "paid_amount": paid_amount_match.group(1).replace(',', '') if paid_amount_match else None,
+        "account_no": account_no_match.group(1) if account_no_match else None,
+        "account_name": account_name_match.group(1).strip() if account_name_match else None,
+        "paid_date_time": paid_date_time,
+    }
+
+
+class Command(BaseCommand):
+    help = 'Benchmark receipt field extraction speed and accuracy against the receipt corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', type=str, default=str(CORPUS_PATH), help='Corpus JSON file')
+        parser.add_argument('--repeat', type=int, default=500, help='Timed runs per receipt and extractor')
+        parser.add_argument('--ocr', action='store_true',
+                            help='OCR the corpus images (from MEDIA_ROOT) instead of using the stored text')
+        parser.add_argument('--verbose', action='store_true', help='Print every mismatched field')
+
+    def handle(self, *args, **options):
+        receipts = load_corpus(options['corpus'])
+        if options['ocr']:
+            receipts = self.ocr_corpus(receipts)
+        if not receipts:
+            raise CommandError('The corpus is empty')
+
+        extractors = {'legacy': legacy_extract_receipt_fields, 'templates': extract_receipt_fields}
+        total_fields = len(receipts) * len(FIELD_NAMES)
+        mean_timings = {}
+        self.stdout.write(f'{len(receipts)} receipts x {options["repeat"]} runs')
+
+        for name, extractor in extractors.items():
+            timings = []
+            wrong = 0
+            for receipt in receipts:
+                start = time.perf_counter()
+                for _ in range(options['repeat']):
+                    fields = extractor(receipt['text'])
+                timings.append((time.perf_counter() - start) * 1e6 / options['repeat'])
+
+                mismatches = field_mismatches(fields, receipt['expected'])
+                wrong += len(mismatches)
+                if options['verbose']:
+                    for field_name in mismatches:
+                        self.stdout.write(f'  {name} {receipt["id"]} {field_name}: '
+                                          f'{fields.get(field_name)!r} != {receipt["expected"].get(field_name)!r}')
+
+            mean_us = mean_timings[name] = statistics.mean(timings)
+            accuracy = 100 * (total_fields - wrong) / total_fields
+            self.stdout.write(f'{name:>10}: avg {mean_us:8.1f} us/receipt  max {max(timings):8.1f} us  '
+                              f'{1e6 / mean_us:9.0f} receipts/s  accuracy {accuracy:5.1f}% '
+                              f'({total_fields - wrong}/{total_fields} fields)')
+
+        speedup = mean_timings['legacy'] / mean_timings['templates']
+        self.stdout.write(self.style.SUCCESS(f'Template engine is {speedup:.2f}x the speed of the legacy cascade'))
+
+    def ocr_corpus(self, receipts):
+        from students.ocr.pipeline import run_ocr
+
+        ocr_receipts = []
+        for receipt in receipts:
+            if not receipt.get('image'):
+                continue
+            image_path = Path(settings.MEDIA_ROOT) / receipt['image']
+            if not image_path.exists():
+                self.stderr.write(f'Skipping {receipt["id"]}: {image_path} not found')
+                continue
+            result = run_ocr(image_path.read_bytes())
+            if not result.text:
+                self.stderr.write(f'Skipping {receipt["id"]}: OCR found no text ({result.vision_error or "no backend"})')
+                continue
+            ocr_receipts.append({**receipt, 'text': result.text})
+        return ocr_receipts
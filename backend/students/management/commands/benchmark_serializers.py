@@ -0,0 +1,128 @@
+import json
+import os
+import platform
+import time
+import uuid
+from datetime import date, datetime, time as clock, timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from instructor.models import Class, Exam
+from instructor.serializers import ClassRows, ClassSerializer, ExamListRows, ExamListSerializer
+from students.models import ChatRoom, Message, Notification, StudentProfile
+from students.serializers import MessageRows, MessageSerializer, NotificationRows, NotificationSerializer
+
+User = get_user_model()
+
+# name -> (model, ModelSerializer, RowSerializer)
+SERIALIZERS = {
+    'class': (Class, ClassSerializer, ClassRows),
+    'exam_list': (Exam, ExamListSerializer, ExamListRows),
+    'message': (Message, MessageSerializer, MessageRows),
+    'notification': (Notification, NotificationSerializer, NotificationRows),
+}
+
+
+class Command(BaseCommand):
+    help = ('Compare list serialization throughput (rows/sec) of the DRF ModelSerializers with their '
+            'values()-based RowSerializer counterparts, on generated rows that are rolled back afterwards')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows generated per model')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per serializer; the best is reported')
+        parser.add_argument('--serializers', type=str, default='',
+                            help=f'Comma-separated subset of {", ".join(SERIALIZERS)}')
+        parser.add_argument('--output', type=str, default='',
+                            help='Report path (default: benchmark_reports/serializers-<timestamp>.json)')
+
+    def handle(self, *args, **options):
+        selected = [name.strip() for name in options['serializers'].split(',') if name.strip()] or list(SERIALIZERS)
+        unknown = set(selected) - set(SERIALIZERS)
+        if unknown:
+            raise CommandError(f'Unknown serializers: {", ".join(sorted(unknown))}')
+        rows, repeat = max(1, options['rows']), max(1, options['repeat'])
+
+        report = {
+            'generated_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': {'python': platform.python_version(), 'cpu_count': os.cpu_count()},
+            'rows': rows,
+            'repeat': repeat,
+            'serializers': {},
+        }
+        with transaction.atomic():
+            querysets = self.generate(rows)
+            for name in selected:
+                model, model_serializer, row_serializer = SERIALIZERS[name]
+                queryset = querysets[name]
+                drf_seconds = self.best_of(repeat, lambda: model_serializer(queryset.all(), many=True).data)
+                fast_seconds = self.best_of(repeat, lambda: row_serializer().serialize(queryset.all()))
+                result = {
+                    'model_serializer_rows_per_sec': round(rows / drf_seconds, 1),
+                    'row_serializer_rows_per_sec': round(rows / fast_seconds, 1),
+                    'speedup': round(drf_seconds / fast_seconds, 2),
+                }
+                report['serializers'][name] = result
+                self.stdout.write(
+                    f'{name:>13}: {model_serializer.__name__} {result["model_serializer_rows_per_sec"]:,.0f} rows/s  '
+                    f'{row_serializer.__name__} {result["row_serializer_rows_per_sec"]:,.0f} rows/s  '
+                    f'x{result["speedup"]}'
+                )
+            transaction.set_rollback(True)
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmark_reports' /
+                      f'serializers-{datetime.now():%Y%m%d-%H%M%S}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f'Report written to {output}'))
+
+    @staticmethod
+    def best_of(repeat, run):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    def generate(self, rows):
+        """Generated rows per serializer, as querysets over only those rows."""
+        tag = uuid.uuid4().hex[:8]
+        instructor = User.objects.create_user(username=f'bench-i-{tag}', password=None, role='instructor',
+                                              first_name='Bench', last_name='Instructor')
+        student_user = User.objects.create_user(username=f'bench-s-{tag}', password=None, role='student')
+        student = StudentProfile.objects.create(user=student_user, mobile='0770000000', nic_no=f'B{tag}',
+                                                address='-', year_of_al='2026', school_name='-')
+        today = date.today()
+        classes = Class.objects.bulk_create([
+            Class(classid=f'B{tag}-{index}', title=f'Class {index}', description='Benchmark class', fee=1500,
+                  instructor=instructor, start_date=today - timedelta(days=index % 60),
+                  end_date=today + timedelta(days=index % 90),
+                  schedule_summary='Mon, Wed - 03:30 PM–05:00 PM',
+                  schedule_groups=[{'start_time': '15:30', 'duration_minutes': 90,
+                                    'days_of_week': ['Monday', 'Wednesday']}])
+            for index in range(rows)
+        ])
+        Exam.objects.bulk_create([
+            Exam(examid=f'B{tag}-{index}', examname=f'Exam {index}', classid=classes[index % len(classes)],
+                 instructor=instructor, date=today, start_time=clock(9, 0), duration_minutes=90)
+            for index in range(rows)
+        ])
+        room = ChatRoom.objects.create(name='instructor', created_by=student_user)
+        Message.objects.bulk_create([
+            Message(chat_room=room, sender=student_user if index % 2 else instructor, content=f'Message {index}')
+            for index in range(rows)
+        ])
+        Notification.objects.bulk_create([
+            Notification(student_id=student, title=f'Notice {index}', message='Benchmark', type='exam')
+            for index in range(rows)
+        ])
+        return {
+            'class': Class.objects.filter(instructor=instructor).order_by('start_date'),
+            'exam_list': Exam.objects.filter(instructor=instructor).order_by('-created_at'),
+            'message': Message.objects.filter(chat_room=room).order_by('created_at'),
+            'notification': Notification.objects.filter(student_id=student).order_by('-created_at'),
+        }
@@ -0,0 +1,85 @@
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image
+
+from students.ocr.backends import TESSERACT_AVAILABLE
+from students.ocr.preprocess import preprocess_for_ocr
+
+IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff'}
+
+
+def legacy_tesseract(image_content):
+    """The original upload path: temp .jpg on disk, re-opened at full resolution."""
+    import pytesseract
+
+    with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_image:
+        temp_image.write(image_content)
+        temp_image_path = temp_image.name
+    try:
+        image = Image.open(temp_image_path)
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        return pytesseract.image_to_string(image, lang='eng').strip()
+    finally:
+        os.unlink(temp_image_path)
+
+
+def in_memory_tesseract(image_content):
+    import pytesseract
+
+    return pytesseract.image_to_string(preprocess_for_ocr(image_content), lang='eng').strip()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the in-memory preprocessed Tesseract path against the legacy temp-file path'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', type=str, default=str(Path(settings.MEDIA_ROOT) / 'receipts'),
+                            help='Directory of receipt images')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per image and path')
+        parser.add_argument('--preprocess-only', action='store_true',
+                            help='Only time preprocessing (no Tesseract binary needed)')
+
+    def handle(self, *args, **options):
+        images = sorted(p for p in Path(options['dir']).iterdir() if p.suffix.lower() in IMAGE_EXTENSIONS)
+        if not images:
+            raise CommandError(f"No images found in {options['dir']}")
+        if not options['preprocess_only'] and not TESSERACT_AVAILABLE:
+            raise CommandError('pytesseract is not installed; use --preprocess-only')
+
+        if options['preprocess_only']:
+            paths = {'preprocess': preprocess_for_ocr}
+        else:
+            paths = {'legacy': legacy_tesseract, 'in_memory': in_memory_tesseract}
+
+        timings = {name: [] for name in paths}
+        text_lengths = {name: [] for name in paths}
+        for image_path in images:
+            image_content = image_path.read_bytes()
+            for name, func in paths.items():
+                for _ in range(options['repeat']):
+                    start = time.perf_counter()
+                    output = func(image_content)
+                    timings[name].append((time.perf_counter() - start) * 1000)
+                if isinstance(output, str):
+                    text_lengths[name].append(len(output))
+
+        self.stdout.write(f'{len(images)} images x {options["repeat"]} runs')
+        for name, samples in timings.items():
+            samples.sort()
+            p95 = samples[min(len(samples) - 1, int(0.95 * len(samples)))]
+            line = (f'{name:>10}: avg {statistics.mean(samples):8.1f} ms  '
+                    f'p50 {statistics.median(samples):8.1f} ms  p95 {p95:8.1f} ms')
+            if text_lengths[name]:
+                line += f'  avg chars {statistics.mean(text_lengths[name]):.0f}'
+            self.stdout.write(line)
+
+        if 'legacy' in timings:
+            speedup = statistics.mean(timings['legacy']) / statistics.mean(timings['in_memory'])
+            self.stdout.write(self.style.SUCCESS(f'In-memory path is {speedup:.2f}x the speed of the legacy path'))
@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from students.models import OCRJob
+from students.ocr.jobs import get_executor, run_ocr_job_in_worker
+
+
+class Command(BaseCommand):
+    help = 'Process queued receipt OCR jobs (e.g. jobs left behind by a restarted web worker)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep polling for new queued jobs')
+        parser.add_argument('--interval', type=float, default=5.0, help='Seconds between polls when --loop is set')
+
+    def handle(self, *args, **options):
+        while True:
+            job_ids = list(
+                OCRJob.objects.filter(status='queued').order_by('created_at').values_list('job_id', flat=True)
+            )
+            if job_ids:
+                self.stdout.write(f'Processing {len(job_ids)} queued OCR jobs...')
+                futures = [get_executor().submit(run_ocr_job_in_worker, job_id) for job_id in job_ids]
+                for future in futures:
+                    future.result()
+                self.stdout.write(self.style.SUCCESS(f'Processed {len(job_ids)} OCR jobs.'))
+            elif not options['loop']:
+                self.stdout.write(self.style.SUCCESS('No queued OCR jobs found.'))
+
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from students.calendar_sync import prune_changes
+
+
+class Command(BaseCommand):
+    help = 'Delete calendar change log rows older than any sync token still accepted (run daily)'
+
+    def handle(self, *args, **options):
+        deleted = prune_changes()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} calendar changes.'))
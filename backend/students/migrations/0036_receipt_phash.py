@@ -0,0 +1,44 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0035_ocr_result_cache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receiptpayment',
+            name='near_duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='students.receiptpayment'),
+        ),
+        migrations.AddField(
+            model_name='receiptpayment',
+            name='phash',
+            field=models.BigIntegerField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='receiptpayment',
+            name='phash_block0',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='receiptpayment',
+            name='phash_block1',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='receiptpayment',
+            name='phash_block2',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='receiptpayment',
+            name='phash_block3',
+            field=models.IntegerField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0036_receipt_phash'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['stuid', '-date', '-id'], name='payment_history_idx'),
+        ),
+    ]
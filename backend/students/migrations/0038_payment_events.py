@@ -0,0 +1,39 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0037_payment_history_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcessedPaymentEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('order_id', models.CharField(max_length=100)),
+                ('status_code', models.CharField(max_length=4)),
+                ('payhere_payment_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('amount', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('processed_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='onlinepayment',
+            name='order_id',
+            field=models.CharField(blank=True, max_length=100, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='processedpaymentevent',
+            name='payment',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='events', to='students.payment'),
+        ),
+        migrations.AddConstraint(
+            model_name='processedpaymentevent',
+            constraint=models.UniqueConstraint(fields=('order_id', 'status_code'), name='unique_payment_event'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Min
+
+
+def remove_duplicate_enrollments(apps, schema_editor):
+    """
+    Keep the earliest enrollment of each (student, class) pair.
+
+    A removed duplicate can be a repeat payment's only link to its class, so
+    the classes of every payment losing an enrollment are first copied onto
+    it: ``class_names`` (read before the enrollments by the payment history
+    and the ledger) and, for online payments, ``class_ids``.
+    """
+    Enrollment = apps.get_model('students', 'Enrollment')
+    Payment = apps.get_model('students', 'Payment')
+    OnlinePayment = apps.get_model('students', 'OnlinePayment')
+    keep = (
+        Enrollment.objects.values('stuid', 'classid')
+        .annotate(first=Min('enrollid'))
+        .values_list('first', flat=True)
+    )
+    duplicates = Enrollment.objects.exclude(enrollid__in=list(keep))
+
+    classes = defaultdict(list)
+    for payment_id, title, code in (
+        Enrollment.objects.filter(payid__in=duplicates.exclude(payid=None).values('payid'))
+        .order_by('classid__title').values_list('payid_id', 'classid__title', 'classid__classid')
+    ):
+        classes[payment_id].append((title, code))
+    for payment in Payment.objects.filter(pk__in=classes).filter(models.Q(class_names=None) | models.Q(class_names='')):
+        payment.class_names = ', '.join(title for title, _ in classes[payment.pk])
+        payment.save(update_fields=['class_names'])
+    for online in OnlinePayment.objects.filter(payid__in=classes, class_ids__isnull=True):
+        online.class_ids = [code for _, code in classes[online.payid_id]]
+        online.save(update_fields=['class_ids'])
+
+    duplicates.delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('instructor', '0014_instructornotification'),
+        ('students', '0038_payment_events'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_enrollments, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='enrollment',
+            constraint=models.UniqueConstraint(fields=('stuid', 'classid'), name='unique_student_class_enrollment'),
+        ),
+    ]
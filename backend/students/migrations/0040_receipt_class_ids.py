@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0039_enrollment_unique_student_class'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receiptpayment',
+            name='class_ids',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0041_payment_ledger_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CalendarChange',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('occurrence', 'Webinar occurrence'), ('exam', 'Exam'), ('enrollment', 'Enrollment')], max_length=20)),
+                ('object_id', models.BigIntegerField()),
+                ('class_id', models.BigIntegerField(blank=True, null=True)),
+                ('webinar_id', models.BigIntegerField(blank=True, null=True)),
+                ('student_id', models.BigIntegerField(blank=True, null=True)),
+                ('deleted', models.BooleanField(default=False)),
+                ('changed_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:57
+
+from collections import defaultdict
+from datetime import datetime
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_student_calendar_events(apps, schema_editor):
+    Enrollment = apps.get_model('students', 'Enrollment')
+    StudentCalendarEvent = apps.get_model('students', 'StudentCalendarEvent')
+    ZoomOccurrence = apps.get_model('edu_admin', 'ZoomOccurrence')
+    Exam = apps.get_model('instructor', 'Exam')
+
+    pairs = list(Enrollment.objects.filter(payid__status='success').values_list('stuid_id', 'classid_id').distinct())
+    class_ids = {class_id for _, class_id in pairs}
+    events = defaultdict(list)
+    for row in ZoomOccurrence.objects.filter(webinar__class__in=class_ids).values(
+            'id', 'start_time', 'duration', 'webinar__topic', 'webinar__webinar_id',
+            'webinar__class__id', 'webinar__class__title'):
+        events[row['webinar__class__id']].append(dict(
+            occurrence_id=row['id'], event_type='zoom_meeting', title=row['webinar__topic'],
+            starts_at=row['start_time'], duration=row['duration'], webinarid=row['webinar__webinar_id'],
+            class_title=row['webinar__class__title'],
+        ))
+    for row in Exam.objects.filter(classid__in=class_ids, is_published=True).values(
+            'id', 'examname', 'date', 'start_time', 'duration_minutes', 'classid_id', 'classid__title'):
+        events[row['classid_id']].append(dict(
+            exam_id=row['id'], event_type='exam', title=row['examname'],
+            starts_at=timezone.make_aware(datetime.combine(row['date'], row['start_time'])),
+            duration=row['duration_minutes'], class_title=row['classid__title'],
+        ))
+    StudentCalendarEvent.objects.bulk_create(
+        [StudentCalendarEvent(student_id=student_id, class_obj_id=class_id, **fields)
+         for student_id, class_id in pairs for fields in events.get(class_id, ())],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edu_admin', '0006_occurrence_start_index'),
+        ('instructor', '0017_class_session_overrides'),
+        ('students', '0042_calendar_change_log'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentCalendarEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('zoom_meeting', 'Zoom meeting'), ('exam', 'Exam')], max_length=20)),
+                ('title', models.CharField(max_length=255)),
+                ('starts_at', models.DateTimeField()),
+                ('duration', models.PositiveIntegerField(blank=True, null=True)),
+                ('webinarid', models.CharField(blank=True, default='', max_length=50)),
+                ('class_title', models.CharField(max_length=200)),
+                ('class_obj', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='instructor.class')),
+                ('exam', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='instructor.exam')),
+                ('occurrence', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='edu_admin.zoomoccurrence')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calendar_entries', to='students.studentprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['student', 'starts_at'], name='student_calendar_window_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('occurrence__isnull', False)), fields=('student', 'class_obj', 'occurrence'), name='unique_student_occurrence'), models.UniqueConstraint(condition=models.Q(('exam__isnull', False)), fields=('student', 'exam'), name='unique_student_exam')],
+            },
+        ),
+        migrations.RunPython(fill_student_calendar_events, migrations.RunPython.noop),
+    ]
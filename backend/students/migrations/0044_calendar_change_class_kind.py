@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0043_student_calendar_events'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='calendarchange',
+            name='kind',
+            field=models.CharField(choices=[('occurrence', 'Webinar occurrence'), ('exam', 'Exam'), ('enrollment', 'Enrollment'), ('class', 'Class')], max_length=20),
+        ),
+    ]
@@ -4,6 +4,7 @@ import uuid
 from django.conf import settings
 from django.utils import timezone
 from django.contrib.postgres.fields import ArrayField
+from students.ocr.phash import hash_blocks
 
 # Student profile model (additional student-only fields)
 class StudentProfile(models.Model):
@@ -37,6 +38,14 @@ class Payment(models.Model):
     status = models.CharField(max_length=20,choices=[('success', 'Success'), ('fail', 'Fail'), ('pending' , 'Pending')], default='pending')
     class_names = models.TextField(blank=True, null=True, help_text="Comma-separated class names for this payment")
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a student's payment history, newest first
+            models.Index(fields=['stuid', '-date', '-id'], name='payment_history_idx'),
+            # Keyset pagination of the admin ledger
+            models.Index(fields=['-date', '-id'], name='payment_ledger_idx'),
+        ]
+
     def save(self, *args, **kwargs):
         if not self.payid:
             self.payid = f"PAY-{uuid.uuid4().hex[:6].upper()}"
@@ -65,6 +74,7 @@ class OnlinePayment(models.Model):
     onlinepayid = models.CharField(max_length=20, unique=True, blank=True)
     payid = models.OneToOneField(Payment, on_delete=models.CASCADE)
     invoice_no = models.CharField(max_length=100, unique=True)
+    order_id = models.CharField(max_length=100, unique=True, null=True, blank=True)  # PayHere checkout order id
     #status = models.CharField(max_length=10, choices=[('success', 'Success'), ('fail', 'Fail')])
     verified = models.BooleanField(default=False)
     # course_ids = ArrayField(models.IntegerField(), blank=True, default=list)
@@ -81,6 +91,27 @@ class OnlinePayment(models.Model):
         return f"Invoice: {self.invoice_no} - {self.status}"
 
 
+class ProcessedPaymentEvent(models.Model):
+    """
+    A PayHere notification that has been applied. PayHere retries webhooks, so
+    (order_id, status_code) is unique and a repeated notification is a no-op.
+    """
+    order_id = models.CharField(max_length=100)
+    status_code = models.CharField(max_length=4)
+    payment = models.ForeignKey(Payment, on_delete=models.SET_NULL, null=True, blank=True, related_name='events')
+    payhere_payment_id = models.CharField(max_length=100, null=True, blank=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    processed_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['order_id', 'status_code'], name='unique_payment_event'),
+        ]
+
+    def __str__(self):
+        return f"{self.order_id} ({self.status_code})"
+
+
 #Receipt Payment
 class ReceiptPayment(models.Model):
     receiptid = models.CharField(max_length=20, unique=True, blank=True)
@@ -94,17 +125,70 @@ class ReceiptPayment(models.Model):
     paid_amount = models.CharField(max_length=100, null=True, blank=True)
     account_no = models.CharField(max_length=50, null=True, blank=True)
     account_name = models.CharField(max_length=255, null=True, blank=True)
-
+    class_ids = models.JSONField(blank=True, null=True)  # Class.classid codes to enroll in once verified
+    content_hash = models.CharField(max_length=64, null=True, blank=True, db_index=True)  # SHA-256 of the image bytes
+    phash = models.BigIntegerField(null=True, blank=True, db_index=True)  # 64-bit perceptual hash of the image
+    # 16-bit slices of phash for the multi-index hamming lookup (students.ocr.duplicates)
+    phash_block0 = models.IntegerField(null=True, blank=True, db_index=True, editable=False)
+    phash_block1 = models.IntegerField(null=True, blank=True, db_index=True, editable=False)
+    phash_block2 = models.IntegerField(null=True, blank=True, db_index=True, editable=False)
+    phash_block3 = models.IntegerField(null=True, blank=True, db_index=True, editable=False)
+    near_duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='near_duplicates'
+    )
 
     def save(self, *args, **kwargs):
         if not self.receiptid:
             self.receiptid = f"RCP-{uuid.uuid4().hex[:6].upper()}"
+        blocks = hash_blocks(self.phash) if self.phash is not None else (None,) * 4
+        self.phash_block0, self.phash_block1, self.phash_block2, self.phash_block3 = blocks
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "phash" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "phash_block0", "phash_block1", "phash_block2", "phash_block3"}
         super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Receipt by {self.payid.stuid.username} - {'Verified' if self.verified else 'Unverified'}"
 
 
+#OCR Job for receipt uploads (processed by background workers)
+class OCRJob(models.Model):
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    receipt = models.ForeignKey(ReceiptPayment, on_delete=models.CASCADE, related_name='ocr_jobs')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued', db_index=True)
+    ocr_method = models.CharField(max_length=20, null=True, blank=True)
+    extracted_info = models.JSONField(null=True, blank=True)
+    error = models.TextField(null=True, blank=True)
+    cache_hit = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"OCR job {self.job_id} - {self.status}"
+
+
+#OCR result cache keyed by image content hash
+class OCRCacheEntry(models.Model):
+    content_hash = models.CharField(max_length=64, unique=True)  # SHA-256 hex digest
+    raw_text = models.TextField()
+    fields = models.JSONField(default=dict)
+    ocr_method = models.CharField(max_length=20)
+    hit_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"OCR cache {self.content_hash[:12]} ({self.ocr_method})"
+
+
 #Enrollment Model
 class Enrollment(models.Model):
     enrollid = models.AutoField(primary_key=True)
@@ -113,6 +197,12 @@ class Enrollment(models.Model):
     payid = models.ForeignKey('students.Payment', on_delete=models.CASCADE, null=True, blank=True)
     timestamp = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        constraints = [
+            # Lets payment paths insert with ignore_conflicts instead of check-then-create
+            models.UniqueConstraint(fields=['stuid', 'classid'], name='unique_student_class_enrollment'),
+        ]
+
     def __str__(self):
         return f"Enrollment {self.enrollid} - Student {self.stuid} in Class {self.classid}"
 
@@ -150,6 +240,78 @@ class CalendarEvent(models.Model):
         return f"{self.title} ({self.type})"
 
 
+class StudentCalendarEvent(models.Model):
+    """
+    One row per student and calendar event (a webinar session or published
+    exam of a class the student has paid for), maintained by the receivers
+    in students.signals. Titles are copied in so reading a calendar window
+    is a single range scan on ``(student, starts_at)``.
+    """
+    ZOOM_MEETING = 'zoom_meeting'
+    EXAM = 'exam'
+    EVENT_TYPES = [
+        (ZOOM_MEETING, 'Zoom meeting'),
+        (EXAM, 'Exam'),
+    ]
+
+    student = models.ForeignKey('students.StudentProfile', on_delete=models.CASCADE,
+                                related_name='calendar_entries')
+    class_obj = models.ForeignKey('instructor.Class', on_delete=models.CASCADE, related_name='+')
+    occurrence = models.ForeignKey('edu_admin.ZoomOccurrence', null=True, blank=True, on_delete=models.CASCADE,
+                                   related_name='+')
+    exam = models.ForeignKey('instructor.Exam', null=True, blank=True, on_delete=models.CASCADE, related_name='+')
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    title = models.CharField(max_length=255)
+    starts_at = models.DateTimeField()
+    duration = models.PositiveIntegerField(null=True, blank=True)
+    webinarid = models.CharField(max_length=50, blank=True, default='')
+    class_title = models.CharField(max_length=200)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['student', 'starts_at'], name='student_calendar_window_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['student', 'class_obj', 'occurrence'], name='unique_student_occurrence',
+                                    condition=models.Q(occurrence__isnull=False)),
+            models.UniqueConstraint(fields=['student', 'exam'], name='unique_student_exam',
+                                    condition=models.Q(exam__isnull=False)),
+        ]
+
+    def __str__(self):
+        return f"{self.title} for {self.student_id} at {self.starts_at}"
+
+
+class CalendarChange(models.Model):
+    """
+    Append-only log of changes to calendar sources, read by calendar sync.
+    The id is the sync position; the other ids are plain integers so the
+    log outlives the rows it describes.
+    """
+    OCCURRENCE = 'occurrence'
+    EXAM = 'exam'
+    ENROLLMENT = 'enrollment'
+    CLASS = 'class'
+    KIND_CHOICES = [
+        (OCCURRENCE, 'Webinar occurrence'),
+        (EXAM, 'Exam'),
+        (ENROLLMENT, 'Enrollment'),
+        (CLASS, 'Class'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    object_id = models.BigIntegerField()
+    class_id = models.BigIntegerField(null=True, blank=True)
+    webinar_id = models.BigIntegerField(null=True, blank=True)
+    student_id = models.BigIntegerField(null=True, blank=True)
+    deleted = models.BooleanField(default=False)
+    changed_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id} ({'deleted' if self.deleted else 'changed'})"
+
+
 class ChatRoom(models.Model):
     name = models.CharField(max_length=255)
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='chatrooms_created')
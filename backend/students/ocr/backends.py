@@ -0,0 +1,231 @@
+"""
+OCR backends for receipt processing.
+
+Each backend is a process-wide singleton. The Google Vision backend keeps one
+ImageAnnotatorClient (and its gRPC channel) per process instead of writing a
+temporary credentials file and building a new client on every upload. The
+client is rebuilt lazily when GOOGLE_APPLICATION_CREDENTIALS_JSON changes or
+after an authentication failure. Every call is timed so per-backend latency
+can be inspected through ``backend_metrics()``.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+# OCR Libraries with fallback support
+try:
+    from google.api_core import exceptions as google_exceptions
+    from google.cloud import vision
+    VISION_AVAILABLE = True
+except ImportError:
+    VISION_AVAILABLE = False
+
+try:
+    import pytesseract
+    from PIL import Image
+    TESSERACT_AVAILABLE = True
+except ImportError:
+    TESSERACT_AVAILABLE = False
+
+from django.conf import settings
+
+from students.utils.google_creds import load_google_credentials
+from .buffers import image_bytes, image_stream
+from .exceptions import OCRBackendError, OCRTimeout
+from .executor import get_process_pool
+from .preprocess import preprocess_for_ocr
+
+logger = logging.getLogger(__name__)
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of ``samples``, rounded; None when there are none."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return round(ordered[min(len(ordered) - 1, int(fraction * len(ordered)))], 2)
+
+
+class LatencyStats:
+    """Thread-safe latency counters with a bounded window for percentiles."""
+
+    def __init__(self, window=500):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.total_ms = 0.0
+
+    def record(self, elapsed_ms, ok=True):
+        with self._lock:
+            self.calls += 1
+            self.total_ms += elapsed_ms
+            if not ok:
+                self.errors += 1
+            self._samples.append(elapsed_ms)
+
+    def snapshot(self):
+        with self._lock:
+            samples = sorted(self._samples)
+            calls, errors, total_ms = self.calls, self.errors, self.total_ms
+
+        return {
+            "calls": calls,
+            "errors": errors,
+            "avg_ms": round(total_ms / calls, 2) if calls else None,
+            "p50_ms": percentile(samples, 0.50),
+            "p95_ms": percentile(samples, 0.95),
+            "max_ms": round(samples[-1], 2) if samples else None,
+        }
+
+
+class OCRBackend:
+    name = None
+    available = False
+
+    def __init__(self):
+        self.stats = LatencyStats()
+
+    def extract_text(self, image_content):
+        """Return OCR text for the image, timing the call."""
+        start = time.perf_counter()
+        ok = False
+        try:
+            text = self._extract_text(image_content)
+            ok = True
+            return text
+        finally:
+            self.stats.record((time.perf_counter() - start) * 1000, ok=ok)
+
+    def _extract_text(self, image_content):
+        raise NotImplementedError
+
+
+class VisionBackend(OCRBackend):
+    name = "google_vision"
+    available = VISION_AVAILABLE
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._client = None
+        self._credentials_fingerprint = None
+
+    @staticmethod
+    def _current_fingerprint():
+        creds_json_str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON") or ""
+        return hashlib.sha256(creds_json_str.encode("utf-8")).hexdigest()
+
+    def get_client(self):
+        """
+        Return the shared client, (re)building it only when the configured
+        credentials changed or the previous client was invalidated.
+        """
+        fingerprint = self._current_fingerprint()
+        client = self._client
+        if client is not None and fingerprint == self._credentials_fingerprint:
+            return client
+
+        with self._lock:
+            if self._client is None or fingerprint != self._credentials_fingerprint:
+                credentials = load_google_credentials()
+                self._client = vision.ImageAnnotatorClient(credentials=credentials)
+                self._credentials_fingerprint = fingerprint
+                logger.info("Initialised Google Vision client")
+            return self._client
+
+    def invalidate_client(self):
+        with self._lock:
+            self._client = None
+            self._credentials_fingerprint = None
+
+    def _extract_text(self, image_content):
+        try:
+            response = self.get_client().text_detection(image=vision.Image(content=image_bytes(image_content)))
+        except (google_exceptions.Unauthenticated, google_exceptions.PermissionDenied):
+            # Force a credentials reload on the next call
+            self.invalidate_client()
+            raise
+
+        # Check for Vision API errors (including billing issues)
+        if response.error.message:
+            raise OCRBackendError(f"Vision API error: {response.error.message}")
+
+        if not response.text_annotations:
+            raise OCRBackendError("No text detected by Vision API")
+
+        return response.text_annotations[0].description
+
+
+def tesseract_ocr(image_content, preprocess=True, timeout=0):
+    """
+    Run Tesseract over image bytes or an ImageBuffer. Executed inside the OCR
+    process pool, so it must stay a picklable module-level function; an
+    ImageBuffer arrives as its path and is re-mapped in the worker.
+    """
+    if preprocess:
+        # Decoded, rescaled, binarised and deskewed entirely in memory
+        image = preprocess_for_ocr(image_content)
+    else:
+        image = Image.open(image_stream(image_content))
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+
+    try:
+        # pytesseract kills the tesseract subprocess once the timeout expires
+        return pytesseract.image_to_string(image, lang='eng', timeout=timeout).strip()
+    except pytesseract.TesseractError:
+        raise
+    except RuntimeError as e:
+        raise OCRTimeout(f"Tesseract OCR timed out after {timeout}s") from e
+
+
+class TesseractBackend(OCRBackend):
+    name = "tesseract"
+    available = TESSERACT_AVAILABLE
+
+    def _extract_text(self, image_content):
+        # Tesseract is CPU-bound, so it runs in the process pool rather than on
+        # the calling thread; a saturated pool or a timeout raises OCRBackendError
+        text = get_process_pool().run(
+            tesseract_ocr,
+            image_content,
+            settings.OCR_TESSERACT_PREPROCESS,
+            settings.OCR_JOB_TIMEOUT_SECONDS,
+        )
+        if not text:
+            raise OCRBackendError("Tesseract OCR found no text")
+        return text
+
+
+_backends = {
+    VisionBackend.name: VisionBackend(),
+    TesseractBackend.name: TesseractBackend(),
+}
+
+# Order in which run_ocr tries the backends
+BACKEND_ORDER = (VisionBackend.name, TesseractBackend.name)
+
+
+def get_backend(name):
+    return _backends[name]
+
+
+def available_backends():
+    return [_backends[name] for name in BACKEND_ORDER if _backends[name].available]
+
+
+def available_ocr_summary():
+    return f"Vision: {'✅' if VISION_AVAILABLE else '❌'}, Tesseract: {'✅' if TESSERACT_AVAILABLE else '❌'}"
+
+
+def backend_metrics():
+    metrics = {
+        name: {"available": backend.available, **backend.stats.snapshot()}
+        for name, backend in _backends.items()
+    }
+    metrics["process_pool"] = get_process_pool().stats()
+    return metrics
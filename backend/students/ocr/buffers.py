@@ -0,0 +1,91 @@
+"""
+Memory-mapped receipt image buffers.
+
+An uploaded receipt is written to disk exactly once. Everything that needs
+its bytes afterwards (content hash, perceptual hash, Vision, Tesseract)
+reads the same read-only memory map instead of re-reading the file into new
+``bytes`` objects. ``ImageBuffer`` pickles as its path, so the Tesseract
+process pool maps the same file (and the same page cache) rather than
+receiving a copy of the image through a pipe.
+
+OCR helpers accept either an ``ImageBuffer`` or plain ``bytes``.
+"""
+import io
+import mmap
+
+
+class ImageBuffer:
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = None
+        self._map = None
+
+    @classmethod
+    def from_field_file(cls, field_file):
+        """Buffer for a stored FileField, or None if its storage has no local path."""
+        try:
+            return cls(field_file.path)
+        except NotImplementedError:
+            return None
+
+    def _ensure_open(self):
+        if self._file is None:
+            self._file = open(self.path, "rb")
+            try:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                self._map = None  # empty files cannot be mapped
+
+    @property
+    def view(self):
+        """Buffer-protocol view of the whole image (no copy)."""
+        self._ensure_open()
+        return self._map if self._map is not None else b""
+
+    def open(self):
+        """Independent file-like reader over the mapping (its own position)."""
+        self._ensure_open()
+        if self._map is None:
+            return io.BytesIO(b"")
+        return mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def __len__(self):
+        return len(self.view)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __reduce__(self):
+        return (self.__class__, (self.path,))
+
+
+def image_stream(image_content):
+    """File-like reader for an ImageBuffer or bytes."""
+    if isinstance(image_content, ImageBuffer):
+        return image_content.open()
+    return io.BytesIO(image_content)
+
+
+def image_view(image_content):
+    """Buffer-protocol object (for hashing) for an ImageBuffer or bytes."""
+    if isinstance(image_content, ImageBuffer):
+        return image_content.view
+    return image_content
+
+
+def image_bytes(image_content):
+    """Materialised bytes, for APIs (like Vision's protobuf) that need them."""
+    if isinstance(image_content, ImageBuffer):
+        return bytes(image_content.view)
+    return image_content
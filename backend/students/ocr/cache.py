@@ -0,0 +1,117 @@
+"""
+Persistent OCR result cache keyed by the SHA-256 of the receipt image bytes.
+
+Students often re-upload the same screenshot; a cache hit returns the stored
+OCR text and parsed fields without another Vision/Tesseract pass. Entries are
+evicted after OCR_CACHE_TTL_DAYS without use, and the least recently used
+entries are dropped once the table grows past OCR_CACHE_MAX_ENTRIES.
+"""
+import hashlib
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.utils import timezone
+
+from students.models import OCRCacheEntry
+from .buffers import image_view
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0}
+
+
+def content_hash(image_content):
+    return hashlib.sha256(image_view(image_content)).hexdigest()
+
+
+def _record(outcome):
+    with _stats_lock:
+        _stats[outcome] += 1
+
+
+def _serialize_fields(fields):
+    data = dict(fields)
+    if data.get("paid_date_time"):
+        data["paid_date_time"] = data["paid_date_time"].isoformat()
+    return data
+
+
+def _deserialize_fields(data):
+    fields = dict(data)
+    if fields.get("paid_date_time"):
+        fields["paid_date_time"] = datetime.fromisoformat(fields["paid_date_time"])
+    return fields
+
+
+def _ttl_cutoff():
+    return timezone.now() - timedelta(days=settings.OCR_CACHE_TTL_DAYS)
+
+
+def get_cached_ocr(digest):
+    """
+    Return (raw_text, fields, ocr_method) for a content hash, or None on a
+    miss. Expired entries count as misses.
+    """
+    entry = OCRCacheEntry.objects.filter(content_hash=digest, last_used_at__gte=_ttl_cutoff()).first()
+    if entry is None:
+        _record("misses")
+        return None
+
+    OCRCacheEntry.objects.filter(pk=entry.pk).update(
+        hit_count=F("hit_count") + 1, last_used_at=timezone.now()
+    )
+    _record("hits")
+    return entry.raw_text, _deserialize_fields(entry.fields), entry.ocr_method
+
+
+def store_ocr_result(digest, raw_text, fields, ocr_method):
+    OCRCacheEntry.objects.update_or_create(
+        content_hash=digest,
+        defaults={
+            "raw_text": raw_text,
+            "fields": _serialize_fields(fields),
+            "ocr_method": ocr_method,
+            "last_used_at": timezone.now(),
+        },
+    )
+    evict()
+
+
+def evict():
+    """Drop expired entries, then the least recently used ones above the size limit."""
+    expired, _ = OCRCacheEntry.objects.filter(last_used_at__lt=_ttl_cutoff()).delete()
+
+    overflow = OCRCacheEntry.objects.count() - settings.OCR_CACHE_MAX_ENTRIES
+    evicted = 0
+    if overflow > 0:
+        stale_ids = list(
+            OCRCacheEntry.objects.order_by("last_used_at").values_list("pk", flat=True)[:overflow]
+        )
+        evicted, _ = OCRCacheEntry.objects.filter(pk__in=stale_ids).delete()
+
+    if expired or evicted:
+        logger.info(f"OCR cache evicted {expired} expired and {evicted} LRU entries")
+
+
+def cache_stats():
+    """Hit/miss counters for this process plus lifetime totals from the table."""
+    with _stats_lock:
+        hits, misses = _stats["hits"], _stats["misses"]
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "entries": OCRCacheEntry.objects.count(),
+        "lifetime_hits": OCRCacheEntry.objects.aggregate(total=Sum("hit_count"))["total"] or 0,
+    }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats["hits"] = 0
+        _stats["misses"] = 0
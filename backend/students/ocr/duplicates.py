@@ -0,0 +1,66 @@
+"""
+Near-duplicate receipt lookup over the perceptual hash blocks stored on
+ReceiptPayment (see ``students.ocr.phash``).
+"""
+from django.conf import settings
+from django.db.models import Q
+
+from students.models import ReceiptPayment
+from .phash import BLOCK_COUNT, block_probes, hamming, hash_blocks, probe_radius
+
+
+def find_near_duplicates(phash, queryset=None, max_distance=None):
+    """
+    Receipts whose image hash is within ``max_distance`` bits of ``phash``,
+    as ``(receipt, distance)`` pairs ordered by distance.
+    """
+    if phash is None:
+        return []
+    return find_near_duplicates_many([phash], queryset, max_distance)[phash]
+
+
+def find_near_duplicates_many(phashes, queryset=None, max_distance=None):
+    """
+    Batched form of find_near_duplicates: one query probing the blocks of
+    every hash, returning ``{phash: [(receipt, distance), ...]}``.
+    """
+    phashes = {phash for phash in phashes if phash is not None}
+    if not phashes:
+        return {}
+    if max_distance is None:
+        max_distance = settings.RECEIPT_PHASH_MAX_DISTANCE
+    if queryset is None:
+        queryset = ReceiptPayment.objects.all()
+
+    radius = probe_radius(max_distance)
+    probes = [set() for _ in range(BLOCK_COUNT)]
+    for phash in phashes:
+        for index, block in enumerate(hash_blocks(phash)):
+            probes[index].update(block_probes(block, radius))
+    condition = Q()
+    for index, values in enumerate(probes):
+        condition |= Q(**{f"phash_block{index}__in": values})
+
+    matches = {phash: [] for phash in phashes}
+    for receipt in queryset.filter(condition):
+        for phash in phashes:
+            distance = hamming(phash, receipt.phash)
+            if distance <= max_distance:
+                matches[phash].append((receipt, distance))
+    for phash_matches in matches.values():
+        phash_matches.sort(key=lambda match: match[1])
+    return matches
+
+
+def flag_near_duplicate(receipt):
+    """
+    Point ``receipt.near_duplicate_of`` at the closest earlier receipt with a
+    near-identical image. Returns the matched receipt or None.
+    """
+    matches = find_near_duplicates(receipt.phash, ReceiptPayment.objects.filter(pk__lt=receipt.pk))
+    if not matches:
+        return None
+    receipt.near_duplicate_of = matches[0][0]
+    receipt.save(update_fields=["near_duplicate_of"])
+    return receipt.near_duplicate_of
+
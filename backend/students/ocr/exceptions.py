@@ -0,0 +1,10 @@
+class OCRBackendError(Exception):
+    """Raised when a backend fails to produce text for an image."""
+
+
+class OCRQueueFull(OCRBackendError):
+    """Raised when the OCR process pool is saturated and rejects new work."""
+
+
+class OCRTimeout(OCRBackendError):
+    """Raised when an OCR job exceeds its time budget."""
@@ -0,0 +1,185 @@
+"""
+Bounded process pool for CPU-bound OCR work.
+
+Tesseract runs in a small pool of pre-started worker processes instead of on
+the request/worker thread. The pool admits at most
+``OCR_PROCESS_WORKERS + OCR_PROCESS_QUEUE_DEPTH`` jobs at once; anything beyond
+that is rejected with OCRQueueFull rather than queued without limit. Jobs that
+exceed ``OCR_JOB_TIMEOUT_SECONDS`` raise OCRTimeout, and the pool is recycled
+so a stuck worker cannot hold a slot forever. Recycling kills every worker, so
+the other jobs that were in flight are resubmitted once to the fresh pool
+rather than failing with the stuck one. Callers treat both errors like any
+other OCR failure, i.e. the receipt falls back to manual verification.
+"""
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from .exceptions import OCRBackendError, OCRQueueFull, OCRTimeout
+
+logger = logging.getLogger(__name__)
+
+
+def _warm_worker():
+    """Process initializer: import the OCR stack once per worker process."""
+    try:
+        import pytesseract  # noqa: F401
+        from PIL import Image
+        Image.init()
+    except ImportError:
+        pass
+
+
+def _ping():
+    return True
+
+
+class OCRProcessPool:
+    def __init__(self, max_workers, queue_depth, timeout):
+        self.max_workers = max_workers
+        self.capacity = max_workers + queue_depth
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.capacity)
+        self._executor = None
+        # Bumped whenever the pool is torn down, to tell jobs lost to a recycle
+        # from jobs that broke the pool themselves
+        self._generation = 0
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timeouts = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    initializer=_warm_worker,
+                )
+                # Workers are spawned on demand; start them all up front so the
+                # first uploads don't pay process start-up cost
+                for _ in range(self.max_workers):
+                    self._executor.submit(_ping)
+            return self._executor
+
+    def warm_up(self):
+        self._get_executor()
+
+    def _release(self, future=None):
+        # Timed-out futures are released early and again by their done
+        # callback once the pool is torn down; only count the first one
+        with self._lock:
+            if future is not None:
+                if getattr(future, "_ocr_slot_released", False):
+                    return
+                future._ocr_slot_released = True
+            self._in_flight -= 1
+        self._slots.release()
+
+    def submit(self, fn, *args):
+        """Submit work to the pool, raising OCRQueueFull when it is saturated."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise OCRQueueFull(f"OCR queue is full ({self.capacity} jobs in flight)")
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            self._release()
+            self.recycle()
+            raise OCRBackendError("OCR worker pool crashed, please retry")
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def run(self, fn, *args, timeout=None):
+        """Run ``fn(*args)`` in the pool and wait for it, bounded by the job timeout."""
+        timeout = self.timeout if timeout is None else timeout
+        for attempt in range(2):
+            with self._lock:
+                generation = self._generation
+            future = self.submit(fn, *args)
+            try:
+                result = future.result(timeout=timeout or None)
+                break
+            except FutureTimeoutError:
+                future.cancel()
+                self._release(future)
+                with self._lock:
+                    self.timeouts += 1
+                logger.warning(f"OCR job exceeded {timeout}s, recycling process pool")
+                self.recycle()
+                raise OCRTimeout(f"OCR timed out after {timeout}s")
+            except BrokenProcessPool:
+                with self._lock:
+                    recycled = self._generation != generation
+                if recycled and attempt == 0:
+                    # Killed along with another job's stuck worker: run it again
+                    logger.info("OCR job lost to a pool recycle, resubmitting")
+                    continue
+                self.recycle()
+                raise OCRBackendError("OCR worker pool crashed, please retry")
+
+        with self._lock:
+            self.completed += 1
+        return result
+
+    def recycle(self):
+        """
+        Tear down the pool, killing busy workers, so a hung job can't keep its
+        slot. A fresh pool is created on the next submit, and jobs waiting in
+        ``run`` on the old one are resubmitted to it.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            if executor is None:
+                return
+            self._generation += 1
+        # ProcessPoolExecutor has no public API to stop a running task
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "capacity": self.capacity,
+                "in_flight": self._in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "timeouts": self.timeouts,
+            }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool():
+    """Process-wide OCR pool configured from settings."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = OCRProcessPool(
+                max_workers=settings.OCR_PROCESS_WORKERS,
+                queue_depth=settings.OCR_PROCESS_QUEUE_DEPTH,
+                timeout=settings.OCR_JOB_TIMEOUT_SECONDS,
+            )
+    return _pool
@@ -0,0 +1,190 @@
+"""
+Background OCR job queue for receipt uploads.
+
+ReceiptUploadView saves the image, Payment and ReceiptPayment rows, creates an
+OCRJob and returns immediately. The job is handed to a small in-process pool
+of worker threads which run OCR, fill in the ReceiptPayment fields and push
+status updates to the ``ocr_job_<id>`` Channels group. Jobs left in the
+``queued`` state (e.g. after a restart) are picked up by the
+``process_ocr_jobs`` management command.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from students.models import OCRJob
+from students.serializers import OCRJobSerializer
+from .backends import TESSERACT_AVAILABLE
+from .buffers import ImageBuffer
+from .cache import content_hash, get_cached_ocr, store_ocr_result
+from .executor import get_process_pool
+from .extraction import extract_receipt_fields
+from .pipeline import (
+    BILLING_HELP_MESSAGE,
+    MANUAL_VERIFICATION_MESSAGE,
+    OCRResult,
+    apply_receipt_fields,
+    extraction_log,
+    run_ocr,
+)
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Lazily create the process-wide OCR worker pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.OCR_WORKER_COUNT,
+                thread_name_prefix="ocr-worker",
+            )
+            if TESSERACT_AVAILABLE:
+                get_process_pool().warm_up()
+    return _executor
+
+
+def job_group_name(job_id):
+    return f"ocr_job_{job_id}"
+
+
+def create_ocr_job(receipt):
+    """
+    Create an OCRJob for a receipt and queue it once the surrounding
+    transaction commits.
+    """
+    job = OCRJob.objects.create(receipt=receipt)
+    transaction.on_commit(lambda: enqueue_ocr_job(job.job_id))
+    return job
+
+
+def complete_from_cache(receipt, cached):
+    """
+    Apply a cached OCR extraction to a freshly uploaded receipt and record it
+    as an already-completed job, skipping the worker pool entirely.
+    """
+    _raw_text, fields, ocr_method = cached
+    apply_receipt_fields(receipt, fields)
+    now = timezone.now()
+    return OCRJob.objects.create(
+        receipt=receipt,
+        status="completed",
+        ocr_method=ocr_method,
+        cache_hit=True,
+        extracted_info=extraction_log(fields),
+        started_at=now,
+        finished_at=now,
+    )
+
+
+def enqueue_ocr_job(job_id):
+    return get_executor().submit(run_ocr_job_in_worker, job_id)
+
+
+def run_ocr_job_in_worker(job_id):
+    """
+    Executor wrapper around run_ocr_job. Worker threads own their DB
+    connections, so stale ones are dropped before and after each job.
+    """
+    close_old_connections()
+    try:
+        run_ocr_job(job_id)
+    finally:
+        close_old_connections()
+
+
+@contextmanager
+def open_receipt_image(receipt):
+    """
+    Memory-map the stored receipt image for the OCR backends, falling back to
+    reading the bytes when the storage has no local path.
+    """
+    buffer = ImageBuffer.from_field_file(receipt.image_url)
+    if buffer is None:
+        with receipt.image_url.open("rb") as image_file:
+            yield image_file.read()
+        return
+    with buffer:
+        yield buffer
+
+
+def push_job_status(job):
+    """Send the current job state to websocket clients listening on the job."""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            job_group_name(job.job_id),
+            {"type": "ocr_job_update", "job": dict(OCRJobSerializer(job).data)},
+        )
+    except Exception as e:
+        # A missing/unreachable channel layer must never fail the job itself
+        logger.warning(f"Could not push OCR job {job.job_id} status: {e}")
+
+
+def claim_job(job_id):
+    """
+    Atomically move a queued job to running. Returns False if another worker
+    already claimed it.
+    """
+    return OCRJob.objects.filter(job_id=job_id, status="queued").update(
+        status="running", started_at=timezone.now()
+    ) == 1
+
+
+def run_ocr_job(job_id):
+    """OCR the job's receipt image and store the extracted fields."""
+    if not claim_job(job_id):
+        return
+
+    job = OCRJob.objects.select_related("receipt", "receipt__payid").get(job_id=job_id)
+    push_job_status(job)
+
+    try:
+        with open_receipt_image(job.receipt) as image_content:
+            digest = job.receipt.content_hash or content_hash(image_content)
+            cached = get_cached_ocr(digest)
+            if cached:
+                # An identical image was OCR'd while this job waited in the queue
+                result = OCRResult(text=cached[0], method=cached[2])
+                job.cache_hit = True
+            else:
+                result = run_ocr(image_content)
+
+        job.ocr_method = result.method
+        if result.text:
+            fields = cached[1] if cached else extract_receipt_fields(result.text)
+            with transaction.atomic():
+                apply_receipt_fields(job.receipt, fields)
+            if not cached:
+                store_ocr_result(digest, result.text, fields, result.method)
+            job.extracted_info = extraction_log(fields)
+            job.status = "completed"
+        else:
+            job.status = "failed"
+            job.error = MANUAL_VERIFICATION_MESSAGE
+            if result.vision_error:
+                job.error += f" Vision error: {result.vision_error}"
+            if result.is_billing_error:
+                job.error += f" {BILLING_HELP_MESSAGE}"
+    except Exception as e:
+        logger.exception(f"OCR job {job_id} crashed")
+        job.status = "failed"
+        job.error = f"{MANUAL_VERIFICATION_MESSAGE} {e}"
+
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "ocr_method", "extracted_info", "error", "cache_hit", "finished_at"])
+    push_job_status(job)
+    logger.info(f"OCR job {job_id} finished with status {job.status}")
@@ -0,0 +1,111 @@
+"""
+Perceptual hashing for receipt images.
+
+``image_phash`` computes a 64-bit DCT hash: the image is shrunk to 32x32
+grayscale, the low-frequency 8x8 corner of its DCT is taken and each
+coefficient becomes one bit (above/below the median). Re-compressed, resized
+or lightly rotated copies of a slip land within a few bits of each other,
+while different slips are typically 25+ bits apart.
+
+Near-duplicate lookup uses multi-index hashing: the hash is split into four
+16-bit blocks stored in indexed columns. By the pigeonhole principle two
+hashes within ``d`` bits share at least one block within ``d // 4`` bits, so
+probing every block with its few close variants finds all candidates with
+indexed equality lookups.
+"""
+import logging
+import math
+from itertools import combinations
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from .buffers import image_stream
+
+logger = logging.getLogger(__name__)
+
+DCT_SIZE = 32
+HASH_SIZE = 8
+HASH_BITS = HASH_SIZE * HASH_SIZE
+BLOCK_COUNT = 4
+BLOCK_BITS = HASH_BITS // BLOCK_COUNT
+BLOCK_MASK = (1 << BLOCK_BITS) - 1
+
+# Only the first HASH_SIZE DCT basis rows are ever needed
+_COSINES = [
+    [math.cos(math.pi * (2 * x + 1) * u / (2 * DCT_SIZE)) for x in range(DCT_SIZE)]
+    for u in range(HASH_SIZE)
+]
+
+
+def image_phash(image_content):
+    """64-bit perceptual hash (unsigned int) of the image bytes or ImageBuffer."""
+    image = Image.open(image_stream(image_content))
+    # Let the JPEG decoder downscale while decoding; the hash only needs 32x32
+    image.draft("L", (DCT_SIZE * 4, DCT_SIZE * 4))
+    image = ImageOps.exif_transpose(image).convert("L")
+    image = image.resize((DCT_SIZE, DCT_SIZE), Image.Resampling.LANCZOS)
+
+    pixels = list(image.getdata())
+    rows = [pixels[y * DCT_SIZE:(y + 1) * DCT_SIZE] for y in range(DCT_SIZE)]
+    # Separable 2D DCT restricted to the low-frequency corner
+    row_coefficients = [[sum(p * c for p, c in zip(row, basis)) for basis in _COSINES] for row in rows]
+    coefficients = [
+        sum(row_coefficients[y][u] * _COSINES[v][y] for y in range(DCT_SIZE))
+        for v in range(HASH_SIZE)
+        for u in range(HASH_SIZE)
+    ]
+
+    # The DC term only reflects overall brightness, so leave it out of the median
+    median = sorted(coefficients[1:])[(HASH_BITS - 1) // 2]
+    value = 0
+    for coefficient in coefficients:
+        value = (value << 1) | (coefficient > median)
+    return value
+
+
+def receipt_phash(image_content):
+    """
+    Perceptual hash in the signed form stored on ReceiptPayment.phash, or
+    None if the upload could not be decoded.
+    """
+    try:
+        return to_signed(image_phash(image_content))
+    except (UnidentifiedImageError, OSError, ValueError) as e:
+        logger.warning(f"Could not compute perceptual hash: {e}")
+        return None
+
+
+def to_signed(value):
+    """Map an unsigned 64-bit hash into the range of a BigIntegerField."""
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def to_unsigned(value):
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+def hash_blocks(value):
+    """Split a (signed or unsigned) hash into BLOCK_COUNT 16-bit blocks."""
+    value = to_unsigned(value)
+    return tuple((value >> (BLOCK_BITS * index)) & BLOCK_MASK for index in range(BLOCK_COUNT))
+
+
+def hamming(a, b):
+    return (to_unsigned(a) ^ to_unsigned(b)).bit_count()
+
+
+def probe_radius(max_distance):
+    """Per-block radius that guarantees every match within max_distance is found."""
+    return max_distance // BLOCK_COUNT
+
+
+def block_probes(block, radius):
+    """Every block value within ``radius`` bits of ``block``."""
+    probes = [block]
+    for distance in range(1, radius + 1):
+        for bits in combinations(range(BLOCK_BITS), distance):
+            flipped = block
+            for bit in bits:
+                flipped ^= 1 << bit
+            probes.append(flipped)
+    return probes
@@ -0,0 +1,87 @@
+"""
+Receipt OCR pipeline: text extraction (Google Vision with Tesseract fallback,
+see ``students.ocr.backends``) and parsing of the payment fields out of the
+extracted text (see ``students.ocr.extraction``).
+
+Used by the background OCR workers in ``students.ocr.jobs`` so that
+ReceiptUploadView never runs OCR on the request thread.
+"""
+import logging
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from django.utils import timezone
+
+from .backends import VisionBackend, available_backends
+
+logger = logging.getLogger(__name__)
+
+MANUAL_VERIFICATION_MESSAGE = "Receipt uploaded successfully. OCR processing failed, manual verification required."
+BILLING_HELP_MESSAGE = "Please enable billing in your Google Cloud project: https://console.developers.google.com/billing/enable?project=249055087183"
+
+
+@dataclass
+class OCRResult:
+    text: str = None
+    method: str = "none"
+    vision_error: str = None
+
+    @property
+    def is_billing_error(self):
+        return bool(self.vision_error) and (
+            "billing" in self.vision_error.lower() or "403" in self.vision_error
+        )
+
+
+def run_ocr(image_content):
+    """
+    Run OCR over the raw image bytes, trying Google Vision first and falling
+    back to Tesseract. Returns an OCRResult; ``text`` is None if every
+    backend failed.
+    """
+    result = OCRResult()
+
+    for backend in available_backends():
+        try:
+            result.text = backend.extract_text(image_content)
+            result.method = backend.name
+            return result
+        except Exception as e:
+            if backend.name == VisionBackend.name:
+                result.vision_error = str(e)
+            logger.info(f"{backend.name} OCR failed: {e}")
+
+    return result
+
+
+def extraction_log(fields):
+    """Summary of extracted fields in the shape returned to the frontend."""
+    return {
+        "record_no": fields.get("record_no") or "Not found",
+        "location": fields.get("location") or "Not found",
+        "amount": fields.get("paid_amount") or "Not found",
+        "account_no": fields.get("account_no") or "Not found",
+        "date": fields["paid_date_time"].isoformat() if fields.get("paid_date_time") else "Not found",
+    }
+
+
+def apply_receipt_fields(receipt, fields):
+    """
+    Copy extracted fields onto a ReceiptPayment and sync the parsed amount to
+    its Payment row.
+    """
+    for name in ("record_no", "location", "paid_amount", "account_no", "account_name", "paid_date_time"):
+        setattr(receipt, name, fields.get(name))
+    if receipt.paid_date_time and timezone.is_naive(receipt.paid_date_time):
+        receipt.paid_date_time = timezone.make_aware(receipt.paid_date_time)
+    receipt.save(update_fields=[
+        "record_no", "location", "paid_amount", "account_no", "account_name", "paid_date_time",
+    ])
+
+    if fields.get("paid_amount"):
+        try:
+            payment = receipt.payid
+            payment.amount = Decimal(fields["paid_amount"])
+            payment.save(update_fields=["amount"])
+        except InvalidOperation:
+            logger.warning(f"Could not parse amount: {fields['paid_amount']}")
@@ -0,0 +1,112 @@
+"""
+Streaming upload handler for receipt images.
+
+Django's default handlers buffer the upload, after which the view used to
+read it again for hashing and OCR. ``ReceiptUploadHandler`` does the work in
+one pass as chunks arrive:
+
+* the SHA-256 is updated incrementally,
+* the byte limit is enforced per chunk and the pixel limit as soon as the
+  image header has arrived, so oversized uploads are rejected without
+  receiving the rest of the body,
+* the chunks are written once, to a temporary file on the same filesystem as
+  MEDIA_ROOT so saving the receipt is a rename rather than a copy.
+"""
+import hashlib
+import io
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile, UploadedFile
+from django.core.files.uploadhandler import StopUpload, TemporaryFileUploadHandler
+from PIL import Image, UnidentifiedImageError
+
+logger = logging.getLogger(__name__)
+
+# Give up identifying the image once this much data arrived without a readable header
+HEADER_PROBE_LIMIT = 256 * 1024
+
+
+class ReceiptUploadRejected(Exception):
+    def __init__(self, message, status_code=400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def upload_temp_dir():
+    path = settings.RECEIPT_UPLOAD_TEMP_DIR or os.path.join(settings.MEDIA_ROOT, ".uploads")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+class ReceiptUploadedFile(TemporaryUploadedFile):
+    """TemporaryUploadedFile created in the receipt upload temp dir."""
+
+    def __init__(self, name, content_type, size, charset, content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(suffix=".upload" + ext, dir=upload_temp_dir())
+        UploadedFile.__init__(self, file, name, content_type, size, charset, content_type_extra)
+        self.sha256 = None
+        self.image_size = None
+
+
+class ReceiptUploadHandler(TemporaryFileUploadHandler):
+    def __init__(self, request=None, max_bytes=None, max_pixels=None):
+        super().__init__(request)
+        self.max_bytes = max_bytes or settings.RECEIPT_UPLOAD_MAX_BYTES
+        self.max_pixels = max_pixels or settings.RECEIPT_UPLOAD_MAX_PIXELS
+        self.error = None
+
+    def new_file(self, *args, **kwargs):
+        super(TemporaryFileUploadHandler, self).new_file(*args, **kwargs)
+        if self.content_length and self.content_length > self.max_bytes:
+            self.reject(self._too_large_message(), status_code=413)
+        self.file = ReceiptUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self._hasher = hashlib.sha256()
+        self._header = bytearray()
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_bytes:
+            self.reject(self._too_large_message(), status_code=413)
+        self._hasher.update(raw_data)
+        if self.file.image_size is None:
+            self._probe_header(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self.file.image_size is None:
+            # Tiny files finish before the probe limit; make the final attempt
+            self._probe_header(b"", final=True)
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self._hasher.hexdigest()
+        return self.file
+
+    def _probe_header(self, raw_data, final=False):
+        self._header += raw_data
+        try:
+            # Image.open only parses the header; pixels are never decoded here
+            with Image.open(io.BytesIO(self._header)) as image:
+                size = image.size
+        except Image.DecompressionBombError:
+            self.reject("Uploaded image has too many pixels to be a receipt.")
+            return
+        except (UnidentifiedImageError, OSError):
+            if final or len(self._header) >= HEADER_PROBE_LIMIT:
+                self.reject("Uploaded file is not a supported image.")
+            return
+        self._header = bytearray()
+        if size[0] * size[1] > self.max_pixels:
+            self.reject(f"Image is {size[0]}x{size[1]} pixels; the limit is {self.max_pixels:,} pixels.", status_code=413)
+        self.file.image_size = size
+
+    def _too_large_message(self):
+        return f"Receipt image is larger than {self.max_bytes // (1024 * 1024)} MB."
+
+    def reject(self, message, status_code=400):
+        self.error = ReceiptUploadRejected(message, status_code)
+        self.upload_interrupted()
+        # Keep the connection; the remaining body is drained without being stored
+        raise StopUpload(connection_reset=False)
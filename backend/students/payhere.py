@@ -0,0 +1,133 @@
+"""
+PayHere payment notification (webhook) processing.
+
+PayHere retries a notification until it gets a 200, and can deliver the same
+one several times concurrently. ``process_notification`` applies each
+``(order_id, status_code)`` exactly once:
+
+* replays of an already applied notification return after one indexed
+  ``exists()`` lookup, before any locking or writes,
+* otherwise the payment row is locked and the status update, the
+  ``ProcessedPaymentEvent`` insert and the enrollments happen in a single
+  transaction. A concurrent duplicate blocks on the event's unique index and
+  then fails with an IntegrityError, which is treated as a replay,
+* enrollments go through ``EnrollmentService``, which bulk inserts them
+  against the (student, class) unique constraint, so they never duplicate.
+"""
+import hashlib
+import hmac
+import logging
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .calendar_store import refresh_payments
+from .enrollment import EnrollmentService
+from .models import OnlinePayment, Payment, ProcessedPaymentEvent
+from .utils.cache_versions import bump_version
+
+logger = logging.getLogger(__name__)
+
+STATUS_SUCCESS = "2"
+STATUS_CHARGEDBACK = "-3"
+# PayHere status_code -> Payment.status
+PAYMENT_STATUSES = {"2": "success", "0": "pending", "-1": "fail", "-2": "fail", "-3": "fail"}
+
+PROCESSED = "processed"
+REPLAY = "replay"
+NOT_FOUND = "not_found"
+INVALID_SIGNATURE = "invalid_signature"
+
+
+@dataclass
+class NotificationResult:
+    outcome: str
+    http_status: int
+    detail: str
+
+
+class _PaymentNotFound(Exception):
+    pass
+
+
+def notification_signature(merchant_id, order_id, amount, currency, status_code, merchant_secret):
+    """The md5sig PayHere sends with a notification."""
+    hashed_secret = hashlib.md5(merchant_secret.encode()).hexdigest().upper()
+    hash_string = f"{merchant_id}{order_id}{amount}{currency}{status_code}{hashed_secret}"
+    return hashlib.md5(hash_string.encode()).hexdigest().upper()
+
+
+def verify_signature(data):
+    merchant_secret = settings.PAYHERE_MERCHANT_SECRET
+    received = data.get("md5sig")
+    if not merchant_secret or not received:
+        return False
+    expected = notification_signature(
+        settings.PAYHERE_MERCHANT_ID, data.get("order_id"), data.get("payhere_amount"),
+        data.get("payhere_currency"), data.get("status_code"), merchant_secret,
+    )
+    return hmac.compare_digest(expected, str(received).upper())
+
+
+def _parse_amount(value):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError):
+        return None
+
+
+def process_notification(data):
+    """Verify and apply one PayHere notification; safe to call repeatedly."""
+    if not verify_signature(data):
+        return NotificationResult(INVALID_SIGNATURE, 400, "Invalid signature")
+
+    order_id = data.get("order_id")
+    status_code = str(data.get("status_code"))
+    if ProcessedPaymentEvent.objects.filter(order_id=order_id, status_code=status_code).exists():
+        return NotificationResult(REPLAY, 200, "Notification already processed")
+
+    try:
+        with transaction.atomic():
+            online = (
+                OnlinePayment.objects.select_related("payid__stuid__student_profile")
+                .select_for_update(of=("self", "payid"))
+                .filter(Q(order_id=order_id) | Q(invoice_no=order_id))
+                .first()
+            )
+            if online is None:
+                raise _PaymentNotFound()
+            payment = online.payid
+
+            ProcessedPaymentEvent.objects.create(
+                order_id=order_id,
+                status_code=status_code,
+                payment=payment,
+                payhere_payment_id=data.get("payment_id"),
+                amount=_parse_amount(data.get("payhere_amount")),
+            )
+
+            new_status = PAYMENT_STATUSES.get(status_code)
+            bump_version("payments")  # queryset updates send no post_save
+            if status_code == STATUS_SUCCESS:
+                Payment.objects.filter(pk=payment.pk).update(status=new_status)
+                OnlinePayment.objects.filter(pk=online.pk).update(verified=True)
+                student_profile = getattr(payment.stuid, "student_profile", None)
+                if student_profile is None:
+                    logger.warning(f"Payment {payment.payid} has no student profile; no classes enrolled")
+                else:
+                    EnrollmentService.enroll_many(student_profile, online.class_ids, payment)
+            elif new_status and (payment.status != "success" or status_code == STATUS_CHARGEDBACK):
+                # A late pending/failed notification must not undo a successful payment
+                Payment.objects.filter(pk=payment.pk).update(status=new_status)
+            refresh_payments([payment.pk])
+    except _PaymentNotFound:
+        return NotificationResult(NOT_FOUND, 404, "Payment not found")
+    except IntegrityError:
+        # A concurrent delivery of the same notification committed first
+        return NotificationResult(REPLAY, 200, "Notification already processed")
+
+    logger.info(f"Applied PayHere notification {order_id} (status {status_code})")
+    return NotificationResult(PROCESSED, 200, "Payment notification processed")
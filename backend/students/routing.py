@@ -6,5 +6,6 @@ from . import consumers
 websocket_urlpatterns = [
     re_path(r'ws/chat/(?P<student_id>\d+)/admin/$', consumers.AdminChatConsumer.as_asgi()),
     re_path(r'ws/chat/(?P<sender_id>\d+)/(?P<receiver_id>\d+)/$', consumers.ChatConsumer.as_asgi()),
+    re_path(r'ws/ocr-jobs/(?P<job_id>[0-9a-f-]+)/$', consumers.OCRJobConsumer.as_asgi()),
 ]
 
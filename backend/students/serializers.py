@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model #Django's built-in auth system.
 from .models import CalendarEvent 
 from .models import ChatRoom, Message 
 from .models import CalendarEvent
+from .utils.row_serializers import RowSerializer
 
 User = get_user_model()
 
@@ -41,7 +42,8 @@ class OnlinePaymentSerializer(serializers.ModelSerializer):
 class ReceiptPaymentSerializer(serializers.ModelSerializer):
     class Meta:
         model = ReceiptPayment
-        fields = '__all__'
+        exclude = ['phash_block0', 'phash_block1', 'phash_block2', 'phash_block3']
+        read_only_fields = ['content_hash', 'phash', 'near_duplicate_of']
 
 class PaymentSerializer(serializers.ModelSerializer):
     online_payment = OnlinePaymentSerializer(source='onlinepayment', read_only=True)
@@ -113,6 +115,29 @@ class MessageSerializer(serializers.ModelSerializer):
         return getattr(obj, 'content', '') or getattr(obj, 'message', '') or ''
 
 
+class MessageRows(RowSerializer):
+    """MessageSerializer output for list GETs, from values() rows"""
+    model = Message
+    fields = {
+        'id': 'id', 'chat_room': 'chat_room_id', 'content': 'content', 'created_at': 'created_at',
+        'is_delivered': 'is_delivered', 'is_seen': 'is_seen',
+    }
+    computed = {
+        'sender': lambda row, context: {
+            'id': row['sender_id'],
+            'username': row['sender__username'],
+            'first_name': row['sender__first_name'],
+            'last_name': row['sender__last_name'],
+        },
+        'message': lambda row, context: row['content'] or '',
+    }
+    order = MessageSerializer.Meta.fields
+
+    @classmethod
+    def extra_lookups(cls):
+        return ('sender_id', 'sender__username', 'sender__first_name', 'sender__last_name')
+
+
 
 class CalendarEventSerializer(serializers.ModelSerializer):
     class Meta:
@@ -126,3 +151,22 @@ class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
         fields = ['note_id','student_id','title','message','type','read_status','created_at']
+
+class NotificationRows(RowSerializer):
+    """NotificationSerializer output for list GETs, from values() rows"""
+    model = Notification
+    fields = {
+        'note_id': 'note_id', 'student_id': 'student_id_id', 'title': 'title', 'message': 'message',
+        'type': 'type', 'read_status': 'read_status', 'created_at': 'created_at',
+    }
+
+
+from .models import OCRJob
+
+class OCRJobSerializer(serializers.ModelSerializer):
+    receiptid = serializers.CharField(source='receipt.receiptid', read_only=True)
+    payid = serializers.CharField(source='receipt.payid.payid', read_only=True)
+
+    class Meta:
+        model = OCRJob
+        fields = ['job_id', 'receiptid', 'payid', 'status', 'ocr_method', 'extracted_info', 'error', 'cache_hit', 'created_at', 'started_at', 'finished_at']
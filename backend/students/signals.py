@@ -1,38 +1,46 @@
-from django.db.models.signals import post_save
+"""
+Keep the materialized student calendar (``StudentCalendarEvent``) in step
+with enrollments, payments, classes, exams and webinar sessions. Deletions
+of occurrences, exams and classes cascade to their rows.
+"""
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
-from edu_admin.models import  ZoomWebinar, ZoomOccurrence 
-from instructor.models import Exams
-from students.models import CalendarEvent
-
-@receiver(post_save, sender=Exams)
-def create_exam_event(sender, instance, created, **kwargs):
-    if created:
-        CalendarEvent.objects.create(
-            title=instance.examname,
-            type='exam',
-            date=instance.date,
-            related_exam=instance,
-            color='blue'
-        )
+
+from edu_admin.models import ZoomOccurrence, ZoomWebinar
+from instructor.models import Class, Exam
+from .calendar_store import (refresh_class, refresh_enrollments, refresh_exam, refresh_occurrence,
+                             refresh_payments, rename_webinar)
+from .models import Enrollment, Payment
+
+
+@receiver([post_save, post_delete], sender=Enrollment)
+def update_enrollment_events(sender, instance, **kwargs):
+    refresh_enrollments([(instance.stuid_id, instance.classid_id)])
+
+
+@receiver(post_save, sender=Payment)
+def update_payment_events(sender, instance, created, **kwargs):
+    if not created:
+        refresh_payments([instance.pk])
+
+
+@receiver(post_save, sender=Class)
+def update_class_events(sender, instance, created, **kwargs):
+    if not created:
+        refresh_class(instance.pk)
+
+
+@receiver(post_save, sender=Exam)
+def update_exam_events(sender, instance, **kwargs):
+    refresh_exam(instance)
+
+
+@receiver(post_save, sender=ZoomOccurrence)
+def update_occurrence_events(sender, instance, **kwargs):
+    refresh_occurrence(instance)
+
 
 @receiver(post_save, sender=ZoomWebinar)
-def create_webinar_event(sender, instance, created, **kwargs):
-    if created and not instance.is_recurring:
-        CalendarEvent.objects.create(
-            title=instance.topic,
-            type='webinar',
-            date=instance.start_time,
-            related_webinar=instance,
-            color='yellow'
-        )
-
-# @receiver(post_save, sender=ZoomOccurrence)
-# def create_webinar_occurrence_event(sender, instance, created, **kwargs):
-#     if created:
-#         CalendarEvent.objects.create(
-#             title=instance.webinar.topic,
-#             type='webinar',
-#             date=instance.start_time,
-#             related_webinar=instance.webinar,
-#             color='yellow'
-#         )
+def update_webinar_events(sender, instance, created, **kwargs):
+    if not created:
+        rename_webinar(instance)
@@ -0,0 +1,72 @@
+import json
+import shutil
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from students.ocr.extraction import load_corpus
+
+BOC_IMAGE = "receipts/WhatsApp_Image_2025-06-27_at_18.33.17_06c895ee.jpg"
+
+
+class CorpusBackend:
+    """Returns the corpus transcription of the BOC slip for every image."""
+
+    name = "tesseract"
+
+    def __init__(self):
+        self.text = next(r["text"] for r in load_corpus() if r["id"] == "boc-crm-mannar")
+
+    def extract_text(self, image_content):
+        return self.text
+
+
+class FailingBackend:
+    name = "google_vision"
+
+    def extract_text(self, image_content):
+        raise RuntimeError("quota exceeded")
+
+
+class BenchmarkOCRCommandTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.directory)
+        shutil.copy(Path(settings.MEDIA_ROOT) / BOC_IMAGE, self.directory / "slip.jpg")
+        shutil.copy(Path(settings.MEDIA_ROOT) / BOC_IMAGE, self.directory / "slip-copy.jpg")
+        self.output = self.directory / "report.json"
+
+    def run_benchmark(self, backends, *args):
+        with mock.patch("students.management.commands.benchmark_ocr.available_backends", return_value=backends):
+            call_command(
+                "benchmark_ocr", "--dir", str(self.directory), "--output", str(self.output), *args,
+                stdout=StringIO(), stderr=StringIO(),
+            )
+        return json.loads(self.output.read_text())
+
+    def test_report_scores_fields_against_ground_truth(self):
+        report = self.run_benchmark([FailingBackend(), CorpusBackend()])
+
+        self.assertEqual(report["images"], 2)
+        self.assertEqual(report["images_with_ground_truth"], 2)
+        tesseract = report["backends"]["tesseract"]
+        self.assertEqual(tesseract["field_accuracy"], 100.0)
+        self.assertEqual(tesseract["errors"], 0)
+        self.assertIsNotNone(tesseract["latency_ms"]["p95"])
+        self.assertGreater(tesseract["throughput_per_core"], 0)
+
+        vision = report["backends"]["google_vision"]
+        self.assertEqual(vision["errors"], 2)
+        self.assertEqual(vision["field_accuracy"], 0.0)
+        self.assertEqual(vision["per_image"][0]["error"], "quota exceeded")
+
+    def test_unique_skips_identical_files_and_unavailable_backends_are_reported(self):
+        report = self.run_benchmark([CorpusBackend()], "--unique")
+
+        self.assertEqual(report["images"], 1)
+        self.assertEqual(report["skipped_backends"], ["google_vision"])
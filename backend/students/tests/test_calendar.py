@@ -0,0 +1,120 @@
+from datetime import date, datetime, time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from edu_admin.models import ZoomOccurrence, ZoomWebinar
+from instructor.models import Class, Exam
+from students.calendar import feed_token
+from students.models import Enrollment, Payment, StudentProfile
+
+User = get_user_model()
+
+
+def at(day, hour=10):
+    return timezone.make_aware(datetime.combine(day, time(hour, 0)))
+
+
+class CalendarTests(APITestCase):
+    url = "/students/calendar-events/"
+
+    def setUp(self):
+        cache.clear()
+        instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        self.user = User.objects.create_user(username="s1", password="pass1234", role="student",
+                                             first_name="Kavi")
+        self.student = StudentProfile.objects.create(user=self.user, mobile="077", nic_no="200000000001",
+                                                     address="Jaffna", year_of_al="2026", school_name="JHC")
+        self.client.force_authenticate(self.user)
+
+        paid = Payment.objects.create(stuid=self.user, method="online", amount=1500, status="success")
+        unpaid = Payment.objects.create(stuid=self.user, method="online", amount=1500, status="pending")
+        self.classes = {}
+        for title, payment in (("Chemistry", paid), ("Physics", paid), ("Biology", unpaid)):
+            webinar = ZoomWebinar.objects.create(webinar_id=f"w-{title}", account_key="a", topic=f"{title} live",
+                                                 duration=60, start_time=at(date(2025, 6, 1)))
+            class_obj = Class.objects.create(title=title, description="", fee=1500, instructor=instructor,
+                                             start_date=date(2025, 6, 1), end_date=date(2025, 7, 31),
+                                             webinar=webinar)
+            Enrollment.objects.create(stuid=self.student, classid=class_obj, payid=payment)
+            for index, day in enumerate((date(2025, 6, 2), date(2025, 6, 9), date(2025, 7, 7))):
+                ZoomOccurrence.objects.create(webinar=webinar, occurrence_id=f"{title}-{index}",
+                                              start_time=at(day), duration=90)
+            self.classes[title] = class_obj
+
+        chemistry = self.classes["Chemistry"]
+        self.exam = Exam.objects.create(examid="EXM-1", examname="Midterm", classid=chemistry, instructor=instructor,
+                                        date=date(2025, 6, 20), start_time=time(9, 0), is_published=True)
+        Exam.objects.create(examid="EXM-2", examname="Draft", classid=chemistry, instructor=instructor,
+                            date=date(2025, 6, 21), start_time=time(9, 0), is_published=False)
+        Exam.objects.create(examid="EXM-3", examname="Unpaid", classid=self.classes["Biology"],
+                            instructor=instructor, date=date(2025, 6, 22), start_time=time(9, 0), is_published=True)
+
+    def test_window_is_one_range_scan(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"start": "2025-06-01", "end": "2025-06-30"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(e["type"], e["class_title"]) for e in response.data], [
+            ("zoom_meeting", "Chemistry"), ("zoom_meeting", "Physics"),
+            ("zoom_meeting", "Chemistry"), ("zoom_meeting", "Physics"),
+            ("exam", "Chemistry"),
+        ])
+        self.assertEqual(response.data[-1]["title"], "📝 Midterm")
+        self.assertEqual(response.data[0]["date"], "2025-06-02T10:00:00+05:30")
+        # Student profile lookup plus the scan of the materialized events
+        self.assertEqual(len(queries), 2)
+
+    def test_end_is_inclusive_and_window_is_validated(self):
+        response = self.client.get(self.url, {"start": "2025-07-07", "end": "2025-07-07"})
+        self.assertEqual([e["class_title"] for e in response.data], ["Chemistry", "Physics"])
+
+        for params in ({"start": "2025-07-01", "end": "2025-06-01"}, {"start": "June"},
+                       {"start": "2025-01-01", "end": "2026-06-01"}):
+            self.assertEqual(self.client.get(self.url, params).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ics_feed_with_etag(self):
+        feed_url = self.client.get("/students/calendar-feed/").data["url"]
+        path = feed_url.replace("http://testserver", "")
+        anonymous = APIClient()
+
+        response = anonymous.get(path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        body = response.content.decode()
+        self.assertTrue(body.startswith("BEGIN:VCALENDAR\r\n"))
+        etag = response["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = anonymous.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 0)
+
+        self.exam.date = timezone.localdate()
+        self.exam.save()
+        response = anonymous.get(path, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("SUMMARY:Exam: Midterm", response.content.decode())
+
+    def test_ics_feed_content(self):
+        today = timezone.localdate()
+        Exam.objects.create(examid="EXM-4", examname="Quiz; part 1, basics", classid=self.classes["Physics"],
+                            instructor=self.classes["Physics"].instructor, date=today, start_time=time(9, 0),
+                            duration_minutes=45, is_published=True)
+        body = APIClient().get(f"/students/calendar/{feed_token(self.student)}.ics").content.decode()
+
+        self.assertIn("SUMMARY:Exam: Quiz\\; part 1\\, basics\r\n", body)
+        self.assertIn(f"DTSTART:{today:%Y%m%d}T033000Z\r\n", body)  # 09:00 Asia/Colombo
+        self.assertIn(f"DTEND:{today:%Y%m%d}T041500Z\r\n", body)
+        self.assertTrue(all(len(line.encode()) <= 75 for line in body.split("\r\n")))
+
+    def test_invalid_feed_token(self):
+        token = feed_token(self.student)
+        response = APIClient().get(f"/students/calendar/{token[:-1]}x.ics")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
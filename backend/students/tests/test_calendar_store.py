@@ -0,0 +1,93 @@
+from datetime import date, datetime, time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from edu_admin.models import ZoomOccurrence, ZoomWebinar
+from instructor.models import Class, Exam
+from students.calendar_store import refresh_payments
+from students.models import Enrollment, Payment, StudentCalendarEvent, StudentProfile
+
+User = get_user_model()
+
+
+def at(day, hour=10):
+    return timezone.make_aware(datetime.combine(day, time(hour, 0)))
+
+
+class StudentCalendarStoreTests(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        self.webinar = ZoomWebinar.objects.create(webinar_id="w1", account_key="a", topic="Chemistry live",
+                                                  duration=60, start_time=timezone.now())
+        self.class_obj = Class.objects.create(title="Chemistry", description="", fee=1500, instructor=self.instructor,
+                                              start_date=date(2025, 6, 1), end_date=date(2025, 7, 31),
+                                              webinar=self.webinar)
+        self.occurrence = ZoomOccurrence.objects.create(webinar=self.webinar, occurrence_id="o1",
+                                                        start_time=at(date(2025, 6, 2)), duration=90)
+        self.students = [self.enroll(index) for index in range(3)]
+
+    def enroll(self, index, status="success"):
+        user = User.objects.create_user(username=f"s{index}", password="pass1234", role="student")
+        student = StudentProfile.objects.create(user=user, mobile="077", nic_no=f"20000000000{index}",
+                                                address="Jaffna", year_of_al="2026", school_name="JHC")
+        payment = Payment.objects.create(stuid=user, method="online", amount=1500, status=status)
+        Enrollment.objects.create(stuid=student, classid=self.class_obj, payid=payment)
+        return student
+
+    def entries(self, **filters):
+        return list(StudentCalendarEvent.objects.filter(**filters).order_by("student_id", "starts_at")
+                    .values_list("student_id", "event_type", "title"))
+
+    def publish_exam(self, examid):
+        return Exam.objects.create(examid=examid, examname="Midterm", classid=self.class_obj,
+                                   instructor=self.instructor, date=date(2025, 6, 20), start_time=time(9, 0),
+                                   is_published=True)
+
+    def test_enrollment_adds_existing_sessions_for_paid_students_only(self):
+        unpaid = self.enroll(9, status="pending")
+        self.assertEqual(self.entries(), [(s.pk, "zoom_meeting", "Chemistry live") for s in self.students])
+
+        payment = Payment.objects.get(stuid=unpaid.user)
+        Payment.objects.filter(pk=payment.pk).update(status="success")
+        refresh_payments([payment.pk])
+        self.assertEqual(len(self.entries(student=unpaid)), 1)
+
+        Enrollment.objects.filter(stuid=unpaid).delete()  # queryset delete still sends post_delete
+        self.assertEqual(self.entries(student=unpaid), [])
+
+    def test_exam_publish_is_set_based(self):
+        with CaptureQueriesContext(connection) as few:
+            self.publish_exam("EXM-1")
+        for index in range(3, 23):
+            self.enroll(index)
+        with CaptureQueriesContext(connection) as many:
+            exam = self.publish_exam("EXM-2")
+
+        self.assertEqual(len(self.entries(exam=exam)), 23)
+        self.assertEqual(len(many), len(few))
+
+        exam.is_published = False
+        exam.save()
+        self.assertEqual(self.entries(exam=exam), [])
+
+    def test_sessions_follow_occurrences_webinars_and_classes(self):
+        occurrence = ZoomOccurrence.objects.create(webinar=self.webinar, occurrence_id="o2",
+                                                   start_time=at(date(2025, 6, 9)), duration=90)
+        self.assertEqual(len(self.entries(occurrence=occurrence)), 3)
+
+        self.webinar.topic = "Organic chemistry"
+        self.webinar.save()
+        self.assertEqual({title for _, _, title in self.entries(occurrence=occurrence)}, {"Organic chemistry"})
+
+        self.class_obj.title = "Chemistry 2025"
+        self.class_obj.save()
+        self.assertEqual(set(StudentCalendarEvent.objects.values_list("class_title", flat=True)), {"Chemistry 2025"})
+
+        occurrence_id = occurrence.pk
+        occurrence.delete()
+        self.assertEqual(self.entries(occurrence_id=occurrence_id), [])
+        self.assertEqual(len(self.entries()), 3)
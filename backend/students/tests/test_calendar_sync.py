@@ -0,0 +1,160 @@
+from datetime import date, datetime, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from edu_admin.models import ZoomOccurrence, ZoomWebinar
+from instructor.models import Class, Exam
+from students.calendar_store import refresh_payments
+from students.calendar_sync import encode_sync_token, prune_changes
+from students.models import CalendarChange, Enrollment, Payment, StudentProfile
+
+User = get_user_model()
+
+
+def at(day, hour=10):
+    return timezone.make_aware(datetime.combine(day, time(hour, 0)))
+
+
+@override_settings(CALENDAR_SYNC_LAG_SECONDS=0)
+class CalendarSyncTests(APITestCase):
+    url = "/students/calendar-sync/"
+    window = {"start": "2025-06-01", "end": "2025-06-30"}
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        self.user = User.objects.create_user(username="s1", password="pass1234", role="student")
+        self.student = StudentProfile.objects.create(user=self.user, mobile="077", nic_no="200000000001",
+                                                     address="Jaffna", year_of_al="2026", school_name="JHC")
+        self.client.force_authenticate(self.user)
+
+        self.payment = Payment.objects.create(stuid=self.user, method="online", amount=1500, status="success")
+        self.classes = {}
+        for title in ("Chemistry", "Physics"):
+            webinar = ZoomWebinar.objects.create(webinar_id=f"w-{title}", account_key="a", topic=f"{title} live",
+                                                 duration=60, start_time=at(date(2025, 6, 1)))
+            self.classes[title] = Class.objects.create(title=title, description="", fee=1500,
+                                                       instructor=self.instructor, start_date=date(2025, 6, 1),
+                                                       end_date=date(2025, 7, 31), webinar=webinar)
+            ZoomOccurrence.objects.create(webinar=webinar, occurrence_id=f"{title}-0",
+                                          start_time=at(date(2025, 6, 2)), duration=90)
+        self.enrollment = Enrollment.objects.create(stuid=self.student, classid=self.classes["Chemistry"],
+                                                    payid=self.payment)
+        self.exam = Exam.objects.create(examid="EXM-1", examname="Midterm", classid=self.classes["Chemistry"],
+                                        instructor=self.instructor, date=date(2025, 6, 20), start_time=time(9, 0),
+                                        is_published=True)
+
+    def sync(self, token):
+        response = self.client.get(self.url, {"sync_token": token})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_full_sync_then_unchanged_delta_is_one_lookup(self):
+        response = self.client.get(self.url, self.window)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([e["id"] for e in response.data["events"]],
+                         [f"zoom_{ZoomOccurrence.objects.get(occurrence_id='Chemistry-0').pk}", f"exam_{self.exam.pk}"])
+        token = response.data["sync_token"]
+
+        # Changes to classes the student is not enrolled in are not theirs
+        ZoomOccurrence.objects.create(webinar=self.classes["Physics"].webinar, occurrence_id="Physics-1",
+                                      start_time=at(date(2025, 6, 9)), duration=90)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.sync(token)
+        self.assertEqual(data, {"events": [], "deleted": [], "sync_token": token})
+        # Student profile lookup plus the change log scan
+        self.assertEqual(len(queries), 2)
+
+    def test_delta_reports_changed_and_removed_events(self):
+        token = self.client.get(self.url, self.window).data["sync_token"]
+        occurrence = ZoomOccurrence.objects.create(webinar=self.classes["Chemistry"].webinar,
+                                                   occurrence_id="Chemistry-1", start_time=at(date(2025, 6, 9)),
+                                                   duration=90)
+        self.exam.is_published = False
+        self.exam.save()
+
+        data = self.sync(token)
+        self.assertEqual([e["id"] for e in data["events"]], [f"zoom_{occurrence.pk}"])
+        self.assertEqual(data["deleted"], [f"exam_{self.exam.pk}"])
+
+        token, occurrence_id = data["sync_token"], occurrence.pk
+        occurrence.delete()
+        data = self.sync(token)
+        self.assertEqual((data["events"], data["deleted"]), ([], [f"zoom_{occurrence_id}"]))
+
+    def test_enrollment_changes_add_and_remove_class_events(self):
+        token = self.client.get(self.url, self.window).data["sync_token"]
+        Enrollment.objects.create(stuid=self.student, classid=self.classes["Physics"], payid=self.payment)
+        data = self.sync(token)
+        self.assertEqual([e["class_title"] for e in data["events"]], ["Physics"])
+
+        self.enrollment.delete()
+        data = self.sync(data["sync_token"])
+        self.assertEqual(data["events"], [])
+        self.assertEqual(sorted(data["deleted"]), sorted([
+            f"zoom_{ZoomOccurrence.objects.get(occurrence_id='Chemistry-0').pk}", f"exam_{self.exam.pk}",
+        ]))
+
+    def test_payment_success_adds_class_events(self):
+        pending = Payment.objects.create(stuid=self.user, method="online", amount=1500, status="pending")
+        Enrollment.objects.create(stuid=self.student, classid=self.classes["Physics"], payid=pending)
+        token = self.client.get(self.url, self.window).data["sync_token"]
+
+        Payment.objects.filter(pk=pending.pk).update(status="success")
+        refresh_payments([pending.pk])
+        data = self.sync(token)
+        self.assertEqual([e["class_title"] for e in data["events"]], ["Physics"])
+
+    def test_enrollment_changes_are_scoped_to_the_student(self):
+        other_user = User.objects.create_user(username="s2", password="pass1234", role="student")
+        other = StudentProfile.objects.create(user=other_user, mobile="077", nic_no="200000000002",
+                                              address="Jaffna", year_of_al="2026", school_name="JHC")
+        token = self.client.get(self.url, self.window).data["sync_token"]
+
+        payment = Payment.objects.create(stuid=other_user, method="online", amount=1500, status="success")
+        Enrollment.objects.create(stuid=other, classid=self.classes["Chemistry"], payid=payment)
+        self.assertEqual(self.sync(token), {"events": [], "deleted": [], "sync_token": token})
+
+    def test_class_webinar_change_is_synced(self):
+        token = self.client.get(self.url, self.window).data["sync_token"]
+        chemistry = self.classes["Chemistry"]
+        chemistry.webinar = self.classes["Physics"].webinar
+        chemistry.save()
+
+        data = self.sync(token)
+        physics_session = ZoomOccurrence.objects.get(occurrence_id="Physics-0").pk
+        chemistry_session = ZoomOccurrence.objects.get(occurrence_id="Chemistry-0").pk
+        self.assertEqual([e["id"] for e in data["events"]], [f"zoom_{physics_session}", f"exam_{self.exam.pk}"])
+        self.assertEqual(data["deleted"], [f"zoom_{chemistry_session}"])
+
+    def test_unsettled_changes_are_sent_again(self):
+        token = self.client.get(self.url, self.window).data["sync_token"]
+        self.exam.examname = "Final"
+        self.exam.save()
+        with override_settings(CALENDAR_SYNC_LAG_SECONDS=60):
+            data = self.sync(token)
+            self.assertEqual(data["events"][0]["title"], "📝 Final")
+            self.assertEqual(data["sync_token"], token)
+
+    def test_expired_and_invalid_tokens(self):
+        issued = timezone.localdate() - timedelta(days=31)
+        expired = encode_sync_token(0, date(2025, 6, 1), date(2025, 6, 30), issued)
+        self.assertEqual(self.client.get(self.url, {"sync_token": expired}).status_code, status.HTTP_410_GONE)
+        self.assertEqual(self.client.get(self.url, {"sync_token": "nope"}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(CALENDAR_SYNC_MAX_CHANGES=1):
+            token = encode_sync_token(0, date(2025, 6, 1), date(2025, 6, 30))
+            self.assertEqual(self.client.get(self.url, {"sync_token": token}).status_code, status.HTTP_410_GONE)
+
+    def test_prune_removes_only_expired_changes(self):
+        CalendarChange.objects.filter(pk=CalendarChange.objects.earliest("id").pk).update(
+            changed_at=timezone.now() - timedelta(days=40))
+        count = CalendarChange.objects.count()
+        self.assertEqual(prune_changes(), 1)
+        self.assertEqual(CalendarChange.objects.count(), count - 1)
@@ -0,0 +1,90 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from edu_admin.models import ZoomWebinar
+from instructor.models import Class, ClassSchedule
+
+User = get_user_model()
+
+
+class ClassCatalogTests(APITestCase):
+    url = "/students/getallclass/"
+
+    def setUp(self):
+        cache.clear()
+        self.instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor",
+                                                   first_name="Ada", last_name="Lovelace")
+        today = date.today()
+        self.chemistry = Class.objects.create(title="Chemistry", description="", fee=1500, instructor=self.instructor,
+                                              start_date=today - timedelta(days=10), end_date=today + timedelta(days=30))
+        self.physics = Class.objects.create(title="Physics", description="", fee=2000, instructor=self.instructor,
+                                            start_date=today + timedelta(days=5), end_date=today + timedelta(days=60))
+        Class.objects.create(title="Biology", description="", fee=900, instructor=self.instructor,
+                             start_date=today - timedelta(days=60), end_date=today - timedelta(days=1))
+        for day in ("Monday", "Wednesday"):
+            ClassSchedule.objects.create(class_obj=self.chemistry, day_of_week=day, start_time=time(15, 30))
+
+    def test_lists_current_classes_with_etag(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c["title"] for c in response.data], ["Chemistry", "Physics"])
+        self.assertEqual([c["status"] for c in response.data], ["active", "pending"])
+        self.assertEqual(response.data[0]["instructor_name"], "Ada Lovelace")
+        self.assertEqual(response.data[0]["schedules"], [
+            {"start_time": "15:30", "duration_minutes": 90, "days_of_week": ["Monday", "Wednesday"]},
+        ])
+        self.assertRegex(response["ETag"], r'^"[0-9a-f]{64}"$')
+
+    def test_cached_catalog_needs_no_queries(self):
+        first = self.client.get(self.url)
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get(self.url)
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second["ETag"], first["ETag"])
+
+    def test_if_none_match_returns_304(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response["ETag"], etag)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_changes_invalidate_the_catalog(self):
+        etag = self.client.get(self.url)["ETag"]
+
+        ClassSchedule.objects.create(class_obj=self.physics, day_of_week="Friday", start_time=time(9, 0))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[1]["schedules"][0]["days_of_week"], ["Friday"])
+
+        etag = response["ETag"]
+        webinar = ZoomWebinar.objects.create(webinar_id="w1", topic="Physics live", start_time=timezone.now(),
+                                             duration=60, registration_url="https://zoom.example/w1")
+        self.physics.webinar = webinar
+        self.physics.save()
+        self.assertEqual(self.client.get(self.url).data[1]["webinar_info"]["topic"], "Physics live")
+
+        webinar.topic = "Physics revision"
+        webinar.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data[1]["webinar_info"]["topic"], "Physics revision")
+
+        etag = response["ETag"]
+        ClassSchedule.objects.filter(class_obj=self.chemistry).delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data[0]["schedules"], [])
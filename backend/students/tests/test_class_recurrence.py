@@ -0,0 +1,111 @@
+from datetime import date, datetime, time
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from instructor.models import Class, ClassSchedule, ClassSessionOverride
+from instructor.recurrence import class_sessions, expand_class
+from students.models import Enrollment, Payment, StudentProfile
+
+User = get_user_model()
+
+
+def at(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+class RecurrenceTests(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        # June 2025: the 2nd is a Monday
+        self.class_obj = Class.objects.create(title="Chemistry", description="", fee=1000, instructor=self.instructor,
+                                              start_date=date(2025, 6, 4), end_date=date(2025, 6, 30))
+        ClassSchedule.objects.create(class_obj=self.class_obj, day_of_week="Monday", start_time=time(15, 30))
+        ClassSchedule.objects.create(class_obj=self.class_obj, day_of_week="Wednesday", start_time=time(9, 0),
+                                     duration_minutes=120)
+
+    def sessions(self, start, end, **kwargs):
+        return list(class_sessions(Class.objects.filter(pk=self.class_obj.pk), start, end, **kwargs))
+
+    def test_weekly_rules_within_class_dates(self):
+        sessions = self.sessions(date(2025, 6, 1), date(2025, 6, 17))
+        self.assertEqual([(s.start, s.duration_minutes) for s in sessions], [
+            (at(date(2025, 6, 4), 9), 120),
+            (at(date(2025, 6, 9), 15, 30), 90),
+            (at(date(2025, 6, 11), 9), 120),
+            (at(date(2025, 6, 16), 15, 30), 90),
+        ])
+        self.assertEqual(self.sessions(date(2025, 7, 1), date(2025, 7, 31)), [])
+
+    def test_expansion_is_lazy(self):
+        self.class_obj.end_date = date(9999, 12, 31)
+        sessions = expand_class(self.class_obj, list(self.class_obj.schedules.all()), [],
+                                date(2025, 6, 1), date(9999, 1, 1))
+        first = list(islice(sessions, 3))
+        self.assertEqual([s.start.date() for s in first], [date(2025, 6, 4), date(2025, 6, 9), date(2025, 6, 11)])
+
+        far = expand_class(self.class_obj, list(self.class_obj.schedules.all()), [],
+                           date(9000, 1, 1), date(9000, 1, 7))
+        self.assertEqual(len(list(far)), 2)
+
+    def test_overrides_cancel_move_and_add_sessions(self):
+        cancelled = ClassSessionOverride.objects.create(class_obj=self.class_obj,
+                                                        original_start=at(date(2025, 6, 9), 15, 30), cancelled=True)
+        # Moved out of the window, into it from outside, and re-timed in place
+        ClassSessionOverride.objects.create(class_obj=self.class_obj, original_start=at(date(2025, 6, 11), 9),
+                                            start=at(date(2025, 6, 20), 9))
+        ClassSessionOverride.objects.create(class_obj=self.class_obj, original_start=at(date(2025, 6, 18), 9),
+                                            start=at(date(2025, 6, 13), 14))
+        ClassSessionOverride.objects.create(class_obj=self.class_obj, original_start=at(date(2025, 6, 16), 15, 30),
+                                            duration_minutes=60, note="Short session")
+        # Not on the schedule: a one-off extra session
+        ClassSessionOverride.objects.create(class_obj=self.class_obj, original_start=at(date(2025, 6, 14), 10),
+                                            duration_minutes=180)
+
+        sessions = self.sessions(date(2025, 6, 1), date(2025, 6, 17))
+        self.assertEqual([(s.start, s.duration_minutes) for s in sessions], [
+            (at(date(2025, 6, 4), 9), 120),
+            (at(date(2025, 6, 13), 14), 120),
+            (at(date(2025, 6, 14), 10), 180),
+            (at(date(2025, 6, 16), 15, 30), 60),
+        ])
+        self.assertEqual(sessions[1].original_start, at(date(2025, 6, 18), 9))
+        self.assertEqual(sessions[3].note, "Short session")
+
+        with_cancelled = self.sessions(date(2025, 6, 9), date(2025, 6, 9), include_cancelled=True)
+        self.assertEqual([(s.override_id, s.cancelled) for s in with_cancelled], [(cancelled.pk, True)])
+
+
+class TimetableViewTests(APITestCase):
+    def test_student_timetable(self):
+        instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        user = User.objects.create_user(username="s1", password="pass1234", role="student")
+        student = StudentProfile.objects.create(user=user, mobile="077", nic_no="200000000001", address="Jaffna",
+                                                year_of_al="2026", school_name="JHC")
+        paid = Payment.objects.create(stuid=user, method="online", amount=1000, status="success")
+        for title, day in (("Chemistry", "Monday"), ("Physics", "Tuesday")):
+            class_obj = Class.objects.create(title=title, description="", fee=1000, instructor=instructor,
+                                             start_date=date(2025, 6, 1), end_date=date(2025, 6, 30))
+            ClassSchedule.objects.create(class_obj=class_obj, day_of_week=day, start_time=time(16, 0))
+            Enrollment.objects.create(stuid=student, classid=class_obj, payid=paid)
+        self.client.force_authenticate(user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/students/timetable/", {"start": "2025-06-01", "end": "2025-06-10"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([(s["class_title"], s["start"]) for s in response.data], [
+            ("Chemistry", "2025-06-02T16:00:00+05:30"),
+            ("Physics", "2025-06-03T16:00:00+05:30"),
+            ("Chemistry", "2025-06-09T16:00:00+05:30"),
+            ("Physics", "2025-06-10T16:00:00+05:30"),
+        ])
+        self.assertEqual(response.data[0]["end"], "2025-06-02T17:30:00+05:30")
+        # Student profile, classes, schedules and overrides
+        self.assertEqual(len(queries), 4)
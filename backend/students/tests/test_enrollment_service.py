@@ -0,0 +1,83 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from instructor.models import Class, InstructorNotification
+from students.enrollment import EnrollmentService
+from students.models import Enrollment, Payment, StudentProfile
+
+User = get_user_model()
+
+
+def make_student(username, nic_no, first_name):
+    user = User.objects.create_user(username=username, password="pass1234", role="student", first_name=first_name)
+    return StudentProfile.objects.create(
+        user=user, mobile="0770000000", nic_no=nic_no, address="Jaffna", year_of_al="2026", school_name="JHC",
+    )
+
+
+class EnrollmentServiceTests(TestCase):
+    def setUp(self):
+        instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        self.classes = [
+            Class.objects.create(title=title, description="", fee=1500, instructor=instructor)
+            for title in ("Chemistry", "Physics", "Biology")
+        ]
+        self.codes = [cls.classid for cls in self.classes]
+        self.student = make_student("s1", "200000000001", "Nila")
+        self.payment = Payment.objects.create(stuid=self.student.user, method="online", amount=4500)
+        InstructorNotification.objects.all().delete()
+
+    def test_enroll_many_skips_existing_and_unknown_classes(self):
+        Enrollment.objects.create(stuid=self.student, classid=self.classes[0])
+        InstructorNotification.objects.all().delete()
+
+        created = EnrollmentService.enroll_many(self.student, self.codes + ["CLS-MISSING"], self.payment)
+
+        self.assertEqual({e.classid for e in created}, set(self.classes[1:]))
+        self.assertEqual(Enrollment.objects.filter(stuid=self.student).count(), 3)
+        self.assertEqual(Enrollment.objects.filter(payid=self.payment).count(), 2)
+        self.assertEqual(InstructorNotification.objects.filter(type="enrollment").count(), 2)
+        self.assertEqual(EnrollmentService.enroll_many(self.student, self.codes, self.payment), [])
+
+    def test_query_count_is_constant(self):
+        # classes, existing pairs, enrollments, inserted rows, calendar changes, calendar rows (savepoint, delete, paid pairs,
+        # release), notifications
+        with self.assertNumQueries(10):
+            EnrollmentService.enroll_many(self.student, self.codes, self.payment)
+
+    def test_pairs_inserted_concurrently_are_not_reported(self):
+        bulk_create = Enrollment.objects.bulk_create
+        other_payment = Payment.objects.create(stuid=self.student.user, method="receipt", amount=1500)
+
+        def race(enrollments, **kwargs):
+            # Another request enrolls the student in Physics after the existing-pairs check
+            Enrollment.objects.create(stuid=self.student, classid=self.classes[1], payid=other_payment)
+            InstructorNotification.objects.all().delete()
+            return bulk_create(enrollments, **kwargs)
+
+        with patch.object(Enrollment.objects, "bulk_create", side_effect=race):
+            created = EnrollmentService.enroll_many(self.student, self.codes, self.payment)
+
+        self.assertEqual([e.classid for e in created], [self.classes[0], self.classes[2]])
+        self.assertEqual({e.pk for e in created}, set(Enrollment.objects.filter(payid=self.payment)
+                                                      .values_list("enrollid", flat=True)))
+        self.assertEqual(Enrollment.objects.get(stuid=self.student, classid=self.classes[1]).payid, other_payment)
+        self.assertEqual(
+            sorted(InstructorNotification.objects.filter(type="enrollment").values_list("message", flat=True)),
+            ["Student Nila has enrolled in your class 'Biology'.", "Student Nila has enrolled in your class 'Chemistry'."],
+        )
+
+    def test_batch_sends_one_notification_per_class(self):
+        others = [make_student(f"s{i}", f"20000000001{i}", f"Student{i}") for i in range(2, 4)]
+        EnrollmentService.enroll_batch(
+            [(self.student, self.codes[:1], self.payment)]
+            + [(student, self.codes[:2], None) for student in others]
+        )
+
+        notifications = InstructorNotification.objects.filter(type="enrollment").order_by("message")
+        self.assertEqual(notifications.count(), 2)
+        self.assertIn("2 new students have enrolled in your class 'Physics'", notifications[0].message)
+        self.assertIn("3 new students have enrolled in your class 'Chemistry'", notifications[1].message)
+        self.assertEqual(Enrollment.objects.count(), 5)
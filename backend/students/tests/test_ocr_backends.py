@@ -0,0 +1,46 @@
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from students.ocr.backends import LatencyStats, OCRBackendError, VisionBackend
+
+
+class VisionBackendTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = VisionBackend()
+
+    @patch("students.ocr.backends.load_google_credentials", return_value=None)
+    @patch("students.ocr.backends.vision.ImageAnnotatorClient")
+    def test_client_is_reused_until_credentials_change(self, mock_client_cls, _mock_creds):
+        with patch.dict("os.environ", {"GOOGLE_APPLICATION_CREDENTIALS_JSON": "{}"}):
+            first = self.backend.get_client()
+            self.assertIs(self.backend.get_client(), first)
+        with patch.dict("os.environ", {"GOOGLE_APPLICATION_CREDENTIALS_JSON": '{"rotated": true}'}):
+            self.backend.get_client()
+
+        self.assertEqual(mock_client_cls.call_count, 2)
+
+    @patch("students.ocr.backends.load_google_credentials", return_value=None)
+    @patch("students.ocr.backends.vision.ImageAnnotatorClient")
+    def test_errors_are_timed_and_raised(self, mock_client_cls, _mock_creds):
+        response = MagicMock()
+        response.error.message = "403 billing not enabled"
+        mock_client_cls.return_value.text_detection.return_value = response
+
+        with self.assertRaises(OCRBackendError):
+            self.backend.extract_text(b"image")
+
+        snapshot = self.backend.stats.snapshot()
+        self.assertEqual((snapshot["calls"], snapshot["errors"]), (1, 1))
+
+
+class LatencyStatsTests(SimpleTestCase):
+    def test_percentiles(self):
+        stats = LatencyStats()
+        for ms in range(1, 101):
+            stats.record(float(ms))
+
+        snapshot = stats.snapshot()
+        self.assertEqual(snapshot["p50_ms"], 51.0)
+        self.assertEqual(snapshot["p95_ms"], 96.0)
+        self.assertEqual(snapshot["max_ms"], 100.0)
@@ -0,0 +1,52 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from students.models import OCRCacheEntry
+from students.ocr import cache
+
+
+class OCRCacheTests(TestCase):
+    def setUp(self):
+        cache.reset_cache_stats()
+        self.fields = {
+            "record_no": "123456",
+            "paid_amount": "2500.00",
+            "paid_date_time": datetime(2025, 6, 20, 10, 30),
+        }
+
+    def test_hit_returns_stored_extraction(self):
+        digest = cache.content_hash(b"receipt-bytes")
+        self.assertIsNone(cache.get_cached_ocr(digest))
+
+        cache.store_ocr_result(digest, "raw text", self.fields, "tesseract")
+        raw_text, fields, method = cache.get_cached_ocr(digest)
+
+        self.assertEqual(raw_text, "raw text")
+        self.assertEqual(fields, self.fields)
+        self.assertEqual(method, "tesseract")
+        stats = cache.cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["lifetime_hits"], 1)
+
+    @override_settings(OCR_CACHE_TTL_DAYS=30)
+    def test_expired_entry_is_a_miss(self):
+        digest = cache.content_hash(b"old")
+        cache.store_ocr_result(digest, "raw", self.fields, "google_vision")
+        OCRCacheEntry.objects.update(last_used_at=timezone.now() - timedelta(days=31))
+
+        self.assertIsNone(cache.get_cached_ocr(digest))
+
+    @override_settings(OCR_CACHE_MAX_ENTRIES=2)
+    def test_least_recently_used_entries_are_evicted(self):
+        digests = [cache.content_hash(bytes([i])) for i in range(3)]
+        for offset, digest in enumerate(digests):
+            cache.store_ocr_result(digest, "raw", self.fields, "tesseract")
+            OCRCacheEntry.objects.filter(content_hash=digest).update(
+                last_used_at=timezone.now() - timedelta(minutes=10 - offset)
+            )
+        cache.evict()
+
+        remaining = set(OCRCacheEntry.objects.values_list("content_hash", flat=True))
+        self.assertEqual(remaining, set(digests[1:]))
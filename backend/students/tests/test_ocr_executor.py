@@ -0,0 +1,58 @@
+import threading
+import time
+
+from django.test import SimpleTestCase
+
+from students.ocr.exceptions import OCRQueueFull, OCRTimeout
+from students.ocr.executor import OCRProcessPool
+
+
+def double(value):
+    return value * 2
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class OCRProcessPoolTests(SimpleTestCase):
+    def setUp(self):
+        self.pool = OCRProcessPool(max_workers=1, queue_depth=0, timeout=5)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_runs_work_in_worker_process(self):
+        self.assertEqual(self.pool.run(double, 21), 42)
+        self.assertEqual(self.pool.stats()["completed"], 1)
+
+    def test_rejects_work_beyond_queue_depth(self):
+        future = self.pool.submit(sleep_for, 0.5)
+
+        with self.assertRaises(OCRQueueFull):
+            self.pool.submit(double, 1)
+
+        future.result()
+        self.assertEqual(self.pool.stats()["rejected"], 1)
+
+    def test_timeout_recycles_pool(self):
+        with self.assertRaises(OCRTimeout):
+            self.pool.run(sleep_for, 10, timeout=0.5)
+
+        # The hung worker was killed and its slot freed
+        self.assertEqual(self.pool.run(double, 2), 4)
+        self.assertEqual(self.pool.stats()["timeouts"], 1)
+
+    def test_timeout_resubmits_other_jobs_in_flight(self):
+        pool = OCRProcessPool(max_workers=2, queue_depth=0, timeout=5)
+        self.addCleanup(pool.shutdown)
+        pool.warm_up()
+        results = []
+        innocent = threading.Thread(target=lambda: results.append(pool.run(sleep_for, 1)))
+        innocent.start()
+
+        with self.assertRaises(OCRTimeout):
+            pool.run(sleep_for, 10, timeout=0.3)
+        innocent.join()
+
+        self.assertEqual(results, [1])
+        self.assertEqual(pool.stats()["in_flight"], 0)
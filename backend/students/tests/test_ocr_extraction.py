@@ -0,0 +1,46 @@
+from datetime import datetime
+
+from django.test import SimpleTestCase
+
+from students.ocr import extraction
+
+
+class ExtractionCorpusTests(SimpleTestCase):
+    def test_corpus_receipts_extract_exactly(self):
+        for receipt in extraction.load_corpus():
+            with self.subTest(receipt=receipt["id"]):
+                result = extraction.extract(receipt["text"])
+                self.assertEqual(result.template, receipt["template"])
+                self.assertEqual(extraction.field_mismatches(result.fields, receipt["expected"]), [])
+
+
+class ExtractionTests(SimpleTestCase):
+    def test_tokenize_collapses_whitespace_and_keys_on_first_word(self):
+        tokens = extraction.tokenize("  RECORD   NO:  8391 \n\n T0  0001\n")
+        self.assertEqual(tokens, [("RECORD", "RECORD NO: 8391"), ("T0", "T0 0001")])
+
+    def test_commercial_bank_is_not_detected_as_boc(self):
+        template = extraction.detect_template("COMMERCIAL BANK OF CEYLON PLC\nTRACE NO 1")
+        self.assertEqual(template.name, "commercial_bank")
+
+    def test_unknown_bank_falls_back_to_generic_rules(self):
+        result = extraction.extract("SOME BANK\nRef No: 4411\nBranch: Colombo 07\nTotal: 1,250.50\n05-07-2025 16:20")
+        self.assertEqual(result.template, "generic")
+        self.assertEqual(result.fields["record_no"], "4411")
+        self.assertEqual(result.fields["location"], "Colombo 07")
+        self.assertEqual(result.fields["paid_amount"], "1250.50")
+        self.assertEqual(result.fields["paid_date_time"], datetime(2025, 7, 5, 16, 20))
+
+    def test_value_on_line_below_label(self):
+        fields = extraction.extract_receipt_fields("BANK OF CEYLON\nLOCATION\nKANDY BR.\nRECORD NO\n77")
+        self.assertEqual(fields["location"], "KANDY BR.")
+        self.assertEqual(fields["record_no"], "77")
+
+    def test_two_digit_year_and_invalid_dates(self):
+        self.assertEqual(
+            extraction.extract_receipt_fields("01/02/25 09:30")["paid_date_time"], datetime(2025, 2, 1, 9, 30)
+        )
+        self.assertIsNone(extraction.extract_receipt_fields("31/02/2025")["paid_date_time"])
+
+    def test_missing_fields_are_none(self):
+        self.assertEqual(extraction.extract_receipt_fields("nothing useful"), dict.fromkeys(extraction.FIELD_NAMES))
@@ -0,0 +1,40 @@
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TransactionTestCase
+
+from students.models import OCRJob, Payment, ReceiptPayment
+from students.routing import websocket_urlpatterns
+
+User = get_user_model()
+
+
+class OCRJobConsumerTests(TransactionTestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username="s1", password="pass1234", role="student")
+        payment = Payment.objects.create(stuid=self.owner, method="receipt", amount=0)
+        receipt = ReceiptPayment.objects.create(payid=payment, image_url="receipts/x.jpg")
+        self.job = OCRJob.objects.create(receipt=receipt)
+
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(URLRouter(websocket_urlpatterns), f"/ws/ocr-jobs/{self.job.job_id}/")
+        communicator.scope["user"] = user
+        connected, _ = await communicator.connect()
+        message = await communicator.receive_json_from() if connected else None
+        await communicator.disconnect()
+        return connected, message
+
+    def test_owner_receives_current_state(self):
+        connected, message = async_to_sync(self.connect)(self.owner)
+
+        self.assertTrue(connected)
+        self.assertEqual(message["type"], "ocr_job")
+        self.assertEqual(message["status"], "queued")
+
+    def test_other_student_is_rejected(self):
+        other = User.objects.create_user(username="s2", password="pass1234", role="student")
+
+        connected, _ = async_to_sync(self.connect)(other)
+
+        self.assertFalse(connected)
@@ -0,0 +1,116 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from students.models import OCRJob, ReceiptPayment
+from students.ocr.jobs import run_ocr_job
+from students.ocr.pipeline import OCRResult
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_receipt_image(name="receipt.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 40), "white").save(buffer, format="JPEG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class ReceiptOCRJobTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="student1", password="pass1234", role="student")
+        self.client.force_authenticate(self.user)
+        self.url = "/students/payments/upload-receipt/"
+
+    def upload(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            return self.client.post(self.url, {"image": make_receipt_image(), "amount": "2500"}, format="multipart")
+
+    def test_upload_returns_accepted_with_job(self):
+        response = self.upload()
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = OCRJob.objects.get(job_id=response.data["job_id"])
+        self.assertEqual(job.status, "queued")
+        self.assertEqual(job.receipt.payid.stuid, self.user)
+
+        poll = self.client.get(response.data["status_url"])
+        self.assertEqual(poll.status_code, status.HTTP_200_OK)
+        self.assertEqual(poll.data["status"], "queued")
+
+    @patch("students.ocr.jobs.run_ocr")
+    def test_worker_fills_receipt_fields(self, mock_run_ocr):
+        mock_run_ocr.return_value = OCRResult(
+            text="Record No: 123456\nAmount: 3,000.00\n12/05/2025 10:30",
+            method="tesseract",
+        )
+        job_id = self.upload().data["job_id"]
+
+        run_ocr_job(job_id)
+
+        job = OCRJob.objects.get(job_id=job_id)
+        receipt = ReceiptPayment.objects.select_related("payid").get(pk=job.receipt_id)
+        self.assertEqual(job.status, "completed")
+        self.assertEqual(job.ocr_method, "tesseract")
+        self.assertEqual(receipt.record_no, "123456")
+        self.assertEqual(receipt.paid_amount, "3000.00")
+        self.assertEqual(float(receipt.payid.amount), 3000.0)
+
+    @patch("students.ocr.jobs.run_ocr")
+    def test_worker_falls_back_to_manual_verification(self, mock_run_ocr):
+        mock_run_ocr.return_value = OCRResult(vision_error="403 billing disabled")
+        job_id = self.upload().data["job_id"]
+
+        run_ocr_job(job_id)
+
+        job = OCRJob.objects.get(job_id=job_id)
+        self.assertEqual(job.status, "failed")
+        self.assertIn("manual verification required", job.error)
+
+    @patch("students.ocr.jobs.store_ocr_result", side_effect=RuntimeError("cache unavailable"))
+    @patch("students.ocr.jobs.run_ocr")
+    def test_worker_marks_job_failed_when_saving_fields_fails(self, mock_run_ocr, _store):
+        mock_run_ocr.return_value = OCRResult(text="Record No: 123456\nAmount: 3,000.00", method="tesseract")
+        job_id = self.upload().data["job_id"]
+
+        run_ocr_job(job_id)
+
+        job = OCRJob.objects.get(job_id=job_id)
+        self.assertEqual(job.status, "failed")
+        self.assertIn("cache unavailable", job.error)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_job_status_is_private_to_owner(self):
+        job_id = self.upload().data["job_id"]
+        other = User.objects.create_user(username="student2", password="pass1234", role="student")
+        self.client.force_authenticate(other)
+
+        response = self.client.get(f"/students/payments/ocr-jobs/{job_id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch("students.ocr.jobs.run_ocr")
+    def test_reupload_uses_cached_extraction(self, mock_run_ocr):
+        mock_run_ocr.return_value = OCRResult(text="Record No: 777\nAmount: 1,500.00", method="tesseract")
+        run_ocr_job(self.upload().data["job_id"])
+
+        response = self.upload()
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(response.data["cache_hit"])
+        self.assertEqual(response.data["extracted_info"]["record_no"], "777")
+        self.assertEqual(mock_run_ocr.call_count, 1)
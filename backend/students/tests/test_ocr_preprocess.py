@@ -0,0 +1,46 @@
+from io import BytesIO
+
+from django.test import SimpleTestCase
+from PIL import Image, ImageDraw
+
+from students.ocr import preprocess
+
+
+def lined_page(size=(800, 1000)):
+    """White page with dark horizontal bars standing in for lines of text."""
+    image = Image.new("L", size, 255)
+    draw = ImageDraw.Draw(image)
+    for top in range(60, size[1] - 60, 40):
+        draw.rectangle([80, top, size[0] - 80, top + 12], fill=0)
+    return image
+
+
+def encode(image, **save_kwargs):
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", **save_kwargs)
+    return buffer.getvalue()
+
+
+class PreprocessTests(SimpleTestCase):
+    def test_large_photo_is_downscaled(self):
+        image = preprocess.rescale_for_ocr(Image.new("RGB", (4000, 3000), "white"))
+        self.assertEqual(max(image.size), preprocess.MAX_LONG_SIDE)
+
+    def test_low_dpi_screenshot_is_scaled_towards_target_dpi(self):
+        image = Image.new("RGB", (855, 880), "white")
+        image.info["dpi"] = (120, 120)
+        self.assertEqual(max(preprocess.rescale_for_ocr(image).size), preprocess.MAX_LONG_SIDE)
+
+    def test_binarize_outputs_only_black_and_white(self):
+        gray = Image.linear_gradient("L").resize((64, 64))
+        colors = {value for _, value in preprocess.binarize(gray).getcolors()}
+        self.assertEqual(colors, {0, 255})
+
+    def test_estimate_skew_recovers_rotation(self):
+        skewed = lined_page().rotate(3, expand=True, fillcolor=255)
+        angle = preprocess.estimate_skew(preprocess.binarize(skewed))
+        self.assertAlmostEqual(angle, -3.0, delta=preprocess.SKEW_ANGLE_STEP)
+
+    def test_pipeline_returns_grayscale_image(self):
+        image = preprocess.preprocess_for_ocr(encode(lined_page().convert("RGBA")))
+        self.assertEqual(image.mode, "L")
@@ -0,0 +1,88 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from instructor.models import Class
+from students.models import Enrollment, OnlinePayment, Payment, ReceiptPayment, StudentProfile
+
+User = get_user_model()
+
+
+class PaymentHistoryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="s1", password="pass1234", role="student")
+        self.other = User.objects.create_user(username="s2", password="pass1234", role="student")
+        instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        profile = StudentProfile.objects.create(
+            user=self.user, mobile="0770000000", nic_no="200012345678", address="Jaffna",
+            year_of_al="2026", school_name="Jaffna Hindu",
+        )
+        chemistry = Class.objects.create(title="Chemistry", description="", fee=1500, instructor=instructor)
+        self.url = reverse("payment-info")
+        self.client.force_authenticate(self.user)
+
+        today = date.today()
+        self.payments = []
+        for index in range(7):
+            payment = Payment.objects.create(
+                stuid=self.user, method="online" if index % 2 else "receipt", amount=1000 + index,
+                status="success" if index < 5 else "pending",
+            )
+            # auto_now_add ignores the value on create; spread the history over several days
+            Payment.objects.filter(pk=payment.pk).update(date=today - timedelta(days=index // 2))
+            if payment.method == "online":
+                OnlinePayment.objects.create(payid=payment, invoice_no=f"INV-{index}")
+            else:
+                ReceiptPayment.objects.create(payid=payment, image_url="receipts/x.jpg", record_no=f"R{index}")
+            self.payments.append(payment)
+        Enrollment.objects.create(stuid=profile, classid=chemistry, payid=self.payments[0])
+        Payment.objects.filter(pk=self.payments[1].pk).update(class_names="Physics")
+        Payment.objects.create(stuid=self.other, method="online", amount=50)
+
+    def test_pages_follow_date_then_id_descending(self):
+        seen = []
+        cursor = None
+        while True:
+            params = {"page_size": 3}
+            if cursor:
+                params["cursor"] = cursor
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            seen.extend(p["payid"] for p in response.data["payments"])
+            cursor = response.data["next_cursor"]
+            self.assertEqual(response.data["has_more"], cursor is not None)
+            if not cursor:
+                break
+
+        expected = sorted(self.payments, key=lambda p: (Payment.objects.get(pk=p.pk).date, p.pk), reverse=True)
+        self.assertEqual(seen, [p.payid for p in expected])
+
+    def test_rows_carry_related_details_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(len(queries), 1)
+
+        rows = {row["payid"]: row for row in response.data["payments"]}
+        self.assertEqual(len(rows), 7)
+        self.assertEqual(rows[self.payments[0].payid]["class"], "Chemistry")
+        self.assertEqual(rows[self.payments[0].payid]["Record_No"], "R0")
+        self.assertEqual(rows[self.payments[1].payid]["class"], "Physics")
+        self.assertEqual(rows[self.payments[1].payid]["Invoice_No"], "INV-1")
+        self.assertIsNone(rows[self.payments[1].payid]["Record_No"])
+        self.assertEqual(rows[self.payments[2].payid]["class"], "No class specified")
+
+    def test_status_and_method_filters(self):
+        response = self.client.get(self.url, {"status": "pending", "method": "online"})
+        self.assertEqual([p["payid"] for p in response.data["payments"]], [self.payments[5].payid])
+
+        response = self.client.get(self.url, {"method": "online,receipt", "status": "success,fail"})
+        self.assertEqual(len(response.data["payments"]), 5)
+
+    def test_invalid_parameters_are_rejected(self):
+        self.assertEqual(self.client.get(self.url, {"status": "refunded"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"cursor": "not-a-cursor"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"page_size": "0"}).status_code, 400)
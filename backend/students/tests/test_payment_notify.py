@@ -0,0 +1,140 @@
+import threading
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from rest_framework.test import APIClient, APITestCase
+
+from instructor.models import Class, InstructorNotification
+from students.models import Enrollment, OnlinePayment, Payment, ProcessedPaymentEvent, StudentProfile
+from students.payhere import notification_signature
+
+User = get_user_model()
+
+MERCHANT_ID = "1221234"
+MERCHANT_SECRET = "test-secret"
+NOTIFY_URL = "/students/api/payment/notify/"
+
+
+def notification(order_id, status_code="2", amount="3000.00", currency="LKR"):
+    return {
+        "merchant_id": MERCHANT_ID,
+        "order_id": order_id,
+        "payment_id": "320025071278",
+        "payhere_amount": amount,
+        "payhere_currency": currency,
+        "status_code": status_code,
+        "md5sig": notification_signature(MERCHANT_ID, order_id, amount, currency, status_code, MERCHANT_SECRET),
+    }
+
+
+class PaymentFixtureMixin:
+    def create_payment(self, order_id="order_1"):
+        user = User.objects.create_user(username="s1", password="pass1234", role="student",
+                                        first_name="Nila", last_name="Rajan")
+        self.profile = StudentProfile.objects.create(
+            user=user, mobile="0770000000", nic_no="200012345678", address="Jaffna",
+            year_of_al="2026", school_name="Jaffna Hindu",
+        )
+        instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        self.classes = [
+            Class.objects.create(title=title, description="", fee=1500, instructor=instructor)
+            for title in ("Chemistry", "Physics")
+        ]
+        self.payment = Payment.objects.create(stuid=user, method="online", amount=3000, status="pending")
+        self.online = OnlinePayment.objects.create(
+            payid=self.payment, invoice_no=self.payment.payid, order_id=order_id,
+            class_ids=[cls.classid for cls in self.classes],
+        )
+        InstructorNotification.objects.all().delete()
+
+
+@override_settings(PAYHERE_MERCHANT_ID=MERCHANT_ID, PAYHERE_MERCHANT_SECRET=MERCHANT_SECRET)
+class PaymentNotifyTests(PaymentFixtureMixin, APITestCase):
+    def setUp(self):
+        self.create_payment()
+
+    def test_success_marks_payment_and_enrolls_once(self):
+        response = self.client.post(NOTIFY_URL, notification("order_1"), format="multipart")
+        self.assertEqual(response.status_code, 200)
+
+        self.payment.refresh_from_db()
+        self.online.refresh_from_db()
+        self.assertEqual(self.payment.status, "success")
+        self.assertTrue(self.online.verified)
+        self.assertEqual(Enrollment.objects.filter(stuid=self.profile, payid=self.payment).count(), 2)
+        self.assertEqual(InstructorNotification.objects.filter(type="enrollment").count(), 2)
+        event = ProcessedPaymentEvent.objects.get()
+        self.assertEqual((event.order_id, event.status_code, event.amount), ("order_1", "2", Decimal("3000.00")))
+
+    def test_replay_returns_early_without_writes(self):
+        self.client.post(NOTIFY_URL, notification("order_1"), format="multipart")
+        with self.assertNumQueries(1):
+            response = self.client.post(NOTIFY_URL, notification("order_1"), format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Enrollment.objects.count(), 2)
+
+    def test_existing_enrollment_is_skipped(self):
+        Enrollment.objects.create(stuid=self.profile, classid=self.classes[0])
+        InstructorNotification.objects.all().delete()
+        self.client.post(NOTIFY_URL, notification("order_1"), format="multipart")
+        self.assertEqual(Enrollment.objects.filter(stuid=self.profile).count(), 2)
+        self.assertEqual(InstructorNotification.objects.filter(type="enrollment").count(), 1)
+
+    def test_late_failure_does_not_undo_success(self):
+        self.client.post(NOTIFY_URL, notification("order_1"), format="multipart")
+        self.client.post(NOTIFY_URL, notification("order_1", status_code="-2"), format="multipart")
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, "success")
+        self.assertEqual(ProcessedPaymentEvent.objects.count(), 2)
+
+    def test_failure_before_success_marks_payment_failed(self):
+        response = self.client.post(NOTIFY_URL, notification("order_1", status_code="-2"), format="multipart")
+        self.assertEqual(response.status_code, 200)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, "fail")
+        self.assertFalse(Enrollment.objects.exists())
+
+    def test_bad_signature_and_unknown_order(self):
+        tampered = notification("order_1")
+        tampered["payhere_amount"] = "1.00"
+        self.assertEqual(self.client.post(NOTIFY_URL, tampered, format="multipart").status_code, 400)
+        self.assertEqual(self.client.post(NOTIFY_URL, notification("order_404"), format="multipart").status_code, 404)
+        self.assertFalse(ProcessedPaymentEvent.objects.exists())
+
+
+@override_settings(PAYHERE_MERCHANT_ID=MERCHANT_ID, PAYHERE_MERCHANT_SECRET=MERCHANT_SECRET)
+class PaymentNotifyConcurrencyTests(PaymentFixtureMixin, TransactionTestCase):
+    """Load test: PayHere delivering the same notification many times at once."""
+
+    DELIVERIES = 12
+
+    def test_concurrent_duplicate_notifications_apply_once(self):
+        self.create_payment()
+        barrier = threading.Barrier(self.DELIVERIES)
+        statuses, errors = [], []
+
+        def deliver():
+            try:
+                client = APIClient()
+                barrier.wait()
+                statuses.append(client.post(NOTIFY_URL, notification("order_1"), format="multipart").status_code)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=deliver) for _ in range(self.DELIVERIES)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(statuses, [200] * self.DELIVERIES)
+        self.assertEqual(ProcessedPaymentEvent.objects.count(), 1)
+        self.assertEqual(Enrollment.objects.filter(stuid=self.profile).count(), 2)
+        self.assertEqual(InstructorNotification.objects.filter(type="enrollment").count(), 2)
+        self.payment.refresh_from_db()
+        self.assertEqual(self.payment.status, "success")
@@ -0,0 +1,109 @@
+import random
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image, ImageDraw
+from rest_framework.test import APITestCase
+
+from students.models import Payment, ReceiptPayment
+from students.ocr import phash
+from students.ocr.duplicates import find_near_duplicates
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def slip(seed, size=(600, 900)):
+    """White slip with a seeded layout of dark 'text' blocks."""
+    rng = random.Random(seed)
+    image = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(image)
+    for top in range(40, size[1] - 40, 30):
+        left = rng.randint(20, 200)
+        draw.rectangle([left, top, rng.randint(left + 40, size[0] - 20), top + 12], fill="black")
+    return image
+
+
+def jpeg(image, quality=85):
+    buffer = BytesIO()
+    image.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+class PerceptualHashTests(SimpleTestCase):
+    def test_recompressed_and_resized_copies_stay_close(self):
+        original = phash.image_phash(jpeg(slip(1)))
+        recompressed = phash.image_phash(jpeg(slip(1), quality=25))
+        resized = phash.image_phash(jpeg(slip(1).resize((300, 450))))
+        self.assertLessEqual(phash.hamming(original, recompressed), 4)
+        self.assertLessEqual(phash.hamming(original, resized), 4)
+
+    def test_different_slips_are_far_apart(self):
+        self.assertGreater(phash.hamming(phash.image_phash(jpeg(slip(1))), phash.image_phash(jpeg(slip(2)))), 12)
+
+    def test_signed_round_trip_and_blocks(self):
+        value = (1 << 63) | 0xABCD
+        self.assertEqual(phash.to_unsigned(phash.to_signed(value)), value)
+        self.assertEqual(phash.hash_blocks(phash.to_signed(value)), (0xABCD, 0, 0, 0x8000))
+
+    def test_block_probes_cover_radius(self):
+        probes = phash.block_probes(0, 2)
+        self.assertEqual(len(probes), 1 + 16 + 120)
+        self.assertTrue(all(probe.bit_count() <= 2 for probe in probes))
+
+    def test_undecodable_upload_has_no_hash(self):
+        self.assertIsNone(phash.receipt_phash(b"not an image"))
+
+
+class NearDuplicateLookupTests(TestCase):
+    def test_multi_index_lookup_matches_brute_force(self):
+        user = User.objects.create_user(username="student1", password="pass1234", role="student")
+        rng = random.Random(7)
+        target = rng.getrandbits(64)
+        hashes = [rng.getrandbits(64) for _ in range(40)]
+        # Plant hashes 0..12 bits away from the target
+        for distance in range(13):
+            value = target
+            for bit in rng.sample(range(64), distance):
+                value ^= 1 << bit
+            hashes.append(value)
+        for value in hashes:
+            payment = Payment.objects.create(stuid=user, method="receipt", amount=0)
+            ReceiptPayment.objects.create(payid=payment, image_url="receipts/x.jpg", phash=phash.to_signed(value))
+
+        found = {receipt.phash: distance for receipt, distance in find_near_duplicates(target, max_distance=10)}
+        expected = {
+            phash.to_signed(value): phash.hamming(value, target)
+            for value in hashes if phash.hamming(value, target) <= 10
+        }
+        self.assertEqual(found, expected)
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class UploadFlagsNearDuplicatesTests(APITestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def upload(self, content):
+        with self.captureOnCommitCallbacks(execute=False):
+            return self.client.post(
+                "/students/payments/upload-receipt/",
+                {"image": SimpleUploadedFile("slip.jpg", content, content_type="image/jpeg"), "amount": "100"},
+                format="multipart",
+            )
+
+    def test_recompressed_reupload_is_flagged(self):
+        self.client.force_authenticate(User.objects.create_user(username="s1", password="pass1234", role="student"))
+        first = self.upload(jpeg(slip(3))).data["data"]
+        second = self.upload(jpeg(slip(3), quality=30)).data["data"]
+        other = self.upload(jpeg(slip(4))).data["data"]
+
+        self.assertIsNone(first["near_duplicate_of"])
+        self.assertEqual(second["near_duplicate_of"], first["id"])
+        self.assertIsNone(other["near_duplicate_of"])
@@ -0,0 +1,137 @@
+import hashlib
+import os
+import pickle
+import shutil
+import tempfile
+from io import BytesIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from students.models import ReceiptPayment
+from students.ocr.buffers import ImageBuffer, image_bytes
+from students.ocr.cache import content_hash
+from students.ocr.jobs import run_ocr_job
+from students.ocr.pipeline import OCRResult
+
+User = get_user_model()
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def png(size=(60, 80)):
+    buffer = BytesIO()
+    Image.new("RGB", size, "white").save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class StreamingReceiptUploadTests(APITestCase):
+    url = "/students/payments/upload-receipt/"
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.client.force_authenticate(User.objects.create_user(username="s1", password="pass1234", role="student"))
+
+    def upload(self, content, name="slip.png"):
+        with self.captureOnCommitCallbacks(execute=False):
+            return self.client.post(
+                self.url,
+                {"image": SimpleUploadedFile(name, content, content_type="image/png"), "amount": "100"},
+                format="multipart",
+            )
+
+    def temp_files(self):
+        upload_dir = os.path.join(MEDIA_ROOT, ".uploads")
+        return os.listdir(upload_dir) if os.path.isdir(upload_dir) else []
+
+    def test_hash_is_computed_while_streaming_and_file_is_moved_once(self):
+        content = png()
+
+        response = self.upload(content)
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        receipt = ReceiptPayment.objects.get()
+        self.assertEqual(receipt.content_hash, hashlib.sha256(content).hexdigest())
+        with receipt.image_url.open("rb") as stored:
+            self.assertEqual(stored.read(), content)
+        self.assertEqual(self.temp_files(), [])
+
+    @override_settings(RECEIPT_UPLOAD_MAX_BYTES=1024)
+    def test_oversized_upload_is_rejected(self):
+        response = self.upload(png() + b"\0" * 4096)
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertFalse(ReceiptPayment.objects.exists())
+        self.assertEqual(self.temp_files(), [])
+
+    @override_settings(RECEIPT_UPLOAD_MAX_PIXELS=1000)
+    def test_pixel_limit_is_enforced_from_the_header(self):
+        response = self.upload(png(size=(100, 100)))
+
+        self.assertEqual(response.status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.assertIn("100x100", response.data["error"])
+        self.assertFalse(ReceiptPayment.objects.exists())
+
+    @patch.object(Image, "MAX_IMAGE_PIXELS", 100)
+    def test_decompression_bomb_is_rejected(self):
+        response = self.upload(png(size=(100, 100)))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ReceiptPayment.objects.exists())
+        self.assertEqual(self.temp_files(), [])
+
+    def test_non_image_is_rejected(self):
+        response = self.upload(b"%PDF-1.4 not an image", name="slip.pdf")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ReceiptPayment.objects.exists())
+
+    @patch("students.ocr.jobs.run_ocr")
+    def test_worker_passes_a_memory_mapped_buffer_to_ocr(self, mock_run_ocr):
+        content = png()
+        seen = {}
+
+        def fake_run_ocr(image_content):
+            seen["type"] = type(image_content)
+            seen["bytes"] = image_bytes(image_content)
+            return OCRResult(text="Record No: 1", method="tesseract")
+
+        mock_run_ocr.side_effect = fake_run_ocr
+        run_ocr_job(self.upload(content).data["job_id"])
+
+        self.assertIs(seen["type"], ImageBuffer)
+        self.assertEqual(seen["bytes"], content)
+
+
+class ImageBufferTests(SimpleTestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".png")
+        self.content = png()
+        with os.fdopen(handle, "wb") as image_file:
+            image_file.write(self.content)
+        self.addCleanup(os.remove, self.path)
+
+    def test_hash_and_independent_streams(self):
+        with ImageBuffer(self.path) as buffer:
+            self.assertEqual(content_hash(buffer), hashlib.sha256(self.content).hexdigest())
+            first, second = buffer.open(), buffer.open()
+            first.read(10)
+            self.assertEqual(second.read(), self.content)
+            self.assertEqual(Image.open(buffer.open()).size, (60, 80))
+
+    def test_pickles_as_path(self):
+        with ImageBuffer(self.path) as buffer:
+            buffer.view  # an open mapping must not leak into the pickle
+            clone = pickle.loads(pickle.dumps(buffer))
+        self.assertEqual(clone.path, self.path)
+        self.assertEqual(bytes(clone.view), self.content)
+        clone.close()
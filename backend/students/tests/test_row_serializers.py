@@ -0,0 +1,101 @@
+import json
+import tempfile
+from datetime import date, time, timedelta
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from edu_admin.models import ZoomWebinar
+from instructor.models import Class, ClassSchedule, Exam, ExamQuestion, ExamSubmission
+from instructor.serializers import ClassRows, ClassSerializer, ExamListRows, ExamListSerializer
+from students.models import ChatRoom, Message, Notification, StudentProfile
+from students.serializers import MessageRows, MessageSerializer, NotificationRows, NotificationSerializer
+
+User = get_user_model()
+
+
+def rendered(data):
+    return json.loads(JSONRenderer().render(data))
+
+
+class RowSerializerParityTests(TestCase):
+    """Each RowSerializer renders exactly what its ModelSerializer does."""
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor",
+                                                   first_name="Ada", last_name="Lovelace")
+        self.student_user = User.objects.create_user(username="s1", password="pass1234", role="student")
+        self.student = StudentProfile.objects.create(user=self.student_user, mobile="077", nic_no="200000000001",
+                                                     address="Jaffna", year_of_al="2026", school_name="JHC")
+        today = date.today()
+        webinar = ZoomWebinar.objects.create(webinar_id="w1", account_key="a", topic="Live", duration=60,
+                                             start_time=timezone.now(), agenda="Revision")
+        self.classes = [
+            Class.objects.create(title="Chemistry", description="Organic", fee="1500.50", instructor=self.instructor,
+                                 start_date=today - timedelta(days=5), end_date=today + timedelta(days=5),
+                                 webinar=webinar),
+            Class.objects.create(title="Physics", description="", fee=2000, instructor=self.instructor,
+                                 start_date=today + timedelta(days=5), end_date=today + timedelta(days=35)),
+            Class.objects.create(title="Biology", description="", fee=900, instructor=self.instructor,
+                                 start_date=today - timedelta(days=40), end_date=today - timedelta(days=10)),
+        ]
+        for day in ("Wednesday", "Monday"):
+            ClassSchedule.objects.create(class_obj=self.classes[0], day_of_week=day, start_time=time(15, 30))
+
+    def assertSameOutput(self, model_serializer, row_serializer, queryset):
+        expected = rendered(model_serializer(queryset, many=True).data)
+        self.assertEqual(rendered(row_serializer().serialize(queryset)), expected)
+        self.assertTrue(expected)
+
+    def test_class_rows(self):
+        self.assertSameOutput(ClassSerializer, ClassRows, Class.objects.order_by("start_date"))
+
+    def test_exam_list_rows(self):
+        exam = Exam.objects.create(examid="EXM-1", examname="Midterm", classid=self.classes[0],
+                                   instructor=self.instructor, date=date.today(), start_time=time(9, 0),
+                                   duration_minutes=150, status="published")
+        Exam.objects.create(examid="EXM-2", examname="Quiz", classid=self.classes[1], instructor=self.instructor,
+                            date=date.today(), start_time=time(10, 0), duration_minutes=45)
+        for order in range(3):
+            ExamQuestion.objects.create(exam=exam, question_text=f"Q{order}", question_type="short_answer",
+                                        order=order)
+        other_user = User.objects.create_user(username="s2", password="pass1234", role="student")
+        other = StudentProfile.objects.create(user=other_user, mobile="077", nic_no="200000000002",
+                                              address="Jaffna", year_of_al="2026", school_name="JHC")
+        for student in (self.student, other):
+            ExamSubmission.objects.create(exam=exam, student=student)
+
+        self.assertSameOutput(ExamListSerializer, ExamListRows, Exam.objects.order_by("-created_at"))
+        self.assertEqual(ExamListRows().serialize(Exam.objects.filter(pk=exam.pk))[0]["questions_count"], 3)
+
+    def test_message_rows(self):
+        room = ChatRoom.objects.create(name="instructor", created_by=self.student_user)
+        Message.objects.create(chat_room=room, sender=self.student_user, content="Hello")
+        Message.objects.create(chat_room=room, sender=self.instructor, content="")
+        self.assertSameOutput(MessageSerializer, MessageRows, Message.objects.order_by("created_at"))
+
+    def test_notification_rows(self):
+        Notification.objects.create(student_id=self.student, title="Exam", message="Tomorrow", type="exam")
+        Notification.objects.create(student_id=self.student, title="Note", message="New notes")
+        self.assertSameOutput(NotificationSerializer, NotificationRows, Notification.objects.order_by("-created_at"))
+
+
+class BenchmarkSerializersCommandTests(TestCase):
+    def test_reports_rows_per_second(self):
+        output = Path(tempfile.mkdtemp()) / "report.json"
+        stdout = StringIO()
+        call_command("benchmark_serializers", rows=20, repeat=1, output=str(output), stdout=stdout)
+
+        report = json.loads(output.read_text())
+        self.assertEqual(set(report["serializers"]), {"class", "exam_list", "message", "notification"})
+        for result in report["serializers"].values():
+            self.assertGreater(result["row_serializer_rows_per_sec"], 0)
+            self.assertGreater(result["model_serializer_rows_per_sec"], 0)
+        self.assertIn("rows/s", stdout.getvalue())
+        # Generated rows are rolled back
+        self.assertFalse(Class.objects.filter(title="Class 0").exists())
@@ -0,0 +1,126 @@
+import random
+from datetime import date, time
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from instructor.conflicts import Slot, enrollment_conflicts, exam_conflicts, overlapping_pairs
+from instructor.models import Class, ClassSchedule, Exam, ExamQuestion
+from students.models import Enrollment, StudentProfile
+
+User = get_user_model()
+
+
+def slot(index, begin, end):
+    return Slot('exam', index, 1, '', '', begin, end, date(2025, 6, 2), date(2025, 6, 2), '', '')
+
+
+class OverlappingPairsTests(SimpleTestCase):
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(50):
+            spans = [sorted(rng.sample(range(0, 500), 2)) for _ in range(40)]
+            proposed = [slot(i, *span) for i, span in enumerate(spans[:8])]
+            existing = [slot(i, *span) for i, span in enumerate(spans[8:])]
+            expected = {(p.object_id, e.object_id) for p in proposed for e in existing
+                        if p.begin < e.end and e.begin < p.end}
+            found = [(p.object_id, e.object_id) for p, e in overlapping_pairs(proposed, existing)]
+            self.assertEqual(len(found), len(set(found)))
+            self.assertEqual(set(found), expected)
+
+
+class ScheduleConflictTests(APITestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        self.chemistry = self.make_class("Chemistry", "Monday", time(15, 30))
+        self.students = [self.make_student(index) for index in range(3)]
+        for student in self.students[:2]:
+            Enrollment.objects.create(stuid=student, classid=self.chemistry)
+
+    def make_class(self, title, day, start_time, start_date=date(2025, 6, 1), end_date=date(2025, 6, 30)):
+        class_obj = Class.objects.create(title=title, description="", fee=1000, instructor=self.instructor,
+                                         start_date=start_date, end_date=end_date)
+        ClassSchedule.objects.create(class_obj=class_obj, day_of_week=day, start_time=start_time)
+        return class_obj
+
+    def make_student(self, index):
+        user = User.objects.create_user(username=f"s{index}", password="pass1234", role="student")
+        return StudentProfile.objects.create(user=user, mobile="077", nic_no=f"20000000000{index}", address="Jaffna",
+                                             year_of_al="2026", school_name="JHC")
+
+    def test_enrollment_conflicts_need_a_shared_date(self):
+        physics = self.make_class("Physics", "Monday", time(16, 0))
+        conflicts = enrollment_conflicts(self.students[0], Class.objects.filter(pk=physics.pk))
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]["existing"]["class_title"], "Chemistry")
+        self.assertEqual(conflicts[0]["proposed"]["day_of_week"], "Monday")
+        self.assertEqual(conflicts[0]["student_ids"], [self.students[0].pk])
+
+        back_to_back = self.make_class("Biology", "Monday", time(17, 0))
+        next_month = self.make_class("Maths", "Monday", time(16, 0), date(2025, 7, 1), date(2025, 7, 31))
+        # Overlapping dates but no common Monday (June 3rd is a Tuesday)
+        no_monday = self.make_class("Art", "Monday", time(16, 0), date(2025, 6, 3), date(2025, 6, 8))
+        for class_obj in (back_to_back, next_month, no_monday):
+            self.assertEqual(enrollment_conflicts(self.students[0], Class.objects.filter(pk=class_obj.pk)), [])
+
+    def test_enrollment_conflicts_include_published_exams(self):
+        Exam.objects.create(examid="EXM-1", examname="Midterm", classid=self.chemistry, instructor=self.instructor,
+                            date=date(2025, 6, 18), start_time=time(10, 0), duration_minutes=120, is_published=True)
+        physics = self.make_class("Physics", "Wednesday", time(11, 0))
+
+        conflicts = enrollment_conflicts(self.students[0], Class.objects.filter(pk=physics.pk))
+        self.assertEqual([c["existing"]["type"] for c in conflicts], ["exam"])
+        self.assertEqual(conflicts[0]["existing"]["date"], "2025-06-18")
+
+    def test_exam_conflicts_scale_by_class_not_student(self):
+        physics = self.make_class("Physics", "Wednesday", time(9, 0))
+        Enrollment.objects.create(stuid=self.students[0], classid=physics)
+
+        with CaptureQueriesContext(connection) as few:
+            conflicts = exam_conflicts(physics, date(2025, 6, 16), time(16, 0), 60, "Quiz")
+        self.assertEqual([(c["existing"]["class_title"], c["student_ids"]) for c in conflicts],
+                         [("Chemistry", [self.students[0].pk])])
+
+        # The class's own sessions count too
+        own = exam_conflicts(physics, date(2025, 6, 18), time(9, 30), 60, "Quiz")
+        self.assertEqual([c["existing"]["class_title"] for c in own], ["Physics"])
+
+        for index in range(3, 30):
+            student = self.make_student(index)
+            Enrollment.objects.create(stuid=student, classid=physics)
+            Enrollment.objects.create(stuid=student, classid=self.chemistry)
+        with CaptureQueriesContext(connection) as many:
+            conflicts = exam_conflicts(physics, date(2025, 6, 16), time(16, 0), 60, "Quiz")
+        self.assertEqual(len(conflicts[0]["student_ids"]), 28)
+        self.assertEqual(len(many), len(few))
+
+    def test_validation_endpoints(self):
+        self.client.force_authenticate(self.students[0].user)
+        physics = self.make_class("Physics", "Monday", time(16, 0))
+        response = self.client.get("/students/enrollment-conflicts/", {"classes": physics.classid})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["conflicts"]), 1)
+        self.assertEqual(self.client.get("/students/enrollment-conflicts/").status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(self.instructor)
+        payload = {"classid": self.chemistry.pk, "date": "2025-06-09", "start_time": "16:00"}
+        response = self.client.post("/instructor/exams/conflicts/", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["conflicts"][0]["existing"]["type"], "class_session")
+
+        exam = Exam.objects.create(examid="EXM-2", examname="Quiz", classid=self.chemistry, instructor=self.instructor,
+                                   date=date(2025, 6, 9), start_time=time(16, 0))
+        ExamQuestion.objects.create(exam=exam, question_text="Q1", question_type="short_answer", order=0)
+        response = self.client.post(f"/instructor/exams/{exam.pk}/publish/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["conflicts"]), 1)
+
+        other = User.objects.create_user(username="i2", password="pass1234", role="instructor")
+        self.client.force_authenticate(other)
+        response = self.client.post("/instructor/exams/conflicts/", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
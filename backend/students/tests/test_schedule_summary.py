@@ -0,0 +1,93 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from instructor.models import Class, ClassSchedule
+from instructor.schedules import summarize_schedules
+from instructor.serializers import ClassSerializer
+from students.models import Enrollment, StudentProfile
+
+User = get_user_model()
+
+
+def make_class(title, instructor, **kwargs):
+    today = date.today()
+    return Class.objects.create(title=title, description="", fee=1000, instructor=instructor,
+                                start_date=today, end_date=today + timedelta(days=30), **kwargs)
+
+
+class ScheduleSummaryTests(TestCase):
+    def setUp(self):
+        self.instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        self.class_obj = make_class("Chemistry", self.instructor)
+
+    def test_summary_groups_slots_and_orders_days(self):
+        schedules = [
+            ClassSchedule(day_of_week="Friday", start_time=time(15, 30), duration_minutes=90),
+            ClassSchedule(day_of_week="Monday", start_time=time(15, 30), duration_minutes=90),
+            ClassSchedule(day_of_week="Saturday", start_time=time(9, 0), duration_minutes=120),
+        ]
+        summary, groups = summarize_schedules(schedules)
+
+        self.assertEqual(summary, "Mon, Fri - 03:30 PM–05:00 PM\nSat - 09:00 AM–11:00 AM")
+        self.assertEqual(groups, [
+            {"start_time": "15:30", "duration_minutes": 90, "days_of_week": ["Monday", "Friday"]},
+            {"start_time": "09:00", "duration_minutes": 120, "days_of_week": ["Saturday"]},
+        ])
+        self.assertEqual(summarize_schedules([]), ("", []))
+
+    def test_kept_in_step_with_schedule_rows(self):
+        ClassSchedule.objects.create(class_obj=self.class_obj, day_of_week="Wednesday", start_time=time(10, 0))
+        monday = ClassSchedule.objects.create(class_obj=self.class_obj, day_of_week="Monday", start_time=time(10, 0))
+        self.assertEqual(self.class_obj.schedule_summary, "Mon, Wed - 10:00 AM–11:30 AM")
+
+        schedule = ClassSchedule.objects.get(pk=monday.pk)  # class_obj not loaded
+        schedule.start_time = time(8, 0)
+        schedule.save()
+        self.class_obj.refresh_from_db()
+        self.assertEqual(self.class_obj.schedule_summary, "Wed - 10:00 AM–11:30 AM\nMon - 08:00 AM–09:30 AM")
+
+        ClassSchedule.objects.filter(class_obj=self.class_obj).delete()
+        self.class_obj.refresh_from_db()
+        self.assertEqual((self.class_obj.schedule_summary, self.class_obj.schedule_groups), ("", []))
+
+    def test_serializer_update_returns_new_schedules(self):
+        ClassSchedule.objects.create(class_obj=self.class_obj, day_of_week="Monday", start_time=time(10, 0))
+        serializer = ClassSerializer(self.class_obj, data={"schedules": [
+            {"start_time": "16:00", "duration_minutes": 60, "days_of_week": ["Thursday", "Tuesday"]},
+        ]}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        self.assertEqual(serializer.data["schedules"], [
+            {"start_time": "16:00", "duration_minutes": 60, "days_of_week": ["Tuesday", "Thursday"]},
+        ])
+        self.assertEqual(Class.objects.get(pk=self.class_obj.pk).schedule_summary, "Tue, Thu - 04:00 PM–05:00 PM")
+
+
+class ClassListQueryTests(APITestCase):
+    def setUp(self):
+        instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        user = User.objects.create_user(username="s1", password="pass1234", role="student")
+        student = StudentProfile.objects.create(user=user, mobile="077", nic_no="200000000001",
+                                                address="Jaffna", year_of_al="2026", school_name="JHC")
+        for index in range(4):
+            class_obj = make_class(f"Class {index}", instructor)
+            ClassSchedule.objects.create(class_obj=class_obj, day_of_week="Monday", start_time=time(10, index))
+            if index % 2:
+                Enrollment.objects.create(stuid=student, classid=class_obj)
+        self.client.force_authenticate(user)
+
+    def test_student_classes_never_read_schedules(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/students/classes/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["enrolled"][0]["schedule"], "Mon - 10:01 AM–11:31 AM")
+        self.assertEqual(len(response.data["others"]), 2)
+        self.assertFalse([q for q in queries.captured_queries if "instructor_classschedule" in q["sql"]])
@@ -0,0 +1,72 @@
+from datetime import date, time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from edu_admin.models import ZoomWebinar
+from instructor.models import Class, ClassSchedule
+from students.models import Enrollment, StudentProfile
+
+User = get_user_model()
+
+
+class StudentCatalogTests(APITestCase):
+    url = "/students/classes/"
+
+    def setUp(self):
+        self.instructor = User.objects.create_user(username="i1", password="pass1234", role="instructor")
+        user = User.objects.create_user(username="s1", password="pass1234", role="student")
+        self.student = StudentProfile.objects.create(user=user, mobile="077", nic_no="200000000001",
+                                                     address="Jaffna", year_of_al="2026", school_name="JHC")
+        self.client.force_authenticate(user)
+        self.today = date.today()
+
+        webinar = ZoomWebinar.objects.create(webinar_id="w1", account_key="a", topic="Live", duration=60,
+                                             start_time=timezone.now())
+        self.enrolled = self.make_class("Chemistry", 0, webinar=webinar)
+        ClassSchedule.objects.create(class_obj=self.enrolled, day_of_week="Monday", start_time=time(15, 30))
+        self.enrolled_ended = self.make_class("Biology", -60, end_offset=-1)
+        self.make_class("History", -60, end_offset=-1)  # ended and not enrolled: hidden
+        self.others = [self.make_class(f"Class {index}", index) for index in range(1, 6)]
+        for class_obj in (self.enrolled, self.enrolled_ended):
+            Enrollment.objects.create(stuid=self.student, classid=class_obj)
+
+    def make_class(self, title, start_offset, end_offset=30, **kwargs):
+        return Class.objects.create(title=title, description="", fee=1500, instructor=self.instructor,
+                                    start_date=self.today + timedelta(days=start_offset),
+                                    end_date=self.today + timedelta(days=end_offset), **kwargs)
+
+    def test_enrolled_and_other_classes_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([c["title"] for c in response.data["enrolled"]], ["Biology", "Chemistry"])
+        self.assertEqual([c["title"] for c in response.data["others"]], [f"Class {i}" for i in range(1, 6)])
+        chemistry = response.data["enrolled"][1]
+        self.assertEqual(chemistry["webinar_id"], "w1")
+        self.assertEqual(chemistry["schedule"], "Mon - 03:30 PM–05:00 PM")
+        self.assertEqual(chemistry["fee"], 1500.0)
+        self.assertTrue(chemistry["enrolled"])
+        self.assertFalse(response.data["others"][0]["enrolled"])
+        # More classes or enrollments add no queries
+        self.assertEqual(len(queries), 1)
+
+    def test_paginated_others(self):
+        first = self.client.get(self.url, {"page_size": 3}).data
+        second = self.client.get(self.url, {"page_size": 3, "cursor": first["next_cursor"]}).data
+
+        self.assertEqual([c["title"] for c in first["enrolled"]], ["Biology", "Chemistry"])
+        self.assertEqual([c["title"] for c in first["others"]], ["Class 1", "Class 2", "Class 3"])
+        self.assertTrue(first["has_more"])
+        self.assertEqual([c["title"] for c in second["others"]], ["Class 4", "Class 5"])
+        self.assertFalse(second["has_more"])
+        self.assertIsNone(second["next_cursor"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {"page_size": 3, "cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,7 +1,7 @@
 from django.urls import path
 from django.conf import settings
 from django.conf.urls.static import static
-from .views import OnlinePaymentView, ReceiptUploadView
+from .views import OnlinePaymentView, ReceiptUploadView, OCRJobStatusView
 from .views import PaymentInfoView,StudentProfileView
 from .views import EditStudentProfileView
 from . import views
@@ -15,6 +15,7 @@ urlpatterns = [
     path('payments/online/', OnlinePaymentView.as_view(), name='online-payment'),
     # path('payhere-notify/', PayHereNotifyView.as_view(), name='payhere-notify'),
     path("payments/upload-receipt/", ReceiptUploadView.as_view(), name="upload-receipt"),
+    path("payments/ocr-jobs/<uuid:job_id>/", OCRJobStatusView.as_view(), name="ocr-job-status"),
     path("payment-info/", PaymentInfoView.as_view(), name="payment-info"),
     path("student-profile/", StudentProfileView.as_view(), name="student-profile"),
     # path("payments/create-payhere-url/", CreatePayHereCheckoutUrl.as_view()),
@@ -28,6 +29,11 @@ urlpatterns = [
     path('marks/', views.getStudentMarks, name='get_student_marks'),
     path('enroll-class/', views.enroll_class, name='enroll_class'),
     path('calendar-events/', views.calendarEvent, name="calendar-events"),
+    path('enrollment-conflicts/', views.enrollment_conflict_check, name="enrollment-conflicts"),
+    path('timetable/', views.class_timetable, name="class-timetable"),
+    path('calendar-sync/', views.calendar_sync, name="calendar-sync"),
+    path('calendar-feed/', views.calendar_feed_url, name="calendar-feed-url"),
+    path('calendar/<str:token>.ics', views.calendar_feed, name="calendar-feed"),
     path('notifications/',views.get_notifications,name='notifications'),
     path('notifications/<int:pk>/read/',views.mark_notification_read, name='mark-notification-read'),
     path('notifications/<int:pk>/delete/',views.delete_notification, name='delete-notification'),
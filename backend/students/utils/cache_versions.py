@@ -0,0 +1,45 @@
+"""
+Generation counters for invalidating groups of cache entries.
+
+Cached values are stored under keys that embed the current version of the
+data they were computed from (e.g. ``payments``). Changing that data bumps
+the version, so every dependent entry is missed at once without having to
+know or delete individual keys; stale entries simply expire.
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _key(namespace):
+    return f"cache-version:{namespace}"
+
+
+def _initial_version():
+    # Higher than any version handed out before the counter was lost (e.g. evicted)
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    version = cache.get(_key(namespace))
+    if version is None:
+        cache.add(_key(namespace), _initial_version(), timeout=None)
+        version = cache.get(_key(namespace))
+    return version
+
+
+def _incr(namespace):
+    try:
+        cache.incr(_key(namespace))
+    except ValueError:  # not set yet, or evicted
+        cache.add(_key(namespace), _initial_version(), timeout=None)
+
+
+def bump_version(namespace):
+    """
+    Invalidate the namespace now and again when the current transaction
+    commits, so values computed from not-yet-committed data are discarded too.
+    """
+    _incr(namespace)
+    transaction.on_commit(lambda: _incr(namespace))
@@ -2,17 +2,40 @@ import os
 import json
 import tempfile
 
+
+def parse_google_credentials_json(creds_json_str):
+    """Parse the service-account JSON from the environment into a dict."""
+    creds_json_str = creds_json_str.strip("'")
+    creds_dict = json.loads(creds_json_str)
+    if "private_key" in creds_dict:
+        creds_dict["private_key"] = creds_dict["private_key"].replace("\\n", "\n")
+    return creds_dict
+
+
+def load_google_credentials():
+    """
+    Build in-memory service-account credentials from
+    GOOGLE_APPLICATION_CREDENTIALS_JSON. Returns None when the variable is not
+    set, so the client library falls back to its default credential lookup.
+    """
+    creds_json_str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
+    if not creds_json_str:
+        return None
+
+    from google.oauth2 import service_account
+    return service_account.Credentials.from_service_account_info(
+        parse_google_credentials_json(creds_json_str)
+    )
+
+
 def setup_google_credentials():
     creds_json_str = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
     if not creds_json_str:
         print("GOOGLE_APPLICATION_CREDENTIALS_JSON not set")
         return False
     
-    creds_json_str = creds_json_str.strip("'")
     try:
-        creds_dict = json.loads(creds_json_str)
-        if "private_key" in creds_dict:
-            creds_dict["private_key"] = creds_dict["private_key"].replace("\\n", "\n")
+        creds_dict = parse_google_credentials_json(creds_json_str)
         with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.json') as temp_file:
             json.dump(creds_dict, temp_file)
             temp_file_path = temp_file.name
@@ -0,0 +1,96 @@
+"""
+Keyset (cursor) pagination over a ``(date, id)``-style ordering.
+
+Unlike OFFSET pagination, fetching page ``n`` costs the same as page 1: the
+cursor carries the sort key of the last row served and the next page is a
+range scan starting just below it, which an index on the two columns (led by
+any equality filter such as the owner) answers directly.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.db.models import Q
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(values):
+    payload = json.dumps([
+        v.isoformat() if isinstance(v, (date, datetime)) else str(v) if isinstance(v, Decimal) else v
+        for v in values
+    ])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor, parsers):
+    """Decode ``cursor`` into one value per parser (e.g. date.fromisoformat, int)."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("wrong number of values")
+        return [parse(value) for parse, value in zip(parsers, values)]
+    except (ValueError, TypeError, ArithmeticError) as e:
+        raise InvalidCursor(f"Invalid cursor: {e}") from e
+
+
+def parse_page_size(value, default, maximum):
+    if value in (None, ""):
+        return default
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        raise InvalidCursor("page_size must be an integer.")
+    if size < 1:
+        raise InvalidCursor("page_size must be positive.")
+    return min(size, maximum)
+
+
+class KeysetPage:
+    """
+    One page of ``queryset`` ordered by ``fields``, descending unless
+    ``descending`` is False.
+
+    ``queryset`` may be a values() queryset or a model queryset; ``key`` reads
+    the sort key back from a row (defaults to item/attribute access on
+    ``fields``). One extra row is fetched to know whether a next page exists.
+    """
+
+    def __init__(self, queryset, fields, parsers, cursor=None, page_size=50, key=None, descending=True):
+        self.fields = fields
+        self.descending = descending
+        if cursor:
+            values = decode_cursor(cursor, parsers)
+            queryset = queryset.filter(self._after(values))
+        direction = "-" if descending else ""
+        queryset = queryset.order_by(*[f"{direction}{field}" for field in fields])
+        rows = list(queryset[:page_size + 1])
+        self.has_more = len(rows) > page_size
+        self.rows = rows[:page_size]
+        self._key = key or self._default_key
+
+    def _after(self, values):
+        # (f1, f2) < (v1, v2) (or > ascending) expanded so each branch can use the index
+        lookup = "lt" if self.descending else "gt"
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            branch = Q(**{f"{field}__{lookup}": values[index]})
+            for previous, value in zip(self.fields[:index], values[:index]):
+                branch &= Q(**{previous: value})
+            condition |= branch
+        return condition
+
+    def _default_key(self, row):
+        if isinstance(row, dict):
+            return [row[field] for field in self.fields]
+        return [getattr(row, field) for field in self.fields]
+
+    @property
+    def next_cursor(self):
+        if not self.has_more or not self.rows:
+            return None
+        return encode_cursor(self._key(self.rows[-1]))
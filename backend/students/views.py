@@ -5,73 +5,49 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
-from .models import Payment, OnlinePayment, ReceiptPayment, Enrollment, StudentProfile
+from .models import Payment, OnlinePayment, ReceiptPayment, Enrollment, StudentProfile, OCRJob
 import uuid
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.decorators import method_decorator
 from django.http import HttpResponse
 from django.contrib.auth import get_user_model
-from .serializers import ReceiptPaymentSerializer
+from .serializers import ReceiptPaymentSerializer, OCRJobSerializer
+from .ocr.buffers import ImageBuffer
+from .ocr.cache import get_cached_ocr
+from .ocr.duplicates import flag_near_duplicate
+from .ocr.jobs import complete_from_cache, create_ocr_job
+from .ocr.phash import receipt_phash
+from .ocr.uploads import ReceiptUploadHandler
+from .calendar import (CalendarError, calendar_events, feed_token, get_feed, parse_window, student_id_from_token,
+                       timetable)
+from .calendar_sync import SyncTokenExpired, delta_sync, full_sync
+from .catalog import etag_matches, get_catalog, student_catalog
+from .enrollment import EnrollmentService
+from instructor.conflicts import enrollment_conflicts
+from .payhere import process_notification
+from .utils.pagination import InvalidCursor, KeysetPage, parse_page_size
 from accounts.serializers import StudentProfileSerializer, UserSerializer
 import hashlib
 from django.conf import settings
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from django.db.models import OuterRef, Subquery
 from django.utils import timezone
 import time
 
-# OCR Libraries with fallback support
-try:
-    from google.cloud import vision
-    VISION_AVAILABLE = True
-except ImportError:
-    VISION_AVAILABLE = False
-    print("📋 Google Vision API not available, will use Tesseract fallback")
-
-try:
-    import pytesseract
-    from PIL import Image
-    TESSERACT_AVAILABLE = True
-except ImportError:
-    TESSERACT_AVAILABLE = False
-    print("📋 Tesseract not available, install with: pip install pytesseract pillow")
 from instructor.models import Exam, ExamQuestion, QuestionOption, ExamSubmission, ExamAnswer
 from instructor.serializers import ExamListSerializer, ExamQuestionSerializer
-# Initialize Google Cloud credentials once when module loads
-# setup_google_credentials()  # Temporarily commented
 
 User = get_user_model()  # Get the User model used by Django project
 
-def extract_text_with_tesseract(image_path):
-    """
-    Extract text from image using Tesseract OCR as fallback
-    """
-    try:
-        if not TESSERACT_AVAILABLE:
-            return None
-        
-        # Open and process image
-        image = Image.open(image_path)
-        
-        # Convert to RGB if needed
-        if image.mode != 'RGB':
-            image = image.convert('RGB')
-        
-        # Extract text using Tesseract
-        extracted_text = pytesseract.image_to_string(image, lang='eng')
-        print(f"🔍 Tesseract extracted text:\n{extracted_text}")
-        
-        return extracted_text.strip()
-        
-    except Exception as e:
-        print(f"❌ Tesseract OCR error: {str(e)}")
-        return None
-
 merchant_id = settings.PAYHERE_MERCHANT_ID
 merchant_secret = settings.PAYHERE_MERCHANT_SECRET
 
@@ -121,13 +97,18 @@ class OnlinePaymentView(APIView):
 
 class ReceiptUploadView(APIView):
     """
-    API view to upload receipt images and process them with Google Vision OCR
+    API view to upload receipt images. OCR runs on the background worker pool;
+    the response carries a job id that can be polled or followed over websocket.
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]  # Support multipart/form-data for file upload
 
     def post(self, request):
+        # Hash, size-check and store the upload in one pass as chunks arrive
+        upload_handler = ReceiptUploadHandler(request._request)
+        request._request.upload_handlers = [upload_handler]
+
         user = request.user
         image = request.FILES.get("image")
         method = 'receipt'
@@ -136,324 +117,153 @@ class ReceiptUploadView(APIView):
         class_ids_str = request.data.get('class_ids', '[]')  # JSON string of class IDs
         class_names = request.data.get('class_names', '')    # Comma-separated class names
         amount = request.data.get('amount', 0.0)             # Payment amount
-        
-        print(f"📋 Receipt Upload Request Data:")
-        print(f"   Class IDs: {class_ids_str}")
-        print(f"   Class Names: {class_names}")
-        print(f"   Amount: {amount}")
+
+        if upload_handler.error:
+            # Too large, too many pixels or not an image; rejected mid-stream
+            return Response({'error': str(upload_handler.error)}, status=upload_handler.error.status_code)
 
         if not image:
             # No image file was sent in the request
             return Response({'error': "No image provided"}, status=400)
 
-        # Create initial Payment record with class names
-        payment = Payment.objects.create(
-            stuid=user, 
-            method=method, 
-            amount=float(amount) if amount else 0.0,
-            class_names=class_names if class_names else None  # Store class names (can be null)
-        )
-
-        # OCR Processing with fallback system
-        full_text = None
-        ocr_method = "none"
-        vision_error_message = None
-        
-        # Try Google Vision API first (if available and billing enabled)
-        if VISION_AVAILABLE:
-            try:
-                # Set up Google Vision API credentials from environment
-                vision_credentials = os.getenv("GOOGLE_APPLICATION_CREDENTIALS_JSON")
-                if vision_credentials:
-                    # Parse the JSON credentials
-                    credentials_dict = json.loads(vision_credentials)
-                    
-                    # Create a temporary credentials file
-                    import tempfile
-                    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-                        json.dump(credentials_dict, temp_file)
-                        temp_credentials_path = temp_file.name
-                    
-                    # Set the environment variable for Google Cloud
-                    os.environ['GOOGLE_APPLICATION_CREDENTIALS'] = temp_credentials_path
-                    
-                    print("🔧 Google Vision API credentials set up successfully")
-                
-                # Initialize Google Vision API client
-                client = vision.ImageAnnotatorClient()
-                
-                # Read image content from uploaded file
-                image_content = image.read()
-                vision_image = vision.Image(content=image_content)
-
-                print("📷 Processing image with Google Vision API...")
-                
-                # Use Google Vision API to detect text in image
-                response = client.text_detection(image=vision_image)
-                
-                # Clean up temporary credentials file
-                if vision_credentials and 'temp_credentials_path' in locals():
-                    try:
-                        os.unlink(temp_credentials_path)
-                    except:
-                        pass
-
-                # Check for Vision API errors (including billing issues)
-                if response.error.message:
-                    vision_error_message = response.error.message
-                    print(f"❌ Vision API error: {vision_error_message}")
-                    
-                    # Check if it's a billing issue
-                    if "billing" in vision_error_message.lower() or "403" in vision_error_message:
-                        print("💳 Billing issue detected, falling back to Tesseract...")
-                    
-                    raise Exception(f"Vision API error: {vision_error_message}")
-
-                # Check if text was detected
-                if response.text_annotations:
-                    full_text = response.text_annotations[0].description
-                    ocr_method = "google_vision"
-                    print(f"✅ Google Vision API extracted text successfully")
-                else:
-                    print("⚠️ No text detected by Vision API, trying Tesseract...")
-                    raise Exception("No text detected by Vision API")
-
-            except Exception as vision_error:
-                vision_error_message = str(vision_error)
-                print(f"💥 Vision API error: {vision_error_message}")
-                
-                # Reset image file pointer for Tesseract
-                image.seek(0)
-        
-        # Fallback to Tesseract if Vision API failed or unavailable
-        if not full_text and TESSERACT_AVAILABLE:
-            try:
-                print("🔄 Falling back to Tesseract OCR...")
-                
-                # Save uploaded image temporarily for Tesseract
-                import tempfile
-                with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as temp_image:
-                    image.seek(0)
-                    temp_image.write(image.read())
-                    temp_image_path = temp_image.name
-                
-                # Extract text using Tesseract
-                full_text = extract_text_with_tesseract(temp_image_path)
-                
-                # Clean up temporary image
-                try:
-                    os.unlink(temp_image_path)
-                except:
-                    pass
-                
-                if full_text:
-                    ocr_method = "tesseract"
-                    print("✅ Tesseract OCR extracted text successfully")
-                else:
-                    print("❌ Tesseract OCR failed to extract text")
-                    
-            except Exception as tesseract_error:
-                print(f"💥 Tesseract OCR error: {str(tesseract_error)}")
-        
-        # If no OCR method worked, save receipt without extracted data
-        if not full_text:
-            print("🔒 All OCR methods failed, saving receipt for manual verification")
-            receipt_payment = ReceiptPayment.objects.create(
-                payid=payment,
-                image_url=image,
-                verified=False
-            )
-            serializer = ReceiptPaymentSerializer(receipt_payment)
-            
-            response_data = {
-                "message": "Receipt uploaded successfully. OCR processing failed, manual verification required.",
-                "data": serializer.data,
-                "ocr_status": "failed",
-                "available_ocr": f"Vision: {'✅' if VISION_AVAILABLE else '❌'}, Tesseract: {'✅' if TESSERACT_AVAILABLE else '❌'}"
-            }
-            
-            if vision_error_message:
-                response_data["vision_error"] = vision_error_message
-                
-                # Add billing instructions if it's a billing error
-                if "billing" in vision_error_message.lower() or "403" in vision_error_message:
-                    response_data["billing_help"] = "Please enable billing in your Google Cloud project: https://console.developers.google.com/billing/enable?project=249055087183"
-                
-            return Response(response_data, status=status.HTTP_201_CREATED)
-
-        # Process extracted text (from either Vision API or Tesseract)
-        print(f"📝 Extracted text from receipt using {ocr_method}:\n{full_text}")
-
-        # Enhanced regex patterns for better text extraction
-        record_no_match = re.search(r'(?:Record No|Receipt No|Transaction ID|Ref No)[:\s]*(\d+)', full_text, re.IGNORECASE)
-        location_match = re.search(r'(?:Location|Branch)[:\s]*(.+?)(?:\n|$)', full_text, re.IGNORECASE)
-        
-        # Multiple patterns for amount detection
-        paid_amount_match = re.search(r'(?:RS\.?|LKR\.?|Amount)[:\s]*([\d,]+\.?\d*)', full_text, re.IGNORECASE)
-        if not paid_amount_match:
-            paid_amount_match = re.search(r'([\d,]+\.?\d*)\s*(?:RS|LKR)', full_text, re.IGNORECASE)
-        if not paid_amount_match:
-            paid_amount_match = re.search(r'Total[:\s]*([\d,]+\.?\d*)', full_text, re.IGNORECASE)
-        
-        account_no_match = re.search(r'(?:TO|Account)[:\s]*(\d+)', full_text, re.IGNORECASE)
-        account_name_match = re.search(r'(?:TO|Account)\s*\d+[:\s]*(.+?)(?:\n|$)', full_text, re.IGNORECASE)
-        
-        # Enhanced date patterns
-        date_match = re.search(r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})\s*(\d{1,2}:\d{2})', full_text)
-        if not date_match:
-            date_match = re.search(r'(\d{1,2}[\/\-]\d{1,2}[\/\-]\d{2,4})', full_text)
-        
-        # Update payment amount if extracted
-        if paid_amount_match:
-            try:
-                amount_str = paid_amount_match.group(1).replace(',', '')
-                extracted_amount = float(amount_str)
-                payment.amount = extracted_amount
-                print(f"💰 Extracted amount: {extracted_amount}")
-            except ValueError as e:
-                print(f"⚠️ Could not parse amount: {amount_str}")
-        
-        payment.save()
-
-        # Parse date and time with multiple formats
-        paid_date_time = None
-        if date_match:
-            date_str = date_match.group(1)
-            time_str = date_match.group(2) if date_match.lastindex >= 2 else "00:00"
-            
-            # Try multiple date formats
-            for date_format in ['%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y', '%d-%m-%y', '%Y/%m/%d', '%Y-%m-%d']:
-                try:
-                    paid_date_time = datetime.strptime(f"{date_str} {time_str}", f"{date_format} %H:%M")
-                    print(f"📅 Parsed date: {paid_date_time}")
-                    break
-                except ValueError:
-                    continue
-            
-            if not paid_date_time:
-                print(f"⚠️ Could not parse date: {date_str}")
-
-        # Save receipt image + extracted info
         try:
+            class_ids = json.loads(class_ids_str) if class_ids_str else []
+        except json.JSONDecodeError:
+            class_ids = None
+        if not isinstance(class_ids, list):
+            return Response({'error': "class_ids must be a JSON list of class IDs"}, status=400)
+
+        # The SHA-256 was computed while streaming; re-uploaded receipts reuse a cached OCR result
+        digest = image.sha256
+        cached = get_cached_ocr(digest)
+        with ImageBuffer(image.temporary_file_path()) as image_buffer:
+            phash = receipt_phash(image_buffer)
+
+        with transaction.atomic():
+            # Create initial Payment record with class names
+            payment = Payment.objects.create(
+                stuid=user, 
+                method=method, 
+                amount=float(amount) if amount else 0.0,
+                class_names=class_names if class_names else None  # Store class names (can be null)
+            )
             receipt_payment = ReceiptPayment.objects.create(
                 payid=payment,
                 image_url=image,
-                record_no=record_no_match.group(1) if record_no_match else None,
-                location=location_match.group(1).strip() if location_match else None,
-                paid_amount=paid_amount_match.group(1).replace(',', '') if paid_amount_match else None,
-                account_no=account_no_match.group(1) if account_no_match else None,
-                account_name=account_name_match.group(1).strip() if account_name_match else None,
-                paid_date_time=paid_date_time,
+                content_hash=digest,
+                phash=phash,
+                class_ids=class_ids or None,
                 verified=False
             )
-            
-            # Log extracted information
-            extraction_log = {
-                "record_no": record_no_match.group(1) if record_no_match else "Not found",
-                "location": location_match.group(1).strip() if location_match else "Not found",
-                "amount": paid_amount_match.group(1) if paid_amount_match else "Not found",
-                "account_no": account_no_match.group(1) if account_no_match else "Not found",
-                "date": date_str if date_match else "Not found"
-            }
-            print(f"📊 Extraction results: {extraction_log}")
-            
-        except IntegrityError as e:
-            print(f"💥 Database integrity error: {str(e)}")
-            return Response({
-                'error': 'Duplicate or invalid transaction ID. Please upload a different receipt.'
-            }, status=400)
+            # Flag re-cropped/re-compressed copies of an already uploaded slip
+            flag_near_duplicate(receipt_payment)
+            if cached:
+                job = complete_from_cache(receipt_payment, cached)
+            else:
+                # OCR is queued once this transaction commits
+                job = create_ocr_job(receipt_payment)
 
-        # Serialize and return saved receipt payment details
         serializer = ReceiptPaymentSerializer(receipt_payment)
-        
-        # Create success message based on OCR method used
-        if ocr_method == "google_vision":
-            success_message = "✅ Receipt processed successfully with Google Vision OCR!"
-        elif ocr_method == "tesseract":
-            success_message = "✅ Receipt processed successfully with Tesseract OCR!"
-        else:
-            success_message = "✅ Receipt processed successfully!"
-        
-        return Response({
-            "message": success_message,
+        response_data = {
             "data": serializer.data,
-            "extracted_info": extraction_log,
-            "ocr_method": ocr_method,
-            "ocr_status": "success"
-        }, status=status.HTTP_201_CREATED)
+            "job_id": str(job.job_id),
+            "ocr_status": job.status,
+            "status_url": reverse("ocr-job-status", kwargs={"job_id": job.job_id}),
+        }
 
+        if cached:
+            response_data.update({
+                "message": "✅ Receipt processed successfully (matched a previously scanned receipt)!",
+                "extracted_info": job.extracted_info,
+                "ocr_method": job.ocr_method,
+                "cache_hit": True,
+            })
+            return Response(response_data, status=status.HTTP_201_CREATED)
 
+        response_data["message"] = "Receipt uploaded successfully. OCR processing has been queued."
+        return Response(response_data, status=status.HTTP_202_ACCEPTED)
 
-#Payment Info
-class PaymentInfoView(APIView):
+
+class OCRJobStatusView(APIView):
     """
-    API view to fetch all payments of the authenticated user with related details
+    API view to poll the status of a receipt OCR job
     """
     authentication_classes = [JWTAuthentication]
     permission_classes = [IsAuthenticated]
 
-    def get(self, request):
-        try:
-            user = request.user
-            payments = Payment.objects.filter(stuid=user)
+    def get(self, request, job_id):
+        job = get_object_or_404(
+            OCRJob.objects.select_related("receipt", "receipt__payid"),
+            job_id=job_id,
+            receipt__payid__stuid=request.user,
+        )
+        return Response(OCRJobSerializer(job).data)
 
-            payment_list = []
 
-            for payment in payments:
-                try:
-                    # Get class name from Payment.class_names field first (for receipt payments before verification)
-                    # Then fallback to Enrollment table (for verified payments and online payments)
-                    classname = None
-                    
-                    # First priority: class_names field in Payment model
-                    if payment.class_names:
-                        classname = payment.class_names
-                    else:
-                        # Fallback: Try to get from Enrollment table (for verified/enrolled classes)
-                        enrollment = Enrollment.objects.filter(payid=payment).first()
-                        if enrollment and hasattr(enrollment, 'classid') and enrollment.classid:
-                            classname = enrollment.classid.title
-                    
-                    print(f"Payment: {payment.payid}, Method: {payment.method}, Class Names: {classname}")
 
-                    invoice_no = None
-                    record_no = None
+#Payment Info
+class PaymentInfoView(APIView):
+    """
+    API view to fetch the payments of the authenticated user with related details,
+    newest first.
 
-                    if payment.method == 'online':
-                        try:
-                            online_payment = OnlinePayment.objects.get(payid=payment)
-                            invoice_no = online_payment.invoice_no
-                        except OnlinePayment.DoesNotExist:
-                            invoice_no = None
+    Query params: ``status`` and ``method`` (comma-separated), ``page_size``
+    (default 50, max 200) and ``cursor`` (the ``next_cursor`` of the previous page).
+    """
+    authentication_classes = [JWTAuthentication]
+    permission_classes = [IsAuthenticated]
 
-                    elif payment.method == 'receipt':
-                        try:
-                            receipt_payment = ReceiptPayment.objects.get(payid=payment)
-                            record_no = receipt_payment.record_no
-                        except ReceiptPayment.DoesNotExist:
-                            record_no = None
-
-                    # Append payment details to list
-                    payment_list.append({
-                        "payid": payment.payid,
-                        "date": payment.date.strftime('%Y-%m-%d') if payment.date else "N/A",
-                        "amount": float(payment.amount) if payment.amount else 0.0,
-                        "status": payment.status or "pending",
-                        "method": payment.method or "unknown",
-                        "class": classname or "No class specified",
-                        "Invoice_No": invoice_no,
-                        "Record_No": record_no
-                    })
-                    
-                except Exception as payment_error:
-                    print(f"Error processing payment {payment.payid}: {payment_error}")
-                    continue
+    PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
 
-            return Response({"payments": payment_list})
-            
-        except Exception as e:
-            print(f"Error in PaymentInfoView: {e}")
-            return Response({"error": "Failed to fetch payment information", "detail": str(e)}, status=500)
+    def get(self, request):
+        filters = {}
+        for param, field in (("status", "status"), ("method", "method")):
+            values = [v for v in request.query_params.get(param, "").split(",") if v]
+            choices = {choice for choice, _ in Payment._meta.get_field(field).choices}
+            invalid = sorted(set(values) - choices)
+            if invalid:
+                return Response(
+                    {"error": f"Invalid {param}: {', '.join(invalid)}", "choices": sorted(choices)},
+                    status=400,
+                )
+            if values:
+                filters[f"{field}__in"] = values
+
+        # Class title from the first enrollment, for payments without class_names
+        enrolled_class = Enrollment.objects.filter(payid=OuterRef("pk")).order_by("enrollid").values("classid__title")[:1]
+        payments = (
+            Payment.objects.filter(stuid=request.user, **filters)
+            .annotate(enrolled_class=Subquery(enrolled_class))
+            .values(
+                "id", "payid", "date", "amount", "status", "method", "class_names", "enrolled_class",
+                "onlinepayment__invoice_no", "receiptpayment__record_no",
+            )
+        )
+
+        try:
+            page = KeysetPage(
+                payments, ("date", "id"), (date.fromisoformat, int),
+                cursor=request.query_params.get("cursor"),
+                page_size=parse_page_size(request.query_params.get("page_size"), self.PAGE_SIZE, self.MAX_PAGE_SIZE),
+            )
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=400)
+
+        payment_list = [
+            {
+                "payid": payment["payid"],
+                "date": payment["date"].strftime('%Y-%m-%d') if payment["date"] else "N/A",
+                "amount": float(payment["amount"]) if payment["amount"] else 0.0,
+                "status": payment["status"] or "pending",
+                "method": payment["method"] or "unknown",
+                "class": payment["class_names"] or payment["enrolled_class"] or "No class specified",
+                "Invoice_No": payment["onlinepayment__invoice_no"] if payment["method"] == "online" else None,
+                "Record_No": payment["receiptpayment__record_no"] if payment["method"] == "receipt" else None,
+            }
+            for payment in page.rows
+        ]
+        return Response({"payments": payment_list, "next_cursor": page.next_cursor, "has_more": page.has_more})
 
 
 class StudentProfileView(APIView):
@@ -537,17 +347,12 @@ def initiate_payment(request):
         OnlinePayment.objects.create(
             payid=payment,
             invoice_no=payment.payid,
+            order_id=order_id,
             class_ids=class_ids,
             class_summary=class_summary,
         )
 
-        for cid in class_ids:
-            cls = Class.objects.get(classid=cid)
-            Enrollment.objects.create(
-                payid=payment,
-                stuid=user.student_profile,
-                classid=cls,
-            )
+        EnrollmentService.enroll_many(user.student_profile, class_ids, payment)
     except Exception as e:
         print("Error saving payment:", e)
         return Response({"error": "Failed to create payment records"}, status=500)
@@ -569,53 +374,15 @@ def initiate_payment(request):
 
 @csrf_exempt
 @api_view(['POST'])
+@authentication_classes([])
+@permission_classes([AllowAny])
 def payment_notify(request):
     """
-    Webhook endpoint called by PayHere to notify payment status
+    Webhook endpoint called by PayHere to notify payment status.
+    Authenticated by the md5sig signature; replays are acknowledged without effect.
     """
-    data = request.data
-    order_id = data.get('order_id')
-    amount = data.get('payhere_amount')
-    currency = data.get('payhere_currency')
-    status_code = data.get('status_code')
-    received_sig = data.get('md5sig')
-
-    merchant_id = settings.PAYHERE_MERCHANT_ID
-    merchant_secret = settings.PAYHERE_MERCHANT_SECRET
-
-    # Create expected signature hash to verify authenticity
-    hash_string = f"{merchant_id}{order_id}{amount}{currency}{status_code}{hashlib.md5(merchant_secret.encode()).hexdigest().upper()}"
-    expected_sig = hashlib.md5(hash_string.encode()).hexdigest().upper()
-
-    # Verify signature and status_code (2 = success)
-    if received_sig == expected_sig and status_code == '2':
-        try:
-            payment = Payment.objects.get(order_id=order_id)
-            payment.status = 'success'
-            payment.save()
-
-            # Mark OnlinePayment as verified
-            online = OnlinePayment.objects.get(payid=payment)
-            online.verified = True
-            online.save()
-
-            # Get student profile linked to user
-            student_profile = StudentProfile.objects.get(user=payment.stuid)
-
-            # Enroll student to all classes in the payment's course_ids
-            for class_id in online.class_ids:
-                Enrollment.objects.create(
-                    stuid=student_profile,
-                    classid_id=class_id,
-                    payid=payment
-                )
-
-            return Response("Payment verified and student enrolled", status=200)
-        except Payment.DoesNotExist:
-            return Response("Payment not found", status=404)
-
-    # Return error if signature invalid or status_code not success
-    return Response("Invalid signature", status=400)
+    result = process_notification(request.data)
+    return Response(result.detail, status=result.http_status)
 
 
 
@@ -671,7 +438,7 @@ class EditStudentProfileView(APIView):
 
 
 from .models import ChatRoom, Message
-from .serializers import MessageSerializer
+from .serializers import MessageRows, MessageSerializer
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_chat_messages(request, recipient_role):
@@ -690,8 +457,7 @@ def get_chat_messages(request, recipient_role):
         chat_room=chat_room
     ).order_by('created_at')
 
-    serializer = MessageSerializer(messages, many=True)
-    return Response(serializer.data)
+    return Response(MessageRows().serialize(messages))
 
 
 @api_view(['POST'])
@@ -761,83 +527,25 @@ def mark_messages_read_student(request):
 from instructor.serializers import ClassSerializer
 from instructor.models import Class
 from datetime import timedelta, date,datetime
-DAYS_ORDER = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-
-def build_schedule_string(class_obj):
-    """Builds a schedule string like: Mon, Wed, Fri 3:30PM–5:00PM"""
-    schedules = class_obj.schedules.all()
-    if not schedules:
-        return None
-
-    time_slots = {}
-    for sched in schedules:
-        day = sched.day_of_week  # e.g., 'Monday' → 'Mon'
-        short_day = day[:3]
-        start = sched.start_time.strftime('%I:%M %p')  # e.g., 15:30 → 03:30 PM
-        end_dt = (datetime.combine(datetime.today(), sched.start_time) +
-                  timedelta(minutes=sched.duration_minutes))
-        end = end_dt.strftime('%I:%M %p')
-        time_range = f"{start}–{end}"
-        if time_range not in time_slots:
-            time_slots[time_range] = []
-        time_slots[time_range].append((day, short_day))
-        
-
-    # Sort by DAYS_ORDER
-    def day_order(d):
-        full_day = d[0]
-        return DAYS_ORDER.index(day)
-
-    result = []
-    for time_range, days in time_slots.items():
-        days.sort(key=day_order)
-        short_day_str = ", ".join(d[1] for d in days)
-        result.append(f"{short_day_str} - {time_range}")
-
-    return "\n".join(result)
-
-def build_class_data(class_obj):
-    return {
-        "classid": class_obj.classid,
-        "title": class_obj.title,
-        "description": class_obj.description,
-        "fee": float(class_obj.fee),
-        "start_date": class_obj.start_date.isoformat(),
-        "end_date": class_obj.end_date.isoformat() if class_obj.end_date else None,
-        "webinar_id": class_obj.webinar.webinar_id if class_obj.webinar else None,
-        "schedule": build_schedule_string(class_obj)
-    }
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def student_classess(request):
-    from django.utils import timezone
-    
+    """
+    The student's enrolled classes and the other active/pending classes.
+    Pass page_size (and then cursor) to page through "others".
+    """
     student = request.user.student_profile
-    enrolled_enrollments = Enrollment.objects.filter(stuid=student).select_related(
-        'classid', 'classid__webinar').prefetch_related('classid__schedules')
-    enrolled_classes = [e.classid for e in enrolled_enrollments]
-
-    enrolled_data = [build_class_data(c) for c in enrolled_classes]
-
-    # Get current date
-    current_date = timezone.now().date()
-    
-    # Filter other classes to show active (currently running) and pending (future) classes
-    # but exclude completed classes and non-enrolled classes
-    all_classes = Class.objects.all()
-    other_classes = all_classes.exclude(pk__in=[c.pk for c in enrolled_classes]).filter(
-        end_date__gte=current_date  # Only exclude completed classes (end_date < current_date)
-    )
-    others_data = [build_class_data(c) for c in other_classes]
-    print("Enrolled Classes Data:")
-    print(enrolled_data)
+    try:
+        page_size = parse_page_size(request.query_params.get('page_size'), None, 200)
+        catalog = student_catalog(
+            student, today=timezone.localdate(), cursor=request.query_params.get('cursor'), page_size=page_size,
+        )
+    except InvalidCursor as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(catalog)
 
-    return Response({
-        "enrolled": enrolled_data,
-        "others": others_data
-    })
 
 from instructor.models import Marks
 from collections import defaultdict
@@ -920,85 +628,121 @@ from instructor.models import Exams
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def calendarEvent(request):
-    """Get calendar events for student - simplified version for debugging"""
+    """
+    Webinar sessions and published exams of the student's paid classes
+    between the start and end query params (YYYY-MM-DD, both inclusive)
+    """
     user = request.user
     try:
         student = StudentProfile.objects.get(user=user)
-    except:
+    except StudentProfile.DoesNotExist:
         return Response({"error": "Student profile not found."}, status=status.HTTP_404_NOT_FOUND)
-    
-    # Step 1: Get all enrolled classes for this student with successful payments
-    enrolled_classes = Enrollment.objects.filter(
-        stuid=student, 
-        payid__status='success'
-    ).select_related("classid", "classid__webinar")
-    
-    print(f"=== CALENDAR DEBUG ===")
-    print(f"Student: {user.first_name} {user.last_name}")
-    print(f"Enrolled classes: {enrolled_classes.count()}")
-    
-    events = []
-    
-    # Step 2: Process each enrolled class
-    for enrollment in enrolled_classes:
-        class_obj = enrollment.classid
-        print(f"\nClass: {class_obj.title}")
-        print(f"  Start: {class_obj.start_date}, End: {class_obj.end_date}")
-        print(f"  Has webinar: {class_obj.webinar is not None}")
-        
-        # Add class start event for debugging
-        events.append({
-            "id": f"class_{class_obj.id}",
-            "title": f"📚 {class_obj.title}",
-            "type": "class",
-            "date": f"{class_obj.start_date}T09:00:00",
-            "color": "green",
-        })
-        
-        # Get zoom occurrences if webinar exists
-        if class_obj.webinar:
-            print(f"  Webinar: {class_obj.webinar.topic} (ID: {class_obj.webinar.webinar_id})")
-            
-            # Get ALL occurrences for this webinar (no date filtering for now)
-            occurrences = ZoomOccurrence.objects.filter(webinar=class_obj.webinar)
-            print(f"  Zoom occurrences found: {occurrences.count()}")
-            
-            for occurrence in occurrences:
-                print(f"    - Occurrence: {occurrence.start_time}")
-                events.append({
-                    "id": f"zoom_{occurrence.id}",
-                    "title": f"🎥 {class_obj.webinar.topic}",
-                    "webinarid": class_obj.webinar.webinar_id,
-                    "type": "zoom_meeting",
-                    "date": occurrence.start_time.isoformat() if occurrence.start_time else None,
-                    "color": "blue",
-                    "duration": occurrence.duration,
-                    "class_title": class_obj.title,
-                })
-    
-    # Step 3: Get published exams (simplified)
-    all_enrolled_class_ids = [enrollment.classid.id for enrollment in enrolled_classes]
-    exams = Exam.objects.filter(
-        classid__in=all_enrolled_class_ids,
-        is_published=True
-    )
-    
-    print(f"\nPublished exams found: {exams.count()}")
-    for exam in exams:
-        print(f"  - Exam: {exam.examname} on {exam.date}")
-        events.append({
-            "id": f"exam_{exam.id}",
-            "title": f"📝 {exam.examname}",
-            "type": "exam",
-            "date": exam.date.isoformat() if exam.date else None,
-            "color": "red",
-            "duration": exam.duration_minutes,
-        })
-    
-    print(f"\nTotal events returned: {len(events)}")
-    print("=== END DEBUG ===")
-    
-    return Response(events, status=status.HTTP_200_OK)
+
+    try:
+        start, end = parse_window(request.query_params)
+    except CalendarError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(calendar_events(student, start, end), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def enrollment_conflict_check(request):
+    """
+    Clashes between the classes in the ``classes`` query param (comma-separated
+    class codes) and the sessions and exams of the student's current classes
+    """
+    try:
+        student = StudentProfile.objects.get(user=request.user)
+    except StudentProfile.DoesNotExist:
+        return Response({"error": "Student profile not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    codes = [code.strip() for code in request.query_params.get('classes', '').split(',') if code.strip()]
+    if not codes:
+        return Response({"error": "classes is required."}, status=status.HTTP_400_BAD_REQUEST)
+    conflicts = enrollment_conflicts(student, Class.objects.filter(classid__in=codes))
+    return Response({"conflicts": conflicts}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def class_timetable(request):
+    """
+    Scheduled class sessions of the student's paid classes between the start
+    and end query params (YYYY-MM-DD, both inclusive), with overrides applied
+    """
+    try:
+        student = StudentProfile.objects.get(user=request.user)
+    except StudentProfile.DoesNotExist:
+        return Response({"error": "Student profile not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        start, end = parse_window(request.query_params)
+    except CalendarError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(timetable(student, start, end), status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def calendar_sync(request):
+    """
+    Incremental calendar sync. Without ``sync_token`` returns every event of
+    the start/end window; with one, only events changed since and the ids of
+    removed events. 410 means the token expired and a full sync is needed.
+    """
+    try:
+        student = StudentProfile.objects.get(user=request.user)
+    except StudentProfile.DoesNotExist:
+        return Response({"error": "Student profile not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    token = request.query_params.get('sync_token')
+    try:
+        data = delta_sync(student, token) if token else full_sync(student, request.query_params)
+    except SyncTokenExpired as e:
+        return Response({"error": str(e)}, status=status.HTTP_410_GONE)
+    except CalendarError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def calendar_feed_url(request):
+    """The student's private iCalendar subscription URL"""
+    try:
+        student = StudentProfile.objects.get(user=request.user)
+    except StudentProfile.DoesNotExist:
+        return Response({"error": "Student profile not found."}, status=status.HTTP_404_NOT_FOUND)
+    url = request.build_absolute_uri(reverse('calendar-feed', args=[feed_token(student)]))
+    return Response({"url": url}, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def calendar_feed(request, token):
+    """
+    iCalendar feed for calendar apps; the signed token in the URL
+    identifies the student. Supports If-None-Match.
+    """
+    student_id = student_id_from_token(token)
+    if student_id is None:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+    try:
+        body, etag = get_feed(
+            student_id, lambda pk: StudentProfile.objects.select_related('user').get(pk=pk),
+        )
+    except StudentProfile.DoesNotExist:
+        return HttpResponse(status=status.HTTP_404_NOT_FOUND)
+
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = HttpResponse(body, content_type='text/calendar; charset=utf-8')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
 
 
 # Student Exam API Views
@@ -1733,23 +1477,23 @@ def getAllClass(request):
     - Active classes: start_date <= current_date <= end_date
     - Pending classes: start_date > current_date
     - Excludes completed classes: end_date < current_date
+    Served from the cached catalog (students.catalog) with a strong ETag;
+    a matching If-None-Match gets a 304.
     """
     try:
-        from datetime import date
-        current_date = date.today()
-        
-        # Filter for active and pending classes only
-        classes = Class.objects.filter(
-            end_date__gte=current_date  # Exclude completed classes (end_date < current_date)
-        ).order_by('start_date')  # Order by start date for better UX
-        
-        serializer = ClassSerializer(classes, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        data, etag = get_catalog()
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(data, status=status.HTTP_200_OK)
+        response['ETag'] = etag
+        # Let browsers and proxies revalidate instead of refetching the whole list
+        response['Cache-Control'] = 'public, no-cache'
+        return response
     except Exception as e:
         return Response({'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
-
 '''
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])